@@ -0,0 +1,91 @@
+"""Compares string statuses with integer animation states, per entity update"""
+import common
+import pygame
+from animstate import STATUSES
+from level1 import Level
+from settings import WINDOW_HEIGHT, WINDOW_WIDTH
+
+UPDATES = 10000
+
+
+class StringStatus:
+    """The status handling before integer states, on a copy of an entity"""
+
+    def __init__(self, sprite):
+        self.sprite = sprite
+        self.status = sprite.status
+        self.direction = sprite.direction
+        self.frameIndex = 0
+        self.attacking = False
+        self.animations = dict(zip(STATUSES, sprite.animations))
+
+    def player_status(self):
+        if self.attacking:
+            if "attack" not in self.status:
+                if "idle" in self.status:
+                    self.status = self.status.replace("_idle", "_attack")
+        else:
+            if "attack" in self.status:
+                self.status = self.status.replace("_attack", "")
+
+    def damsel_status(self):
+        if self.direction.x > 0 and self.status != "right":
+            self.status = "right"
+        elif self.direction.x < 0 and self.status != "left":
+            self.status = "left"
+        if self.direction.y > 0 and self.status != "down":
+            self.status = "down"
+        elif self.direction.y < 0 and self.status != "up":
+            self.status = "up"
+
+    def frame(self):
+        animation = self.animations[self.status]
+        self.frameIndex += 0.15
+        if self.frameIndex >= len(animation):
+            self.frameIndex = 0
+        return animation[int(self.frameIndex)]
+
+
+def string_updates(entity, status):
+    for _ in range(UPDATES):
+        status()
+        entity.frame()
+
+
+def state_updates(sprite, status):
+    for _ in range(UPDATES):
+        status()
+        animation = sprite.animations[sprite.state]
+        sprite.frameIndex += 0.15
+        if sprite.frameIndex >= len(animation):
+            sprite.frameIndex = 0
+        animation[int(sprite.frameIndex)]
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    level = Level()
+    player = level.player
+    damsel = level.friendly_spriites.sprites()[0]
+    rows = []
+    for label, sprite, string_status, state_status in (
+        ("player", player, "player_status", player.get_status),
+        ("damsel", damsel, "damsel_status", damsel.set_status_by_curr_direction),
+    ):
+        entity = StringStatus(sprite)
+        method = getattr(entity, string_status)
+        strings_ms = common.best_of(lambda: string_updates(entity, method))
+        states_ms = common.best_of(lambda: state_updates(sprite, state_status))
+        rows.append(
+            (
+                label,
+                f"strings {strings_ms * 1000 / UPDATES:6.3f} us  "
+                f"states {states_ms * 1000 / UPDATES:6.3f} us per update",
+            )
+        )
+    common.report("Status update and frame selection, without drawing", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Times blitting the same opaque tile in each surface format"""
+import common
+import pygame
+from assets import optimize
+from settings import WINDOW_HEIGHT, WINDOW_WIDTH
+
+BLITS = 2000
+
+
+def blit_many(screen, image):
+    positions = [
+        ((index * 37) % (WINDOW_WIDTH - 64), (index * 53) % (WINDOW_HEIGHT - 64))
+        for index in range(BLITS)
+    ]
+    screen.blits([(image, position) for position in positions], doreturn=False)
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    raw = pygame.image.load("graphics/wall/wall.png")
+    sheet = pygame.image.load("graphics/player/playerWalking.png")
+    formats = (
+        ("as loaded", raw),
+        ("convert_alpha", raw.convert_alpha()),
+        ("convert", raw.convert()),
+        ("optimize", optimize(raw)),
+        ("48x80 sheet, colorkey", optimize(sheet, colorkey=(0, 0, 0), rle=False)),
+        ("48x80 sheet, colorkey RLE", optimize(sheet, colorkey=(0, 0, 0))),
+    )
+    rows = []
+    for label, image in formats:
+        elapsed = common.best_of(lambda: blit_many(screen, image))
+        rows.append((label, f"{elapsed:7.2f} ms for {BLITS} blits"))
+    common.report("Blitting an opaque 64x64 tile", rows)
+
+
+if __name__ == "__main__":
+    main()
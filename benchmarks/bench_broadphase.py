@@ -0,0 +1,75 @@
+"""Compares naive spritecollide interaction checks with the broad phase"""
+import random
+
+import common
+import pygame
+from broadphase import BroadPhase
+
+WORLD_SIZE = 64 * 200
+ENTITY_SIZE = (16, 20)
+
+
+class Body(pygame.sprite.Sprite):
+    def __init__(self, pos, groups):
+        super().__init__(groups)
+        self.rect = pygame.Rect(pos, ENTITY_SIZE)
+        self.hitbox = self.rect
+
+
+def populate(count, rng):
+    players = pygame.sprite.Group()
+    enemies = pygame.sprite.Group()
+    damsels = pygame.sprite.Group()
+    attacks = pygame.sprite.Group()
+    for _ in range(count):
+        pos = (rng.randrange(WORLD_SIZE), rng.randrange(WORLD_SIZE))
+        Body(pos, rng.choice((enemies, enemies, enemies, damsels)))
+    for _ in range(max(1, count // 100)):
+        Body((rng.randrange(WORLD_SIZE), rng.randrange(WORLD_SIZE)), attacks)
+    Body((WORLD_SIZE // 2, WORLD_SIZE // 2), players)
+    return players, enemies, damsels, attacks
+
+
+def naive(players, enemies, damsels, attacks):
+    hits = 0
+    for player in players:
+        hits += len(pygame.sprite.spritecollide(player, enemies, False))
+        hits += len(pygame.sprite.spritecollide(player, damsels, False))
+    for attack in attacks:
+        hits += len(pygame.sprite.spritecollide(attack, enemies, False))
+    for enemy in enemies:
+        hits += len(pygame.sprite.spritecollide(enemy, damsels, False))
+    return hits
+
+
+def main():
+    rng = random.Random(1)
+    rows = []
+    for count in (1000, 2000, 5000, 10000):
+        players, enemies, damsels, attacks = populate(count, rng)
+        broad_phase = BroadPhase()
+        for group_a, group_b in (
+            (players, enemies),
+            (players, damsels),
+            (attacks, enemies),
+            (enemies, damsels),
+        ):
+            broad_phase.register(group_a, group_b, lambda a, b: None)
+
+        naive_ms = common.best_of(
+            lambda: naive(players, enemies, damsels, attacks), repeat=3
+        )
+        sweep_ms = common.best_of(broad_phase.update, repeat=3)
+        rows.append(
+            (
+                f"{count} entities",
+                f"spritecollide {naive_ms:8.2f} ms   sort-and-sweep "
+                f"{sweep_ms:6.2f} ms   ({broad_phase.checks} checks, "
+                f"{broad_phase.contacts} contacts)",
+            )
+        )
+    common.report("player/attack/enemy/damsel interactions per tick", rows)
+
+
+if __name__ == "__main__":
+    main()
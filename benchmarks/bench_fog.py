@@ -0,0 +1,79 @@
+"""Compares a darkness sprite per hidden tile with the fog of war overlay"""
+import os
+import tempfile
+
+import common
+import numpy
+import pygame
+from fog import HIDDEN
+from level1 import Level
+from mapgen import generate, write_csv
+from settings import TILESIZE, WINDOW_HEIGHT, WINDOW_WIDTH
+
+MAP_SIZE = 100
+FRAMES = 60
+# pixels the player is moved per frame, the walking speed
+STEP = 5
+
+
+class Darkness(pygame.sprite.Sprite):
+    """A hidden tile drawn as a sprite of the camera group"""
+
+    def __init__(self, image, col, row, groups):
+        super().__init__(groups)
+        self.image = image
+        self.rect = image.get_rect(topleft=(col * TILESIZE, row * TILESIZE))
+
+
+def walk(level, draw_fog):
+    """Draws frames while the player walks diagonally into hidden tiles"""
+
+    start = level.player.rect.center
+    for frame in range(FRAMES):
+        level.player.rect.center = (start[0] + frame * STEP, start[1] + frame * STEP)
+        level.reveal()
+        level.visible_sprites.custom_draw(level.player)
+        if draw_fog:
+            level.fog.draw(level.display_surface, level.visible_sprites.offset)
+    level.player.rect.center = start
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fog.csv")
+        write_csv(generate(MAP_SIZE, MAP_SIZE, seed=1), path)
+        level = Level(map_path=path)
+        fog = level.fog
+        hidden = fog.hidden.copy()
+
+        def reset():
+            fog.hidden[:] = hidden
+            fog.last_tile = fog.window = None
+
+        plain_ms = common.best_of(lambda: (reset(), walk(level, False)))
+        overlay_ms = common.best_of(lambda: (reset(), walk(level, True)))
+
+        image = pygame.Surface((TILESIZE, TILESIZE)).convert()
+        sprites = [
+            Darkness(image, col, row, [level.visible_sprites])
+            for col, row in numpy.argwhere(hidden == HIDDEN).tolist()
+        ]
+        sprites_ms = common.best_of(lambda: (reset(), walk(level, False)))
+
+    rows.append(("no fog", f"{plain_ms / FRAMES:6.2f} ms/frame"))
+    rows.append(("overlay", f"{overlay_ms / FRAMES:6.2f} ms/frame"))
+    rows.append(
+        (
+            "darkness sprites",
+            f"{sprites_ms / FRAMES:6.2f} ms/frame ({len(sprites)} sprites, "
+            "not removed when revealed)",
+        )
+    )
+    common.report(f"Level draw with fog of war, {MAP_SIZE}x{MAP_SIZE} map", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Compares line of sight against obstacle rects with the grid traversal
+
+Every tick each NPC asks whether it can see the player and a few other NPCs.
+NPCs move a few pixels per tick, so most queries repeat tile pairs that were
+already asked about in the same tick.
+"""
+import random
+
+import common
+import pygame
+from lineofsight import LineOfSight
+from settings import TILESIZE
+
+MAP_SIZE = 100
+WALL_DENSITY = 0.15
+TARGETS_PER_NPC = 4
+
+
+def build_map(rng):
+    return [
+        ["x" if rng.random() < WALL_DENSITY else "," for _ in range(MAP_SIZE)]
+        for _ in range(MAP_SIZE)
+    ]
+
+
+def obstacle_rects(world_map):
+    return [
+        pygame.Rect(col * TILESIZE, row * TILESIZE, TILESIZE, TILESIZE)
+        for row, tiles in enumerate(world_map)
+        for col, tile in enumerate(tiles)
+        if tile == "x"
+    ]
+
+
+def tile_centre(pos):
+    return (
+        pos[0] // TILESIZE * TILESIZE + TILESIZE // 2,
+        pos[1] // TILESIZE * TILESIZE + TILESIZE // 2,
+    )
+
+
+def build_queries(npc_count, rng):
+    """NPCs clustered in groups around a player, each watching a few others"""
+
+    world = MAP_SIZE * TILESIZE
+    player = (world // 2, world // 2)
+    npcs = [
+        (
+            player[0] + rng.randrange(-12 * TILESIZE, 12 * TILESIZE),
+            player[1] + rng.randrange(-12 * TILESIZE, 12 * TILESIZE),
+        )
+        for _ in range(npc_count)
+    ]
+    queries = []
+    for npc in npcs:
+        queries.append((npc, player))
+        for _ in range(TARGETS_PER_NPC - 1):
+            queries.append((npc, rng.choice(npcs)))
+    return queries
+
+
+def naive(rects, queries):
+    seen = 0
+    for pos_a, pos_b in queries:
+        line = (tile_centre(pos_a), tile_centre(pos_b))
+        if not any(rect.clipline(line) for rect in rects):
+            seen += 1
+    return seen
+
+
+def cached(line_of_sight, queries):
+    line_of_sight.new_tick()
+    seen = 0
+    for pos_a, pos_b in queries:
+        if line_of_sight.visible(pos_a, pos_b):
+            seen += 1
+    return seen
+
+
+def main():
+    pygame.init()
+    rng = random.Random(1)
+    world_map = build_map(rng)
+    rects = obstacle_rects(world_map)
+
+    line_of_sight = LineOfSight(world_map)
+    precomputed = LineOfSight(world_map)
+    start = common.time.perf_counter()
+    precomputed.precompute(12)
+    precompute_ms = (common.time.perf_counter() - start) * 1000
+
+    centre = MAP_SIZE // 2
+    edit_ms = common.best_of(lambda: precomputed.set_tile(centre, centre, False))
+    rows = [
+        (
+            "precompute radius 12",
+            f"{precompute_ms:.0f} ms once per map, "
+            f"{len(precomputed._static) / 1024 / 1024:.1f} MiB",
+        ),
+        ("set_tile", f"{edit_ms:.1f} ms"),
+    ]
+    for npc_count in (250, 500, 1000):
+        queries = build_queries(npc_count, rng)
+        label = f"{len(queries)} queries"
+        if npc_count <= 250:
+            naive_ms = common.best_of(lambda: naive(rects, queries), repeat=1)
+            rows.append((f"{label} obstacle rects", f"{naive_ms:8.2f} ms"))
+        traced_ms = common.best_of(lambda: cached(line_of_sight, queries))
+        line_of_sight.traced = 0
+        cached(line_of_sight, queries)
+        rows.append(
+            (
+                f"{label} traversal, per tick memo",
+                f"{traced_ms:8.2f} ms  {line_of_sight.traced} lines traced",
+            )
+        )
+        static_ms = common.best_of(lambda: cached(precomputed, queries))
+        rows.append((f"{label} precomputed", f"{static_ms:8.2f} ms"))
+    common.report("Line of sight queries per tick", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compares drawing every minimap tile each frame with the cached minimap"""
+import os
+import tempfile
+
+import common
+import pygame
+from level1 import Level
+from mapgen import generate, write_csv
+from minimap import PALETTE, PLANT, WALL, Minimap
+from settings import (
+    MINIMAP_SCALE,
+    MINIMAP_SIZE,
+    TILESIZE,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+)
+
+FRAMES = 60
+
+
+def per_tile(surface, level):
+    """The straightforward minimap, every tile around the player every frame"""
+
+    panel = pygame.Surface(MINIMAP_SIZE)
+    columns = MINIMAP_SIZE[0] // MINIMAP_SCALE
+    rows = MINIMAP_SIZE[1] // MINIMAP_SCALE
+    col, row = (
+        level.player.rect.centerx // TILESIZE,
+        level.player.rect.centery // TILESIZE,
+    )
+    for _ in range(FRAMES):
+        panel.fill(PALETTE[0])
+        for y in range(max(row - rows // 2, 0), row + rows // 2):
+            line = level.world_map[y] if y < len(level.world_map) else ()
+            for x in range(max(col - columns // 2, 0), col + columns // 2):
+                tile = line[x] if x < len(line) else " "
+                if tile in ("x", "t"):
+                    color = PALETTE[WALL if tile == "x" else PLANT]
+                    panel.fill(
+                        color,
+                        (
+                            (x - col + columns // 2) * MINIMAP_SCALE,
+                            (y - row + rows // 2) * MINIMAP_SCALE,
+                            MINIMAP_SCALE,
+                            MINIMAP_SCALE,
+                        ),
+                    )
+        surface.blit(panel, (0, 0))
+
+
+def cached(surface, level, minimap):
+    for _ in range(FRAMES):
+        minimap.draw(surface, level)
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "minimap.csv")
+        for size in (100, 1000):
+            write_csv(generate(size, size, enemies=0.02, damsels=0.005, seed=1), path)
+            level = Level(map_path=path)
+            build_ms = common.best_of(lambda: Minimap(level.world_map), repeat=3)
+            minimap = Minimap(level.world_map)
+            tiles_ms = common.best_of(lambda: per_tile(screen, level)) / FRAMES
+            cached_ms = common.best_of(lambda: cached(screen, level, minimap)) / FRAMES
+            rows.append(
+                (
+                    f"{size}x{size}",
+                    f"build {build_ms:7.2f} ms  per tile {tiles_ms:6.3f} ms/frame  "
+                    f"cached {cached_ms:6.3f} ms/frame",
+                )
+            )
+    common.report("Minimap cost", rows)
+
+
+if __name__ == "__main__":
+    main()
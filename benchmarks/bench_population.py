@@ -0,0 +1,49 @@
+"""Times level ticks on a crowded map with and without the population budget"""
+import os
+import tempfile
+
+import common
+import pygame
+from level1 import Level
+from mapgen import generate, write_csv
+from settings import WINDOW_HEIGHT, WINDOW_WIDTH
+
+TICKS = 60
+
+
+def tick(level):
+    for _ in range(TICKS):
+        level.update()
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "crowded.csv")
+        for size in (50, 100, 200):
+            write_csv(generate(size, size, enemies=0.04, damsels=0.01, seed=1), path)
+            level = Level(map_path=path)
+            budget_ms = common.best_of(lambda: tick(level)) / TICKS
+            stats = level.population.stats()
+            declared = stats["active"] + stats["dormant"]
+
+            # the behaviour before the population manager, every npc simulated
+            population = level.population
+            population.budget = None
+            population.activate_radius = population.deactivate_radius = 10**9
+            population.refresh(level.player.rect.center)
+            all_ms = common.best_of(lambda: tick(level)) / TICKS
+            rows.append(
+                (
+                    f"{size}x{size}, {declared} npcs",
+                    f"budget {budget_ms:6.2f} ms/tick ({stats['active']} active)  "
+                    f"all active {all_ms:6.2f} ms/tick",
+                )
+            )
+    common.report("Level update with a population budget", rows)
+
+
+if __name__ == "__main__":
+    main()
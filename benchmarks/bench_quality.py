@@ -0,0 +1,47 @@
+"""Times level frames on a crowded map at every quality level"""
+import os
+import tempfile
+
+import common
+import pygame
+from level1 import Level
+from mapgen import generate, write_csv
+from render_target import RenderTarget
+from settings import QUALITY_LEVELS, WINDOW_HEIGHT, WINDOW_WIDTH
+
+FRAMES = 60
+
+
+def run_frames(level, target):
+    for _ in range(FRAMES):
+        level.run()
+        target.present()
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "crowded.csv")
+        write_csv(generate(100, 100, enemies=0.2, damsels=0.05, seed=1), path)
+        target = RenderTarget(screen)
+        level = Level(target.surface, path)
+        # every npc near the camera is simulated, so the npc interval shows
+        level.population.budget = None
+        level.population.refresh(level.player.rect.center)
+        for index, settings in enumerate(QUALITY_LEVELS):
+            target.set_scale(settings["render_scale"])
+            level.set_surface(target.surface, target.scale)
+            level.set_quality(
+                settings["npc_interval"],
+                settings["animation_interval"],
+                settings["rotation_step"],
+            )
+            elapsed = common.best_of(lambda: run_frames(level, target)) / FRAMES
+            rows.append((f"level {index}", f"{elapsed:6.2f} ms/frame  {settings}"))
+    common.report(f"{len(level.enemy_sprites)} enemies near the camera", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compares per-sprite blits with the batched YSortCameraGroup draw
+
+Only the sprite submission is timed, the floor draw is the same on both paths.
+The two paths alternate every round so machine noise hits both alike, and the
+median of the rounds is reported with the number of rounds batching won.
+"""
+import random
+import statistics
+import time
+
+import common
+import pygame
+from bench_snapshot import build_level
+from level1 import _center_y
+from settings import WINDOW_HEIGHT, WINDOW_WIDTH
+
+ROUNDS = 41
+
+
+def blit_loop(surface, sprites, offset):
+    """The draw path before batching: one blit and one Vector2 per sprite"""
+
+    for sprite in sprites:
+        surface.blit(sprite.image, sprite.rect.topleft - offset)
+
+
+def blits(surface, sprites, offset):
+    """The custom_draw path: a single blits call with integer positions"""
+
+    offset_x = int(offset.x)
+    offset_y = int(offset.y)
+    surface.blits(
+        [
+            (sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y))
+            for sprite in sprites
+        ],
+        doreturn=False,
+    )
+
+
+def time_ms(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    rng = random.Random(1)
+    rows = []
+    for npc_count in (0, 100, 500, 2000):
+        level = build_level(npc_count, rng)
+        group = level.visible_sprites
+        group.offset.update(
+            level.player.rect.centerx - group.half_width,
+            level.player.rect.centery - group.half_height,
+        )
+        sprites = sorted(group.sprites(), key=_center_y)
+        args = (group.display_surface, sprites, group.offset)
+        loop_times = []
+        batched_times = []
+        for _ in range(ROUNDS):
+            loop_times.append(time_ms(blit_loop, *args))
+            batched_times.append(time_ms(blits, *args))
+        loop_ms = statistics.median(loop_times)
+        batched_ms = statistics.median(batched_times)
+        wins = sum(loop > batched for loop, batched in zip(loop_times, batched_times))
+        rows.append(
+            (
+                f"{len(sprites)} sprites",
+                f"blit loop {loop_ms:7.3f} ms  blits {batched_ms:7.3f} ms  "
+                f"blits faster in {wins}/{ROUNDS} rounds",
+            )
+        )
+    common.report("Drawing the visible sprites, median of interleaved rounds", rows)
+
+
+if __name__ == "__main__":
+    main()
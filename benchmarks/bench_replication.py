@@ -0,0 +1,71 @@
+"""Measures delta snapshot size and encode time as NPC counts grow"""
+import random
+
+import common
+import pygame
+from bench_snapshot import build_level
+from replication import LENGTH, EntityIds, capture, decode, encode
+from settings import FPS, WINDOW_HEIGHT, WINDOW_WIDTH
+
+TICKS = 60
+# entities of the round trip check, more than a u16 count can hold
+ROUND_TRIP_ENTITIES = 70000
+
+
+def check_round_trip():
+    """Encodes and decodes a full snapshot and a delta of a very large map"""
+
+    baseline = {
+        entity_id: (entity_id % 6, entity_id * 64, entity_id * 32, 0, 0)
+        for entity_id in range(1, ROUND_TRIP_ENTITIES + 1)
+    }
+    current = {
+        entity_id: (kind, x + 5, y, status, frame)
+        for entity_id, (kind, x, y, status, frame) in baseline.items()
+        if entity_id % 10
+    }
+    state = {}
+    length = LENGTH.size
+    for previous, sent in (({}, baseline), (baseline, current)):
+        message = encode(1, 1, previous, sent)
+        body = memoryview(message)[length:]
+        decode(state, body)
+        assert state == sent, "round trip lost entities"
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    check_round_trip()
+    rng = random.Random(1)
+    rows = []
+    for npc_count in (0, 100, 1000, 5000):
+        level = build_level(npc_count, rng)
+        ids = EntityIds()
+        baseline = capture(level.visible_sprites.sprites(), ids)
+        full_size = len(encode(0, ids[level.player], {}, baseline))
+
+        delta_bytes = 0
+        encode_ms = 0.0
+        for tick in range(1, TICKS + 1):
+            level.update()
+            current = capture(level.visible_sprites.sprites(), ids)
+            encode_ms += common.best_of(
+                lambda: encode(tick, ids[level.player], baseline, current), repeat=1
+            )
+            delta_bytes += len(encode(tick, ids[level.player], baseline, current))
+            baseline = current
+        rows.append(
+            (
+                f"{npc_count} npcs",
+                f"full {full_size / 1024:7.1f} KiB  delta "
+                f"{delta_bytes / TICKS:8.0f} B/tick  encode "
+                f"{encode_ms / TICKS:6.2f} ms  "
+                f"{delta_bytes / TICKS * FPS / 1024:7.1f} KiB/s per client",
+            )
+        )
+    common.report(f"delta snapshots at {FPS} ticks per second", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Times level snapshot save and restore with growing NPC counts"""
+import os
+import random
+import tempfile
+
+import common
+import pygame
+from level1 import Level
+from settings import TILESIZE, WINDOW_HEIGHT, WINDOW_WIDTH
+from snapshot import load_snapshot, restore_level, save_level, save_snapshot
+
+
+def build_level(npc_count, rng):
+    level = Level()
+    # every spawned npc stays active, the population budget is not measured
+    level.population.budget = None
+    open_cells = [
+        (col * TILESIZE, row * TILESIZE)
+        for row, line in enumerate(level.world_map)
+        for col, cell in enumerate(line)
+        if cell == ","
+    ]
+    for index in range(npc_count):
+        pos = rng.choice(open_cells)
+        if index % 4:
+            level.spawn_enemy(pos)
+        else:
+            level.spawn_damsel(pos)
+    return level
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    rng = random.Random(1)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "level.snapshot")
+        for npc_count in (0, 1000, 5000, 20000):
+            level = build_level(npc_count, rng)
+            data = save_level(level)
+            save_ms = common.best_of(lambda: save_level(level))
+            restore_ms = common.best_of(lambda: restore_level(level, data))
+            save_snapshot(level, path)
+            mmap_ms = common.best_of(lambda: load_snapshot(level, path))
+            rows.append(
+                (
+                    f"{npc_count} npcs",
+                    f"{len(data) / 1024:8.1f} KiB  save {save_ms:7.2f} ms  "
+                    f"restore {restore_ms:7.2f} ms  mmap restore {mmap_ms:7.2f} ms",
+                )
+            )
+    common.report("level snapshots", rows)
+
+
+if __name__ == "__main__":
+    main()
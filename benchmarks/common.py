@@ -0,0 +1,39 @@
+"""Shared setup for the benchmark scripts
+
+Benchmarks are run from the top-level directory of the repository, the same
+way the game is, for example:
+
+    python benchmarks/bench_broadphase.py
+
+Importing this module makes the flat game modules importable and selects the
+dummy SDL drivers so no window or audio device is needed.
+"""
+import os
+import sys
+import time
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "game")
+sys.path.insert(0, os.path.normpath(GAME_DIR))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def best_of(function, repeat=5, number=1):
+    """Returns the best time per call in milliseconds"""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1000
+
+
+def report(title, rows):
+    """Prints a small table of (label, value) rows"""
+
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)}  {value}")
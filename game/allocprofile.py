@@ -0,0 +1,333 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# set LUNK_PROFILE_ALLOCS=1 to profile allocations and print a report on exit
+PROFILE_ENV_VAR = "LUNK_PROFILE_ALLOCS"
+# name of the section of allocations made outside every section
+OUTSIDE = "(outside sections)"
+
+
+class SectionStats:
+    """Allocations of one section of the frame
+
+    Attributes
+    ----------
+    frames : int
+        profiled frames the section ran in
+    calls : int
+        times the section ran
+    net : int
+        bytes still allocated when the section ended, summed over every call
+    peak : int
+        bytes allocated above the start of the section at its high water
+        mark, summed over every call, memory churned even if it was freed
+    max_peak : int
+        the largest peak of a single call
+    collections : int
+        garbage collections that ran inside the section
+    gc_ms : float
+        time spent in those collections
+    """
+
+    __slots__ = ("frames", "calls", "net", "peak", "max_peak", "collections", "gc_ms")
+
+    def __init__(self):
+        self.frames = 0
+        self.calls = 0
+        self.net = 0
+        self.peak = 0
+        self.max_peak = 0
+        self.collections = 0
+        self.gc_ms = 0.0
+
+
+class AllocationProfiler:
+    """Attributes the Python allocations of every frame to game sections
+
+    section() measures the memory allocated by the block it wraps with
+    tracemalloc: the net change, and the high water mark above the start so
+    temporaries freed before the block ends are counted too. update_group()
+    runs every sprite update in a section named after the sprite class, so
+    allocations are also broken down by entity class. Garbage collections
+    are timed through gc.callbacks and charged to the innermost open
+    section. The first profiled frame takes a snapshot, compared with a
+    second one by report() to list the lines that kept the most memory.
+
+    Allocations made by SDL, such as surface pixels, are not seen by
+    tracemalloc, only the Python objects wrapping them. Tracing slows the
+    game down, so the profiler is off unless started. When it is off every
+    method is a cheap no-op so the calls can stay in the code.
+    ...
+
+    Attributes
+    ----------
+    frames : int
+        number of profiled frames
+    sections : dict
+        section name -> SectionStats
+
+    Methods
+    -------
+    start(self, frames)
+        Starts tracing allocations.
+    stop(self)
+        Stops tracing allocations.
+    section(self, name)
+        Context manager measuring the allocations of a block.
+    update_group(self, group)
+        Updates the sprites of a group, per sprite class when profiling.
+    end_frame(self)
+        Closes a profiled frame.
+    report(self, file, limit)
+        Prints the sections that allocate the most and the top allocators.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.frames = 0
+        self.sections = {}
+        # garbage collections and gc milliseconds per generation
+        self.collections = [0, 0, 0]
+        self.gc_ms = [0.0, 0.0, 0.0]
+        self.baseline = None
+        # [name, start bytes, highest peak of the closed child sections]
+        self._stack = []
+        self._frame_sections = set()
+        self._gc_start = 0.0
+        # (net, peak) bytes of an empty section
+        self._overhead = (0, 0)
+
+    def start(self, frames=1):
+        """Starts tracing allocations
+
+        Parameters
+        ----------
+        frames : int
+            stack frames stored per allocation, 1 attributes them to a line
+        """
+
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._calibrate()
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+
+    def stop(self):
+        """Stops tracing allocations, the recorded numbers are kept"""
+
+        self.enabled = False
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        tracemalloc.stop()
+
+    def section(self, name):
+        """Measures the allocations of the wrapped block
+
+        Sections can be nested, the numbers of a section include the ones
+        of the sections it contains.
+        """
+
+        if not self.enabled:
+            return nullcontext()
+        return _Section(self, name)
+
+    def update_group(self, group):
+        """Updates the sprites of a group, per sprite class when profiling"""
+
+        if not self.enabled:
+            group.update()
+            return
+        for sprite in group.sprites():
+            with _Section(self, "update " + type(sprite).__name__):
+                sprite.update()
+
+    def end_frame(self):
+        """Closes a profiled frame, called once per frame"""
+
+        if not self.enabled:
+            return
+        if self.baseline is None:
+            self.baseline = self._snapshot()
+        self.frames += 1
+        for name in self._frame_sections:
+            self.sections[name].frames += 1
+        self._frame_sections.clear()
+
+    def _calibrate(self):
+        """Measures what an empty section allocates itself, subtracted later"""
+
+        self._overhead = (0, 0)
+        nets = []
+        peaks = []
+        for _ in range(8):
+            with _Section(self, OUTSIDE):
+                pass
+            stats = self.sections.pop(OUTSIDE)
+            nets.append(stats.net)
+            peaks.append(stats.peak)
+        self._frame_sections.discard(OUTSIDE)
+        self._overhead = (min(nets), min(peaks))
+
+    def _begin(self, name):
+        # allocated before measuring, so the entry is not counted
+        entry = [name, 0, 0]
+        self._stack.append(entry)
+        current, peak = tracemalloc.get_traced_memory()
+        if len(self._stack) > 1:
+            # the peak so far belongs to the enclosing section
+            self._stack[-2][2] = max(self._stack[-2][2], peak)
+        tracemalloc.reset_peak()
+        entry[1] = entry[2] = current
+
+    def _measure(self):
+        """Closes the innermost section, returns its (net, peak) bytes"""
+
+        current, peak = tracemalloc.get_traced_memory()
+        name, start, child_peak = self._stack.pop()
+        peak = max(peak, child_peak)
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+        return current - start - self._overhead[0], peak - start - self._overhead[1]
+
+    def _end(self):
+        name = self._stack[-1][0]
+        net, peak = self._measure()
+        stats = self._stats(name)
+        stats.calls += 1
+        stats.net += net
+        stats.peak += peak
+        stats.max_peak = max(stats.max_peak, peak)
+
+    def _stats(self, name):
+        stats = self.sections.get(name)
+        if stats is None:
+            stats = self.sections[name] = SectionStats()
+        self._frame_sections.add(name)
+        return stats
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+            return
+        elapsed = (time.perf_counter() - self._gc_start) * 1000
+        generation = info["generation"]
+        self.collections[generation] += 1
+        self.gc_ms[generation] += elapsed
+        stats = self._stats(self._stack[-1][0] if self._stack else OUTSIDE)
+        stats.collections += 1
+        stats.gc_ms += elapsed
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            )
+        )
+
+    def report(self, file=None, limit=15):
+        """Prints the sections that allocate the most and the top allocators
+
+        Sections are sorted by the bytes they allocate per frame at their
+        high water mark, allocation sites by the memory they kept since the
+        first profiled frame.
+        """
+
+        file = file or sys.stdout
+        frames = max(self.frames, 1)
+        collections = " / ".join(
+            f"{count} gen{generation}"
+            for generation, count in enumerate(self.collections)
+        )
+        print(
+            f"allocation profile: {self.frames} frames, {collections} "
+            f"collections, {sum(self.gc_ms):.1f} ms in gc",
+            file=file,
+        )
+        print(
+            "    peak B/frame   net B/frame  max peak B  calls/frame"
+            "    gc  gc ms  section",
+            file=file,
+        )
+        for name, stats in sorted(
+            self.sections.items(), key=lambda item: item[1].peak, reverse=True
+        )[:limit]:
+            print(
+                f"  {stats.peak / frames:14.1f} {stats.net / frames:13.1f} "
+                f"{stats.max_peak:11} {stats.calls / frames:12.1f} "
+                f"{stats.collections:5} {stats.gc_ms:6.1f}  {name}",
+                file=file,
+            )
+
+        if self.baseline is None or not tracemalloc.is_tracing():
+            return
+        print("top allocators by memory kept since the first frame", file=file)
+        for stat in self._snapshot().compare_to(self.baseline, "lineno")[:limit]:
+            frame = stat.traceback[0]
+            print(
+                f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8} blocks  "
+                f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                file=file,
+            )
+
+
+class _Section:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._begin(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._end()
+        return False
+
+
+alloc_profiler = AllocationProfiler()
+if os.environ.get(PROFILE_ENV_VAR):
+    alloc_profiler.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Profile the allocations of level frames without a window"
+    )
+    parser.add_argument("--map", metavar="PATH", help="map CSV or Tiled map")
+    parser.add_argument(
+        "--frames", type=int, default=600, help="frames to run (default %(default)s)"
+    )
+    parser.add_argument(
+        "--top", type=int, default=15, help="rows per table (default %(default)s)"
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    # imported here, the level imports this module. The profiler is the one
+    # of the imported module, the one the level reports to, not of __main__
+    import pygame
+    from allocprofile import alloc_profiler
+    from level1 import Level
+    from settings import WINDOW_HEIGHT, WINDOW_WIDTH
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    level = Level(map_path=args.map)
+    alloc_profiler.start()
+    for _ in range(args.frames):
+        screen.fill("black")
+        level.run()
+        alloc_profiler.end_frame()
+    alloc_profiler.report(limit=args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# animation states shared by the player, damsels and snapshots. A state is a
+# small integer, so status updates and frame selection index precompiled
+# tables instead of building and comparing strings every tick. state % 4 is
+# the heading and state // 4 the mode, the order snapshots store them in
+
+HEADINGS = ("up", "down", "left", "right")
+MODES = ("", "_idle", "_attack")
+
+UP, DOWN, LEFT, RIGHT = range(len(HEADINGS))
+
+
+class StateMachine:
+    """States named once and compiled into integer transition tables
+
+    Every event is a table indexed by the current state that holds the next
+    state, states an event does not mention keep their state.
+    ...
+
+    Attributes
+    ----------
+    states : tuple of str
+        state names, indexed by state
+    ids : dict
+        state name -> state
+
+    Methods
+    -------
+    table(self, transitions)
+        Compiles a mapping of state names into a transition table.
+    frame_table(self, frames)
+        Compiles a mapping of state names to frames into a list.
+    """
+
+    def __init__(self, states):
+        self.states = tuple(states)
+        self.ids = {name: state for state, name in enumerate(self.states)}
+
+    def table(self, transitions):
+        """Compiles a mapping of state names into a transition table
+
+        Parameters
+        ----------
+        transitions : dict
+            state name -> next state name
+
+        Returns
+        -------
+        bytes
+            next state, indexed by state
+        """
+
+        return bytes(self.ids[transitions.get(name, name)] for name in self.states)
+
+    def frame_table(self, frames):
+        """Compiles a mapping of state names to frames into a list
+
+        States without frames get an empty list.
+
+        Returns
+        -------
+        list of list
+            frames, indexed by state
+        """
+
+        return [frames.get(name, []) for name in self.states]
+
+
+# every status a walking entity can have
+WALKING = StateMachine(heading + mode for mode in MODES for heading in HEADINGS)
+STATUSES = WALKING.states
+
+# an attack starts from standing still, the attack ends by walking on
+START_ATTACK = WALKING.table(
+    {heading + "_idle": heading + "_attack" for heading in HEADINGS}
+)
+END_ATTACK = WALKING.table({heading + "_attack": heading for heading in HEADINGS})
+
+
+class AnimatedState:
+    """Mixin storing the animation status of an entity as an integer state
+
+    The status property converts to and from the status names, for code
+    that still works with names.
+    ...
+
+    Attributes
+    ----------
+    state : int
+        index into STATUSES
+    """
+
+    state = DOWN
+
+    @property
+    def status(self):
+        return STATUSES[self.state]
+
+    @status.setter
+    def status(self, name):
+        self.state = WALKING.ids[name]
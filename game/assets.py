@@ -0,0 +1,127 @@
+import os
+import sys
+import weakref
+import pygame
+
+# set LUNK_BLIT_DIAGNOSTICS=1, or pass --blit-diagnostics, to list slow blits
+DIAGNOSTICS_ENV_VAR = "LUNK_BLIT_DIAGNOSTICS"
+
+
+def has_translucency(surface):
+    """Returns whether any pixel of a surface is not fully opaque"""
+
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return False
+    # pixels with an alpha above 254, opaque surfaces have all of them set
+    opaque = pygame.mask.from_surface(surface, 254)
+    return opaque.count() != surface.get_width() * surface.get_height()
+
+
+def optimize(surface, alpha=None, colorkey=None, rle=True):
+    """Converts a surface to the fastest format for blitting to the display
+
+    Parameters
+    ----------
+    surface : pygame.Surface
+        a freshly loaded or created surface
+    alpha : bool or None
+        keep per-pixel alpha, detected from the pixels when None so opaque
+        images are not alpha blended on every blit
+    colorkey : tuple, int or None
+        color made transparent instead of using per-pixel alpha, -1 for the
+        color of the top left pixel
+    rle : bool
+        run length encode the colorkey. Fast for surfaces blitted as they
+        are, slow for surfaces that are read every frame, such as the source
+        of a rotation, since every read decodes them again
+
+    Returns
+    -------
+    pygame.Surface
+        a new surface in the display format
+    """
+
+    if alpha is None:
+        alpha = colorkey is None and has_translucency(surface)
+    if alpha:
+        return surface.convert_alpha()
+    surface = surface.convert()
+    if colorkey is not None:
+        if colorkey == -1:
+            colorkey = surface.get_at((0, 0))
+        surface.set_colorkey(colorkey, pygame.RLEACCEL if rle else 0)
+    return surface
+
+
+def load_image(path, alpha=None):
+    """Loads an image file converted by optimize()"""
+
+    return optimize(pygame.image.load(path), alpha)
+
+
+def diagnose(surface, target):
+    """Returns why blitting a surface onto a target is slow, None if it is not"""
+
+    flags = surface.get_flags()
+    if (
+        surface.get_bitsize() != target.get_bitsize()
+        or surface.get_masks()[:3] != target.get_masks()[:3]
+    ):
+        return "pixel format differs from the target, converted on every blit"
+    if flags & pygame.SRCALPHA:
+        if surface.get_colorkey() is not None:
+            return "colorkey on a per-pixel alpha surface"
+        if not has_translucency(surface):
+            return "per-pixel alpha on an opaque surface"
+    return None
+
+
+class BlitDiagnostics:
+    """Counts blits that take a slow path, grouped by sprite class
+
+    Every distinct surface is diagnosed once, the result is kept for as long
+    as the surface lives.
+    ...
+
+    Methods
+    -------
+    check(self, sprites, target)
+        Records the sprites about to be blitted onto a target.
+    report(self, file)
+        Prints the slow blits, most frequent first.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        # (sprite class, reason) -> number of blits
+        self.slow = {}
+        self.blits = 0
+        self._reasons = weakref.WeakKeyDictionary()
+
+    def check(self, sprites, target):
+        """Records the sprites about to be blitted onto a target"""
+
+        for sprite in sprites:
+            image = sprite.image
+            try:
+                reason = self._reasons[image]
+            except KeyError:
+                reason = self._reasons[image] = diagnose(image, target)
+            self.blits += 1
+            if reason is not None:
+                key = (type(sprite).__name__, reason)
+                self.slow[key] = self.slow.get(key, 0) + 1
+
+    def report(self, file=None):
+        """Prints the slow blits, most frequent first"""
+
+        file = file or sys.stdout
+        slow = sum(self.slow.values())
+        print(f"blit diagnostics: {slow} of {self.blits} blits slow", file=file)
+        for (name, reason), count in sorted(
+            self.slow.items(), key=lambda item: item[1], reverse=True
+        ):
+            print(f"  {count:10}  {name:<12} {reason}", file=file)
+
+
+blit_diagnostics = BlitDiagnostics(enabled=bool(os.environ.get(DIAGNOSTICS_ENV_VAR)))
@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import threading
+import pygame
+from assets import has_translucency
+from settings import ATLAS_MANIFEST_PATH
+
+# set LUNK_NO_ATLAS=1 to load every image from its own file
+NO_ATLAS_ENV_VAR = "LUNK_NO_ATLAS"
+MANIFEST_VERSION = 2
+SOURCE_PATH = "graphics"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+# smaller images share the packed pages, larger ones such as the ground get a
+# page of their own
+MAX_IMAGE_SIZE = 256
+PAGE_WIDTH = 512
+PADDING = 1
+
+
+def _image_paths(source):
+    atlas_folder = os.path.normpath(os.path.dirname(ATLAS_MANIFEST_PATH))
+    for folder, folders, files in os.walk(source):
+        folders.sort()
+        if os.path.normpath(folder) == atlas_folder:
+            continue
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                # the same form the game uses in import_image calls
+                yield os.path.join(folder, name).replace(os.sep, "/")
+
+
+def _source_stamp(path):
+    """Returns the size and modification time of an image file"""
+
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _key_by_color(image):
+    """Returns an image whose colorkey hides every pixel of the key color
+
+    The colorkey of a palette image only hides its own palette index, after
+    the convert() done when loading per file it hides every pixel of that
+    color, so pages are baked the same way.
+    """
+
+    colorkey = image.get_colorkey()
+    if colorkey is None or image.get_bitsize() > 8:
+        return image
+    copy = pygame.Surface(image.get_size(), 0, 32)
+    image.set_colorkey(None)
+    copy.blit(image, (0, 0))
+    copy.set_colorkey(colorkey)
+    return copy
+
+
+def pack(sizes, width):
+    """Packs rectangles into shelves of a fixed width
+
+    Parameters
+    ----------
+    sizes : dict
+        name -> (width, height)
+    width : int
+        page width, at least as wide as the widest rectangle
+
+    Returns
+    -------
+    tuple
+        name -> (x, y) and the page height
+    """
+
+    positions = {}
+    x = y = shelf_height = 0
+    # tallest first keeps the shelves full
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > width:
+            x = 0
+            y += shelf_height + PADDING
+            shelf_height = 0
+        positions[name] = (x, y)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def bake(source=SOURCE_PATH, manifest_path=ATLAS_MANIFEST_PATH):
+    """Bakes the images of a folder into atlas pages and a manifest
+
+    Small opaque images are packed into a page loaded without per-pixel alpha
+    and small translucent ones into a page loaded with it, so sprites keep
+    the surface format assets.optimize would give them. Larger images are
+    each saved as a page of their own. The manifest records the size and
+    modification time of every source file, images edited after baking are
+    loaded from their file instead.
+
+    Returns
+    -------
+    dict
+        the manifest that was written
+    """
+
+    images = {
+        path: _key_by_color(pygame.image.load(path)) for path in _image_paths(source)
+    }
+    output = os.path.dirname(manifest_path)
+    os.makedirs(output, exist_ok=True)
+    manifest = {"version": MANIFEST_VERSION, "pages": {}, "images": {}}
+
+    small = {
+        path: image
+        for path, image in images.items()
+        if max(image.get_size()) <= MAX_IMAGE_SIZE
+    }
+    for page, alpha in (("opaque", False), ("alpha", True)):
+        selected = {
+            path: image
+            for path, image in small.items()
+            if has_translucency(image) == alpha
+        }
+        if selected:
+            width = max(
+                PAGE_WIDTH, max(image.get_width() for image in selected.values())
+            )
+            _add_page(
+                manifest, output, page, selected, alpha, width, f"atlas_{page}.bmp"
+            )
+    # larger images get a page each, only read when the image is used
+    for path, image in images.items():
+        if path not in small:
+            file_name = os.path.splitext(path)[0].replace("/", "_") + ".bmp"
+            alpha = has_translucency(image)
+            width = image.get_width()
+            _add_page(manifest, output, path, {path: image}, alpha, width, file_name)
+
+    temporary = manifest_path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    os.replace(temporary, manifest_path)
+    return manifest
+
+
+def _add_page(manifest, output, page, selected, alpha, width, file_name):
+    """Saves images packed into one page and lists them in the manifest"""
+
+    sizes = {path: image.get_size() for path, image in selected.items()}
+    positions, height = pack(sizes, width)
+    flags = pygame.SRCALPHA if alpha else 0
+    surface = pygame.Surface((width, height), flags, 32)
+    # colorkeyed pixels end up black, as when a sheet is sliced at runtime
+    surface.fill((0, 0, 0, 0))
+    # translucent pixels are copied as they are instead of blended
+    blend = pygame.BLEND_RGBA_MAX if alpha else 0
+    for path, image in selected.items():
+        x, y = positions[path]
+        surface.blit(image, (x, y), special_flags=blend)
+        manifest["images"][path] = {
+            "page": page,
+            "rect": [x, y, *image.get_size()],
+            "source": _source_stamp(path),
+        }
+    # uncompressed, so loading a page is a single read without decoding
+    pygame.image.save(surface, os.path.join(output, file_name))
+    manifest["pages"][page] = {"file": file_name, "alpha": alpha}
+
+
+class Atlas:
+    """Baked atlas pages with named images
+
+    Only the manifest is read up front. A page is read and converted to the
+    display format the first time one of its images is asked for, in a
+    single read without decoding.
+
+    Methods
+    -------
+    image(self, path)
+        Returns the image baked from a file, None if it is not in the atlas.
+    page(self, name)
+        Returns a converted page, None if it could not be loaded.
+    """
+
+    def __init__(self, manifest_path=ATLAS_MANIFEST_PATH):
+        """Load the manifest, pages are loaded on first use
+
+        Raises
+        ------
+        ValueError
+            if the manifest was written by an unsupported version
+        """
+
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            self.manifest = json.load(manifest_file)
+        if self.manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"{manifest_path} needs to be baked again")
+        self.folder = os.path.dirname(manifest_path)
+        # page name -> converted surface, None when it failed to load
+        self.pages = {}
+        # the menu and the level loader thread can ask for images at once
+        self._lock = threading.Lock()
+
+    def image(self, path):
+        """Returns the image baked from a file, None if it is not in the atlas
+
+        Images whose file changed since the atlas was baked are not served,
+        so they are loaded from the file. The image is a subsurface of its
+        page and shares its pixels.
+        """
+
+        entry = self.manifest["images"].get(path)
+        if entry is None:
+            return None
+        try:
+            if _source_stamp(path) != entry["source"]:
+                return None
+        except OSError:
+            return None
+        page = self.page(entry["page"])
+        if page is None:
+            return None
+        return page.subsurface(entry["rect"])
+
+    def page(self, name):
+        """Returns a converted page, None if it could not be loaded"""
+
+        with self._lock:
+            if name not in self.pages:
+                self.pages[name] = self._load_page(name)
+            return self.pages[name]
+
+    def _load_page(self, name):
+        info = self.manifest["pages"][name]
+        try:
+            surface = pygame.image.load(os.path.join(self.folder, info["file"]))
+        except (OSError, pygame.error) as error:
+            print(f"Ignoring the asset atlas page {name}: {error}")
+            return None
+        return surface.convert_alpha() if info["alpha"] else surface.convert()
+
+
+_atlas = None
+_atlas_loaded = False
+_atlas_lock = threading.Lock()
+
+
+def default_atlas():
+    """Returns the baked atlas, None when it was not baked or is disabled"""
+
+    global _atlas, _atlas_loaded
+    with _atlas_lock:
+        if not _atlas_loaded:
+            _atlas_loaded = True
+            disabled = os.environ.get(NO_ATLAS_ENV_VAR)
+            if not disabled and os.path.exists(ATLAS_MANIFEST_PATH):
+                try:
+                    _atlas = Atlas()
+                except (OSError, ValueError, KeyError, pygame.error) as error:
+                    print(f"Ignoring the asset atlas: {error}")
+    return _atlas
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bake the images of graphics/ into an atlas"
+    )
+    parser.add_argument("--source", default=SOURCE_PATH)
+    parser.add_argument("--manifest", default=ATLAS_MANIFEST_PATH)
+    args = parser.parse_args()
+    manifest = bake(args.source, args.manifest)
+    print(
+        f"Baked {len(manifest['images'])} images into "
+        f"{len(manifest['pages'])} pages, {args.manifest}"
+    )
+
+
+if __name__ == "__main__":
+    main()
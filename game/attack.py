@@ -0,0 +1,40 @@
+import pygame
+from pool import PooledSprite
+from settings import TILESIZE
+
+ATTACK_SIZE = TILESIZE // 2
+ATTACK_COLOR = (255, 255, 255, 120)
+
+
+class Attack(PooledSprite):
+    """Short-lived attack area placed in front of the player
+
+    Attacks are spawned from the level attack pool. The surface is drawn once
+    when the sprite is first created and reused on every spawn.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.image = pygame.Surface((ATTACK_SIZE, ATTACK_SIZE), pygame.SRCALPHA)
+        pygame.draw.circle(
+            self.image, ATTACK_COLOR, self.image.get_rect().center, ATTACK_SIZE // 2
+        )
+        self.rect = self.image.get_rect()
+        self.hitbox = self.rect
+
+    def spawn(self, player, lifetime):
+        """Places the attack in front of the player
+
+        Parameters
+        ----------
+        player : Player
+            the attacking player
+        lifetime : int
+            milliseconds before the attack despawns
+        """
+
+        self.rect.center = (
+            player.hitbox.centerx + player.direction.x * TILESIZE // 2,
+            player.hitbox.centery + player.direction.y * TILESIZE // 2,
+        )
+        self.expires = pygame.time.get_ticks() + lifetime
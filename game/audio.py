@@ -0,0 +1,255 @@
+import queue
+import threading
+from collections import OrderedDict
+import pygame
+from settings import MIXER_BUFFER, SFX_CACHE_SIZE, SFX_CHANNELS
+
+
+class AudioManager:
+    """Non-blocking audio for music and sound effects
+
+    Opening the audio device and decoding sounds can take a noticeable amount
+    of time, so all of that happens on a worker thread. Requests made before
+    the mixer is ready are queued in order. Calls made from the game loop never
+    wait on the worker: a sound effect that is not loaded yet is skipped.
+    ...
+
+    Attributes
+    ----------
+    available : bool
+        false once the mixer failed to initialize, audio is then a no-op
+    channel_count : int
+        the size of the sound effect channel pool
+    cache_size : int
+        the maximum number of decoded sound effects kept in memory
+
+    Methods
+    -------
+    start(self)
+        Starts the worker thread and mixer initialization.
+    play_music(self, path, loops)
+        Streams a music file.
+    stop_music(self)
+        Stops the music stream.
+    preload(self, name, path)
+        Decodes a sound effect into the cache in the background.
+    play(self, name, priority)
+        Plays a cached sound effect on the channel pool.
+    wait_until_ready(self, timeout)
+        Blocks until the mixer is ready, only meant for tools.
+    close(self)
+        Stops the worker thread.
+    """
+
+    def __init__(self, channel_count=SFX_CHANNELS, cache_size=SFX_CACHE_SIZE):
+        """Initialize the manager without touching the audio device
+
+        Parameters
+        ----------
+            channel_count : int
+                number of channels reserved for sound effects
+            cache_size : int
+                maximum number of decoded sound effects to keep
+        """
+
+        self.channel_count = channel_count
+        self.cache_size = cache_size
+        self.available = True
+        self.channels = []
+
+        self._jobs = queue.Queue()
+        self._worker = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        # name -> path of every sound effect that was asked for
+        self._paths = {}
+        # name -> pygame.mixer.Sound, least recently played first
+        self._sounds = OrderedDict()
+        self._loading = set()
+        # names whose file failed to load, not retried until preloaded again
+        # with another path, so a missing file is reported once
+        self._failed = set()
+        # per channel (priority, start order) used for voice stealing
+        self._voices = []
+        self._played = 0
+
+    def start(self):
+        """Starts the worker thread if it is not running yet"""
+
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="audio", daemon=True)
+            self._worker.start()
+            self._jobs.put(self._init_mixer)
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """Blocks until the mixer is initialized
+
+        Only meant for tools and benchmarks, the game loop should never wait.
+        """
+
+        self.start()
+        return self._ready.wait(timeout)
+
+    def close(self):
+        """Stops the worker thread once queued jobs are done"""
+
+        if self._worker is not None:
+            self._jobs.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if not self.available:
+                continue
+            try:
+                job()
+            except (pygame.error, OSError) as e:
+                print(f"Audio error: {e}")
+
+    def _init_mixer(self):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(buffer=MIXER_BUFFER)
+        except pygame.error as e:
+            print(f"Unable to initialize audio, continuing without sound: {e}")
+            self.available = False
+            return
+        pygame.mixer.set_num_channels(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self._voices = [(0, 0)] * self.channel_count
+        self._ready.set()
+
+    def play_music(self, path, loops=0):
+        """Streams a music file, replacing the current track
+
+        Parameters
+        ----------
+        path : str
+            path of the music file
+        loops : int
+            number of repeats, -1 loops forever
+        """
+
+        self.start()
+        self._jobs.put(lambda: self._play_music(path, loops))
+
+    def _play_music(self, path, loops):
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.play(loops)
+
+    def stop_music(self):
+        """Stops the music stream
+
+        Queued like play_music, so a track queued before the mixer was ready
+        does not start after this call.
+        """
+
+        self.start()
+        self._jobs.put(pygame.mixer.music.stop)
+
+    def preload(self, name, path):
+        """Decodes a short sound effect into the cache in the background
+
+        Parameters
+        ----------
+        name : str
+            the name the effect is played by
+        path : str
+            path of the sound file
+        """
+
+        self.start()
+        with self._lock:
+            if self._paths.get(name) != path:
+                self._failed.discard(name)
+        self._paths[name] = path
+        self._queue_load(name)
+
+    def _queue_load(self, name):
+        with self._lock:
+            if name in self._sounds or name in self._loading or name in self._failed:
+                return
+            self._loading.add(name)
+        self._jobs.put(lambda: self._load(name))
+
+    def _load(self, name):
+        try:
+            sound = pygame.mixer.Sound(self._paths[name])
+        except (pygame.error, OSError):
+            with self._lock:
+                self._failed.add(name)
+            raise
+        finally:
+            with self._lock:
+                self._loading.discard(name)
+        with self._lock:
+            self._sounds[name] = sound
+            self._sounds.move_to_end(name)
+            while len(self._sounds) > self.cache_size:
+                self._sounds.popitem(last=False)
+
+    def play(self, name, priority=0):
+        """Plays a sound effect on the channel pool
+
+        Never blocks. If the effect is not decoded yet (or was evicted from
+        the cache) it is loaded in the background and this call is skipped.
+        Effects that failed to load are skipped without loading them again.
+        When every channel is busy, the oldest voice with the lowest priority
+        not above this one is stolen.
+
+        Parameters
+        ----------
+        name : str
+            name given to preload()
+        priority : int
+            voices only steal channels from voices with equal or lower priority
+
+        Returns
+        -------
+        pygame.mixer.Channel or None
+            the channel the effect plays on, None if it was skipped
+        """
+
+        if not self.ready:
+            return None
+        with self._lock:
+            sound = self._sounds.get(name)
+            if sound is not None:
+                self._sounds.move_to_end(name)
+        if sound is None:
+            if name in self._paths:
+                self._queue_load(name)
+            return None
+
+        index = self._pick_channel(priority)
+        if index is None:
+            return None
+        self._played += 1
+        self._voices[index] = (priority, self._played)
+        channel = self.channels[index]
+        channel.play(sound)
+        return channel
+
+    def _pick_channel(self, priority):
+        steal = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+            voice = self._voices[index]
+            if voice[0] > priority:
+                continue
+            if steal is None or voice < self._voices[steal]:
+                steal = index
+        return steal
+
+
+# shared instance, the mixer is only opened on first use
+audio_manager = AudioManager()
@@ -0,0 +1,163 @@
+class BroadPhase:
+    """Sort-and-sweep broad phase for entity vs entity interactions
+
+    Sprite groups are registered in pairs together with a callback. Once per
+    tick update() gathers every sprite in the registered groups, sorts them by
+    the left edge of their hitbox and sweeps along the x axis. Only sprites
+    whose x intervals overlap are tested on the y axis, so the cost grows with
+    the number of entities plus the number of near pairs instead of n².
+    ...
+
+    Attributes
+    ----------
+    checks : int
+        number of narrow phase rect tests done during the last update
+    contacts : int
+        number of callbacks fired during the last update
+
+    Methods
+    -------
+    register(self, group_a, group_b, callback)
+        Calls callback(sprite_a, sprite_b) for each overlapping pair.
+    unregister(self, group_a, group_b)
+        Removes a previously registered group pair.
+    update(self)
+        Finds the overlapping pairs and fires the callbacks.
+    """
+
+    def __init__(self):
+        """Initialize an empty broad phase"""
+
+        self.groups = []
+        self.pairs = []
+        self.checks = 0
+        self.contacts = 0
+        # group bit -> bitmask of the group bits it is paired with
+        self._partners = []
+        # sprite group bitmask -> bitmask of every partner group
+        self._reach = {}
+
+    def _group_bit(self, group):
+        for index, registered in enumerate(self.groups):
+            if registered is group:
+                return 1 << index
+        self.groups.append(group)
+        self._partners.append(0)
+        return 1 << (len(self.groups) - 1)
+
+    def register(self, group_a, group_b, callback):
+        """Registers a callback for a pair of sprite groups
+
+        The callback is called as callback(sprite_a, sprite_b) with sprite_a
+        from group_a and sprite_b from group_b. A group may be paired with
+        itself, in which case each overlapping pair is reported once.
+
+        Parameters
+        ----------
+        group_a : pygame.sprite.Group
+            first group of the pair
+        group_b : pygame.sprite.Group
+            second group of the pair
+        callback : callable
+            called with both sprites whenever their hitboxes overlap
+        """
+
+        bit_a = self._group_bit(group_a)
+        bit_b = self._group_bit(group_b)
+        self.pairs.append((bit_a, bit_b, callback))
+        self._rebuild_partners()
+
+    def unregister(self, group_a, group_b):
+        """Removes every callback registered for the group pair"""
+
+        bit_a = self._group_bit(group_a)
+        bit_b = self._group_bit(group_b)
+        self.pairs = [
+            pair
+            for pair in self.pairs
+            if (pair[0], pair[1]) not in ((bit_a, bit_b), (bit_b, bit_a))
+        ]
+        self._rebuild_partners()
+
+    def _rebuild_partners(self):
+        self._partners = [0] * len(self.groups)
+        for bit_a, bit_b, _ in self.pairs:
+            self._partners[bit_a.bit_length() - 1] |= bit_b
+            self._partners[bit_b.bit_length() - 1] |= bit_a
+        self._reach = {}
+
+    def _reach_of(self, mask):
+        reach = 0
+        index = 0
+        while mask:
+            if mask & 1:
+                reach |= self._partners[index]
+            mask >>= 1
+            index += 1
+        return reach
+
+    def _dispatch(self, sprite_a, mask_a, sprite_b, mask_b):
+        for bit_a, bit_b, callback in self.pairs:
+            if mask_a & bit_a and mask_b & bit_b:
+                callback(sprite_a, sprite_b)
+                self.contacts += 1
+            elif mask_a & bit_b and mask_b & bit_a:
+                callback(sprite_b, sprite_a)
+                self.contacts += 1
+
+    def update(self):
+        """Finds overlapping pairs and fires their callbacks
+
+        Will be run once per game tick.
+
+        Returns
+        -------
+        int
+            the number of callbacks fired
+        """
+
+        self.checks = 0
+        self.contacts = 0
+        if not self.pairs:
+            return 0
+
+        # a sprite may be in several registered groups, so merge memberships
+        masks = {}
+        for index, group in enumerate(self.groups):
+            bit = 1 << index
+            for sprite in group:
+                masks[sprite] = masks.get(sprite, 0) | bit
+
+        entries = []
+        for sprite, mask in masks.items():
+            box = getattr(sprite, "hitbox", sprite.rect)
+            reach = self._reach.get(mask)
+            if reach is None:
+                reach = self._reach[mask] = self._reach_of(mask)
+            entries.append((box.left, box, sprite, mask, reach))
+        entries.sort(key=_left_edge)
+
+        active = []
+        checks = 0
+        for left, box, sprite, mask, reach in entries:
+            still_active = []
+            for other in active:
+                other_box = other[1]
+                # sorted by left edge, so anything ending here never returns
+                if other_box.right <= left:
+                    continue
+                still_active.append(other)
+                if not (reach & other[3]):
+                    continue
+                checks += 1
+                if other_box.top < box.bottom and box.top < other_box.bottom:
+                    self._dispatch(other[2], other[3], sprite, mask)
+            still_active.append((left, box, sprite, mask, reach))
+            active = still_active
+
+        self.checks = checks
+        return self.contacts
+
+
+def _left_edge(entry):
+    return entry[0]
@@ -0,0 +1,188 @@
+import argparse
+import sys
+import pygame
+from animstate import STATUSES
+from events import EventBus
+from level1 import YSortCameraGroup
+from replication import (
+    KIND_ATTACK,
+    KIND_DAMSEL,
+    KIND_ENEMY,
+    KIND_PLANT,
+    KIND_PLAYER,
+    KIND_WALL,
+    LENGTH,
+    decode,
+)
+from server import open_socket
+from settings import FPS, SERVER_ADDRESS, WINDOW_HEIGHT, WINDOW_WIDTH
+from snapshot import NO_STATUS
+from spriteSheet import SpriteSheet
+from support import import_image
+
+SPRITE_WIDTH = 16
+SPRITE_HEIGHT = 20
+# sprite sheet row of every walking direction
+SHEET_ROWS = {"down": 0, "left": 1, "right": 2, "up": 3}
+
+
+def load_sheet_animations(path):
+    """Loads the walking strips of a player or damsel sprite sheet"""
+
+    sheet = SpriteSheet(path)
+    return {
+        status: sheet.load_strip(
+            (0, SPRITE_HEIGHT * row, SPRITE_WIDTH, SPRITE_HEIGHT), 3, (0, 0, 0)
+        )
+        for status, row in SHEET_ROWS.items()
+    }
+
+
+class RemoteSprite(pygame.sprite.Sprite):
+    """Client side stand-in for an entity replicated by the server"""
+
+    def __init__(self, groups, frames):
+        super().__init__(groups)
+        # status name -> list of frames, a single "" entry for static images
+        self.frames = frames
+        self.image = next(iter(frames.values()))[0]
+        self.rect = self.image.get_rect()
+
+    def apply(self, x, y, status, frame):
+        """Updates the sprite from the replicated state"""
+
+        frames = self.frames.get("")
+        if frames is None:
+            name = STATUSES[status] if status != NO_STATUS else "down"
+            # idle and attack states have no art yet, use the walking strip
+            frames = self.frames.get(name.split("_")[0]) or self.frames["down"]
+        self.image = frames[frame % len(frames)]
+        self.rect = self.image.get_rect(topleft=(x, y))
+
+
+class LevelClient:
+    """Thin client that renders snapshots from a LevelServer
+
+    The client runs no game logic. Decoded entities are kept as RemoteSprites
+    in a YSortCameraGroup, so they are drawn exactly like the local game
+    draws its level.
+    ...
+
+    Methods
+    -------
+    receive(self)
+        Reads and applies every complete snapshot without blocking.
+    run(self)
+        Draws the latest state once per frame until the window is closed.
+    """
+
+    def __init__(self, address):
+        self.sock = open_socket(address, listen=False)
+        self.sock.setblocking(False)
+        self.incoming = bytearray()
+        self.state = {}
+        self.sprites = {}
+        self.player_id = None
+        self.tick = 0
+        self.visible_sprites = YSortCameraGroup()
+
+        attack_image = pygame.Surface((SPRITE_WIDTH, SPRITE_WIDTH), pygame.SRCALPHA)
+        attack_image.fill((255, 255, 255, 120))
+        self.frames = {
+            KIND_WALL: {"": [import_image("graphics/wall/wall.png")]},
+            KIND_PLANT: {"": [import_image("graphics/plant2/plant2.png")]},
+            KIND_ENEMY: {"": [import_image("graphics/enemy1/enemy1animation1.png")]},
+            KIND_PLAYER: load_sheet_animations("graphics/player/playerWalking.png"),
+            KIND_DAMSEL: load_sheet_animations("graphics/damsel/damselWalking.png"),
+            KIND_ATTACK: {"": [attack_image]},
+        }
+
+    def receive(self):
+        """Reads and applies every complete snapshot without blocking
+
+        Returns
+        -------
+        bool
+            false once the server closed the connection
+        """
+
+        while True:
+            try:
+                chunk = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                return False
+            self.incoming += chunk
+
+        offset = 0
+        while len(self.incoming) - offset >= LENGTH.size:
+            length = LENGTH.unpack_from(self.incoming, offset)[0]
+            start = offset + LENGTH.size
+            end = start + length
+            if len(self.incoming) < end:
+                break
+            self.apply(memoryview(self.incoming)[start:end])
+            offset = end
+        del self.incoming[:offset]
+        return True
+
+    def apply(self, body):
+        """Applies one snapshot body to the sprites"""
+
+        self.tick, self.player_id, created, updated, removed = decode(self.state, body)
+        body.release()
+        for entity_id in created:
+            kind = self.state[entity_id][0]
+            self.sprites[entity_id] = RemoteSprite(
+                [self.visible_sprites], self.frames[kind]
+            )
+        for entity_id in created + updated:
+            _, x, y, status, frame = self.state[entity_id]
+            self.sprites[entity_id].apply(x, y, status, frame)
+        for entity_id in removed:
+            self.sprites.pop(entity_id).kill()
+
+    def stop(self, event=None):
+        self.running = False
+
+    def run(self):
+        """Draws the latest state once per frame until the window is closed"""
+
+        clock = pygame.time.Clock()
+        screen = pygame.display.get_surface()
+        events = EventBus()
+        events.subscribe(pygame.QUIT, self.stop)
+        self.running = True
+        while self.running:
+            events.pump()
+            if not self.receive():
+                print("Server closed the connection")
+                return
+            screen.fill("black")
+            player = self.sprites.get(self.player_id)
+            if player is not None:
+                self.visible_sprites.custom_draw(player)
+            pygame.display.update()
+            clock.tick(FPS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a headless Lunk server")
+    parser.add_argument(
+        "--connect",
+        default=SERVER_ADDRESS,
+        help='"host:port" or "unix:/path" (default %(default)s)',
+    )
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Lunk Game - spectator")
+    LevelClient(args.connect).run()
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,18 @@ import pygame
 import random
 import time
 from spriteSheet import SpriteSheet
-from entity import Entity
+from entity import EVERY_TICK, Entity
+from animstate import DOWN, LEFT, RIGHT, UP, WALKING, AnimatedState
 
 # consts for damsel
 SPRITE_WIDTH = 16
 SPRITE_HEIGHT = 20
 
+# (direction component, value) a damsel faces, indexed by its heading
+FACING = ((1, -1), (1, 1), (0, -1), (0, 1))
 
-class Damsel(Entity):
+
+class Damsel(AnimatedState, Entity):
     """Damsel in distress that the player saves
     Each damsel is initialized with their starting position,
     which sprite groups it is part of, boundary sprites,
@@ -26,7 +30,7 @@ class Damsel(Entity):
         Updates state based on movement logic.
     set_image_direction(self, image)
         Updates the image sprite based on the current direction.
-    animate(self)
+    animate(self, ticks=1)
         Controls animation loop.
     collision_check(self, direction)
         Handles interaction with environment.
@@ -34,7 +38,14 @@ class Damsel(Entity):
         Update damsel with current game state information.
     """
 
-    def __init__(self, pos, groups, obstacle_sprites):
+    def __init__(
+        self,
+        pos,
+        groups,
+        obstacle_sprites,
+        schedule=EVERY_TICK,
+        animation_schedule=EVERY_TICK,
+    ):
         """Initialize a Damsel with level info
 
         Each damsel is initialized with their starting position,
@@ -49,6 +60,8 @@ class Damsel(Entity):
                 which groups in level it is a part of
             obstacle_sprites : list of sprite groups
                 which sprites in the level damsel cannot walk through
+            schedule, animation_schedule : UpdateSchedule
+                how often the damsel moves and animates
         """
 
         super().__init__(groups)
@@ -69,11 +82,22 @@ class Damsel(Entity):
         random.seed(time.time())
         self.timer = 100
 
-        self.obstacle_sprites = obstacle_sprites
+        self.obstacleSprites = obstacle_sprites
+
+        # moved and animated every few ticks when the quality governor asks
+        self.schedule = schedule
+        self.animationSchedule = animation_schedule
+        self.phase = schedule.next_phase()
+        self.ticks = 1
 
         # starting position is facing down
         self.direction.y = 1
-        self.status = "down"
+        self.state = DOWN
+        self.import_damsel_assets()
+
+    def reload_assets(self):
+        """Slices the animations again from the reloaded sprite sheet"""
+
         self.import_damsel_assets()
 
     def import_damsel_assets(self):
@@ -84,21 +108,23 @@ class Damsel(Entity):
         walkingLeftRect = (0, SPRITE_HEIGHT, SPRITE_WIDTH, SPRITE_HEIGHT)
         walkingRightRect = (0, SPRITE_HEIGHT * 2, SPRITE_WIDTH, SPRITE_HEIGHT)
 
-        # animation states in dictionary
-        self.animations = {
-            "up": self.damselAnimations.load_strip(
-                walkingUpRect, 3, self.colorKeyBlack
-            ),
-            "down": self.damselAnimations.load_strip(
-                walkingDownRect, 3, self.colorKeyBlack
-            ),
-            "left": self.damselAnimations.load_strip(
-                walkingLeftRect, 3, self.colorKeyBlack
-            ),
-            "right": self.damselAnimations.load_strip(
-                walkingRightRect, 3, self.colorKeyBlack
-            ),
-        }
+        # animation frames indexed by state
+        self.animations = WALKING.frame_table(
+            {
+                "up": self.damselAnimations.load_strip(
+                    walkingUpRect, 3, self.colorKeyBlack
+                ),
+                "down": self.damselAnimations.load_strip(
+                    walkingDownRect, 3, self.colorKeyBlack
+                ),
+                "left": self.damselAnimations.load_strip(
+                    walkingLeftRect, 3, self.colorKeyBlack
+                ),
+                "right": self.damselAnimations.load_strip(
+                    walkingRightRect, 3, self.colorKeyBlack
+                ),
+            }
+        )
 
     def move(self, speed):
         """Handles movement of the damsel
@@ -111,7 +137,7 @@ class Damsel(Entity):
             the multiplier for changing the sprite position.
         """
 
-        self.timer += 1
+        self.timer += self.ticks
         # update direction every 100 ticks. Still moves every tick
         if self.timer >= 10:
             # update/randomize direction
@@ -129,15 +155,7 @@ class Damsel(Entity):
                 self.direction.y = 1
             self.timer = 0
 
-        # prevent diagonal moving from increasing speed
-        if self.direction.magnitude() != 0:
-            self.direction = self.direction.normalize()
-        # update hitbox based on move speed
-        self.hitbox.x += self.direction.x * speed
-        self.collision_check("horizontal")
-        self.hitbox.y += self.direction.y * speed
-        self.collision_check("vertical")
-        self.rect.center = self.hitbox.center
+        self.move_hitbox(speed)
 
     def set_status_by_curr_direction(self):
         """Sets the correct status based on the current direction
@@ -146,15 +164,14 @@ class Damsel(Entity):
         what the status should be.
         """
 
-        # will only display "up" and "down". Need to rework
-        if self.direction.x > 0 and self.status != "right":
-            self.status = "right"
-        elif self.direction.x < 0 and self.status != "left":
-            self.status = "left"
-        if self.direction.y > 0 and self.status != "down":
-            self.status = "down"
-        elif self.direction.y < 0 and self.status != "up":
-            self.status = "up"
+        # vertical movement wins, so mostly "up" and "down" are displayed
+        y = self.direction.y
+        if y:
+            self.state = DOWN if y > 0 else UP
+        else:
+            x = self.direction.x
+            if x:
+                self.state = RIGHT if x > 0 else LEFT
 
     def set_image_direction(self, image):
         """Sets a new image to the correct cardinal direction
@@ -167,30 +184,22 @@ class Damsel(Entity):
             image facing the current direction that will be displayed
         """
 
-        if self.status == "right":
-            self.direction.x = 1
-            direction = "x"
-        if self.status == "left":
-            self.direction.x = -1
-            direction = "x"
-        if self.status == "up":
-            self.direction.y = -1
-            direction = "y"
-        if self.status == "down":
-            self.direction.y = 1
-            direction = "y"
-
-        if direction == "y":
-            return pygame.transform.rotate(image, self.direction.y)
-        if direction == "x":
-            return pygame.transform.rotate(image, self.direction.x)
-
-    def animate(self):
-        """Method to loop through damsel animations"""
-
-        animation = self.animations[self.status]
+        axis, value = FACING[self.state % len(FACING)]
+        self.direction[axis] = value
+        return pygame.transform.rotate(image, value)
+
+    def animate(self, ticks=1):
+        """Method to loop through damsel animations
+
+        Parameters
+        ----------
+        ticks : int
+            the number of ticks since the previous frame was shown
+        """
+
+        animation = self.animations[self.state]
         # loop over fram index
-        self.frameIndex += self.animationSpeed
+        self.frameIndex += self.animationSpeed * ticks
 
         if self.frameIndex >= len(animation):
             self.frameIndex = 0
@@ -201,41 +210,23 @@ class Damsel(Entity):
     def collision_check(self, direction):
         """Method to handle interaction with environment
 
-        Parameter required for vertical and horizontal checking.
+        The swept movement already left the hitbox flush against the obstacle,
+        so the damsel keeps her heading and slides along the obstacle until her
+        next change of direction.
 
         Parameters
         ----------
         direction : string
-            used to determine horizontal/vertical check.
+            the axis the movement was stopped on, horizontal or vertical.
         """
 
-        # horizontal collision detection
-        if direction == "horizontal":
-            # look at all obstacle sprites
-            for sprite in self.obstacle_sprites:
-                # check if rects collide
-                if sprite.hitbox.colliderect(self.hitbox):
-                    # check direction of collision
-                    if self.direction.x > 0:  # moving right
-                        self.hitbox.right = sprite.hitbox.left
-                    if self.direction.x < 0:  # moving left
-                        self.hitbox.left = sprite.hitbox.right
-
-        # vertical collision detection
-        if direction == "vertical":
-            # look at all sprites
-            for sprite in self.obstacle_sprites:
-                # check if rects collide
-                if sprite.hitbox.colliderect(self.hitbox):
-                    # check direction of collision
-                    if self.direction.y < 0:  # moving up
-                        self.hitbox.top = sprite.hitbox.bottom
-                    if self.direction.y > 0:  # moving down
-                        self.hitbox.bottom = sprite.hitbox.top
-
     def update(self):
         """Update status. Will be run every game tick"""
 
-        self.set_status_by_curr_direction()
-        self.animate()
-        self.move(self.speed)
+        frames = self.animationSchedule.due(self.phase)
+        if frames:
+            self.set_status_by_curr_direction()
+            self.animate(frames)
+        self.ticks = self.schedule.due(self.phase)
+        if self.ticks:
+            self.move(self.speed * self.ticks)
@@ -1,10 +1,15 @@
 import pygame
 
-pygame.init()
-font = pygame.font.Font(None, 30)
+# created on first use so importing this module has no side effects
+font = None
 
 
 def debug(info, y=10, x=10):
+    global font
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(None, 30)
     display_surface = pygame.display.get_surface()
     debug_surf = font.render(str(info), True, "White")
     debug_rect = debug_surf.get_rect(topleft=(x, y))
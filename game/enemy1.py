@@ -1,7 +1,7 @@
-import pygame
 import random
 import time
-from entity import Entity
+from entity import EVERY_TICK, Entity
+from support import import_image
 
 
 class Enemy1(Entity):
@@ -11,11 +11,9 @@ class Enemy1(Entity):
     in the docs. Still uses Entity's collision_check method.
     """
 
-    def __init__(self, pos, groups, obstacle_sprites):
+    def __init__(self, pos, groups, obstacle_sprites, schedule=EVERY_TICK):
         super().__init__(groups)
-        self.image = pygame.image.load(
-            "graphics/enemy1/enemy1animation1.png"
-        ).convert_alpha()
+        self.image = import_image("graphics/enemy1/enemy1animation1.png")
         self.rect = self.image.get_rect(topleft=pos)
         # modify model rect to be a slightly less tall hitbox.
         # this will be used for movement.
@@ -26,8 +24,13 @@ class Enemy1(Entity):
         self.obstacleSprites = obstacle_sprites
         self.timer = 100
 
+        # updated every few ticks when the quality governor asks for it
+        self.schedule = schedule
+        self.phase = schedule.next_phase()
+        self.ticks = 1
+
     def move(self, speed):
-        self.timer += 1
+        self.timer += self.ticks
         # update direction every 100 ticks. Still moves every tick
         if self.timer >= 10:
             # update/randomize direction
@@ -45,50 +48,22 @@ class Enemy1(Entity):
                 self.direction.y = 1
             self.timer = 0
 
-        # prevent diagonal moving from increasing speed
-        if self.direction.magnitude() != 0:
-            self.direction = self.direction.normalize()
-        # update
-        self.hitbox.x += self.direction.x * speed
-        self.collision_check("horizontal")
-        self.hitbox.y += self.direction.y * speed
-        self.collision_check("vertical")
-        self.rect.center = self.hitbox.center
+        self.move_hitbox(speed)
 
     def collision_check(self, direction):
-        """Collision check for entity
+        """Collision response for the enemy
 
-        Handles collision checks for entities and other entities/the environment.
-        Prevents entity from moving through obstacles.
+        The swept movement already left the hitbox flush against the obstacle,
+        so the enemy keeps its heading and slides along the obstacle until its
+        next change of direction.
 
         Parameters
         ----------
         direction: str
-            the axis to check for collisions on. It can be 'horizontal' or 'vertical'.
+            the axis the movement was stopped on. It can be 'horizontal' or 'vertical'.
         """
 
-        # horizontal collision detection
-        if direction == "horizontal":
-            # look at all sprites
-            for sprite in self.obstacleSprites:
-                # check if rects collide
-                if sprite.hitbox.colliderect(self.hitbox):
-                    # check direction of collision
-                    if self.direction.x > 0:  # moving right
-                        self.hitbox.right = sprite.hitbox.left
-                    if self.direction.x < 0:  # moving left
-                        self.hitbox.left = sprite.hitbox.right
-        # vertical collision detection
-        if direction == "vertical":
-            # look at all sprites
-            for sprite in self.obstacleSprites:
-                # check if rects collide
-                if sprite.hitbox.colliderect(self.hitbox):
-                    # check direction of collision
-                    if self.direction.y < 0:  # moving up
-                        self.hitbox.top = sprite.hitbox.bottom
-                    if self.direction.y > 0:  # moving down
-                        self.hitbox.bottom = sprite.hitbox.top
-
     def update(self):
-        self.move(self.speed)
+        self.ticks = self.schedule.due(self.phase)
+        if self.ticks:
+            self.move(self.speed * self.ticks)
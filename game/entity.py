@@ -1,4 +1,5 @@
 import pygame
+from itertools import count
 from settings import TILESIZE
 from abc import (
     ABC,
@@ -23,13 +24,20 @@ class Entity(pygame.sprite.Sprite, ABC):
         of -1 to 1 where 0 means no movement.
     speed : int
         the speed at which the sprite moves
+    subpixel : pygame.math.Vector2
+        offset of the exact position from the hitbox, so slow movement adds up
+        instead of being rounded away every step
 
     Methods
     -------
     move(self, speed)
         Handles movement of the entity
+    move_hitbox(self, speed)
+        Moves the hitbox along the current heading, stopping at obstacles
     collision_check(self, direction)
-        Handles the collision check for entities
+        Handles the response to running into an obstacle
+    reload_assets(self)
+        Rebuilds surfaces made from images that were reloaded
     """
 
     def __init__(self, groups):
@@ -40,6 +48,9 @@ class Entity(pygame.sprite.Sprite, ABC):
         self.animationSpeed = 0.15
         self.direction = pygame.math.Vector2()
         self.speed = 0
+        self.subpixel = pygame.math.Vector2()
+        # hitbox position the subpixel offset belongs to
+        self.subpixelAnchor = None
 
     def move(self, speed):
         """Handles movement of the entity
@@ -54,16 +65,7 @@ class Entity(pygame.sprite.Sprite, ABC):
             the multiplier for changing the sprite position.
         """
 
-        # prevent diagonal moving from increasing speed
-        # check if vector has magnitude
-        if self.direction.magnitude() != 0:
-            self.direction = self.direction.normalize()
-        # update position
-        self.hitbox.x += self.direction.x * speed
-        self.collision_check("horizontal")
-        self.hitbox.y += self.direction.y * speed
-        self.collision_check("vertical")
-        self.rect.center = self.hitbox.center
+        self.move_hitbox(speed)
 
         # if we go beyond the map size, wrap around to the other side.
         # Need to test hitbox collisions if wrap around into a wall or enemy..
@@ -72,19 +74,115 @@ class Entity(pygame.sprite.Sprite, ABC):
         if self.hitbox.y >= self.mapSize.y * TILESIZE:
             self.hitbox.y = TILESIZE
 
+    def reload_assets(self):
+        """Rebuilds surfaces made from images that were reloaded
+
+        Entities that slice their frames from a sprite sheet override this,
+        surfaces shared through the image cache are updated in place.
+        """
+
+        pass
+
+    def move_hitbox(self, speed):
+        """Moves the hitbox along the current heading, stopping at obstacles
+
+        The whole step is swept against the obstacle grid in one query, so the
+        hitbox never tunnels through an obstacle however large the step is.
+        collision_check is called once per axis the movement was stopped on.
+
+        Parameters
+        ----------
+        speed : int
+            the multiplier for changing the sprite position.
+        """
+
+        # prevent diagonal moving from increasing speed
+        # check if vector has magnitude
+        if self.direction.magnitude() != 0:
+            self.direction = self.direction.normalize()
+        # the offset is stale once the hitbox was placed somewhere else, such
+        # as by a wrap around or a respawn
+        if self.hitbox.topleft != self.subpixelAnchor:
+            self.subpixel.update(0, 0)
+        # update position
+        hit_x, hit_y = self.obstacleSprites.sweep(
+            self.hitbox,
+            self.direction.x * speed,
+            self.direction.y * speed,
+            self.subpixel,
+        )
+        self.subpixelAnchor = self.hitbox.topleft
+        if hit_x:
+            self.collision_check("horizontal")
+        if hit_y:
+            self.collision_check("vertical")
+        self.rect.center = self.hitbox.center
+
     @abstractmethod
     def collision_check(self, direction):
-        """Handles the collision check for entities
+        """Handles the response to running into an obstacle
 
         This method should be implemented in any child classes that use it.
-        The method should handle the following:
-        Handles collision checks for entities and other entities/the environment.
-        Prevents entity from moving through obstacles.
+        It is called by move_hitbox after the swept movement was stopped by an
+        obstacle, with the hitbox already placed flush against it, and should
+        update the heading of the entity as needed.
 
         Parameters
         ----------
         direction: str
-            the axis to check for a collision on
+            the axis the movement was stopped on, 'horizontal' or 'vertical'
         """
 
         raise Exception("Not Implemented")
+
+
+class UpdateSchedule:
+    """Spreads work that runs every few ticks evenly over the ticks
+
+    Each user takes a phase from the schedule, users with consecutive phases
+    run on consecutive ticks, so with an interval of 3 a third of them run on
+    every tick instead of all of them on one tick in three.
+    ...
+
+    Methods
+    -------
+    next_phase(self)
+        Returns the phase for a new user of the schedule.
+    advance(self)
+        Moves the schedule to the next tick.
+    due(self, phase)
+        Returns the number of ticks to catch up, 0 when not due this tick.
+    """
+
+    def __init__(self, interval=1):
+        self.interval = interval
+        self.tick = 0
+        self._phases = count()
+
+    def next_phase(self):
+        """Returns the phase for a new user of the schedule"""
+
+        return next(self._phases)
+
+    def advance(self):
+        """Moves the schedule to the next tick, called once per tick"""
+
+        self.tick += 1
+
+    def due(self, phase):
+        """Returns the number of ticks to catch up, 0 when not due this tick
+
+        Work that only runs every few ticks should cover that many ticks when
+        it runs, such as moving that much further, so the game runs at the
+        same speed whatever the interval. Movement keeps its subpixel
+        remainder, see Entity.subpixel, so a step of speed * ticks covers the
+        same distance as that many steps of speed.
+        """
+
+        if (self.tick + phase) % self.interval:
+            return 0
+        return self.interval
+
+
+# runs every tick, for sprites created without a schedule
+EVERY_TICK = UpdateSchedule()
@@ -0,0 +1,94 @@
+import pygame
+
+
+class EventBus:
+    """Single owner of the event queue with typed, filtered subscribers
+
+    The queue is drained once per frame by pump() and every event is handed
+    to the subscribers of its type, so no part of the game can consume events
+    another part needs. Only event types somebody subscribed to are allowed
+    into the queue, SDL drops the rest before they are ever converted into
+    pygame events. QUIT is always allowed so the window can be closed.
+    ...
+
+    Attributes
+    ----------
+    dispatched : int
+        events handed to at least one subscriber by the last pump()
+
+    Methods
+    -------
+    subscribe(self, event_type, callback, **filters)
+        Calls callback with every event of a type whose attributes match.
+    unsubscribe(self, event_type, callback)
+        Stops calling a callback for a type.
+    pump(self)
+        Drains the queue and dispatches every event.
+    """
+
+    def __init__(self):
+        # event type -> list of (callback, filters)
+        self.subscribers = {}
+        self.dispatched = 0
+        self._update_allowed()
+
+    def subscribe(self, event_type, callback, **filters):
+        """Calls callback with every event of a type whose attributes match
+
+        Parameters
+        ----------
+        event_type : int
+            a pygame event type such as pygame.MOUSEBUTTONDOWN
+        callback : callable
+            called with the event
+        **filters
+            event attributes that must be equal, e.g. button=1 or key=K_SPACE
+        """
+
+        self.subscribers.setdefault(event_type, []).append((callback, filters))
+        self._update_allowed()
+
+    def unsubscribe(self, event_type, callback):
+        """Stops calling a callback for a type"""
+
+        remaining = [
+            entry
+            for entry in self.subscribers.get(event_type, [])
+            if entry[0] != callback
+        ]
+        if remaining:
+            self.subscribers[event_type] = remaining
+        else:
+            self.subscribers.pop(event_type, None)
+        self._update_allowed()
+
+    def pump(self):
+        """Drains the queue and dispatches every event
+
+        Returns
+        -------
+        int
+            the number of events handed to at least one subscriber
+        """
+
+        dispatched = 0
+        for event in pygame.event.get():
+            handled = False
+            # copied, callbacks may subscribe or unsubscribe while dispatching
+            for callback, filters in list(self.subscribers.get(event.type, ())):
+                if all(
+                    getattr(event, name, None) == value
+                    for name, value in filters.items()
+                ):
+                    callback(event)
+                    handled = True
+            dispatched += handled
+        self.dispatched = dispatched
+        return dispatched
+
+    def _update_allowed(self):
+        if not pygame.display.get_init():
+            return
+        # block everything, then allow back what is subscribed to
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, *self.subscribers])
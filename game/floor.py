@@ -0,0 +1,158 @@
+import pygame
+
+
+class FloorRenderer:
+    """Viewport sized floor cache that scrolls with the camera
+
+    The floor is painted into a surface the size of the viewport. When the
+    camera moves, the cached pixels are shifted in place with Surface.scroll()
+    and only the newly exposed strips are painted, so the per frame cost is a
+    single viewport blit no matter how big the world is.
+
+    The floor is painted from a ground image sliced at the camera position,
+    from a tile repeated across the world, or both (ground over tiles). Tiles
+    are skipped where an opaque ground image already covers the area.
+    ...
+
+    Attributes
+    ----------
+    surface : pygame.Surface
+        the cached floor for the current camera position
+    origin : tuple or None
+        world position of the cache top left corner, None when it is stale
+
+    Methods
+    -------
+    resize(self, size)
+        Changes the viewport size.
+    invalidate(self)
+        Forces the whole viewport to be painted on the next draw.
+    invalidate_world_rect(self, rect)
+        Repaints the part of the cache showing a world rect.
+    draw(self, target, offset)
+        Scrolls the cache to the camera offset and blits it.
+    """
+
+    def __init__(self, size, ground=None, tile=None, background="black"):
+        """Initialize the floor cache
+
+        Parameters
+        ----------
+            size : tuple
+                viewport width and height in pixels
+            ground : pygame.Surface
+                image covering the world from (0, 0), sliced at the camera
+            tile : pygame.Surface
+                image repeated across the whole world
+            background : color
+                fill used where neither ground nor tile cover the world
+        """
+
+        self.ground = ground
+        self.tile = tile
+        self.background = background
+        self.resize(size)
+
+    def resize(self, size):
+        """Changes the viewport size, the cache is repainted on next draw"""
+
+        self.surface = pygame.Surface(size).convert()
+        self.origin = None
+
+    def invalidate(self):
+        """Forces the whole viewport to be painted on the next draw"""
+
+        self.origin = None
+
+    def invalidate_world_rect(self, rect):
+        """Repaints the part of the cache that shows a world rect
+
+        Used when the ground or tile image changed under part of the world.
+        """
+
+        if self.origin is None:
+            return
+        area = pygame.Rect(rect).move(-self.origin[0], -self.origin[1])
+        area = area.clip(self.surface.get_rect())
+        if area.width and area.height:
+            self._paint(area)
+
+    def draw(self, target, offset):
+        """Scrolls the cache to the camera offset and blits it onto target
+
+        Parameters
+        ----------
+        target : pygame.Surface
+            the surface the floor is drawn on
+        offset : pygame.math.Vector2
+            world position of the top left corner of the viewport
+        """
+
+        x = int(offset[0])
+        y = int(offset[1])
+        width, height = self.surface.get_size()
+
+        if self.origin is None:
+            self.origin = (x, y)
+            self._paint(self.surface.get_rect())
+        elif self.origin != (x, y):
+            dx = x - self.origin[0]
+            dy = y - self.origin[1]
+            self.origin = (x, y)
+            if abs(dx) >= width or abs(dy) >= height:
+                self._paint(self.surface.get_rect())
+            else:
+                # shift what is still visible, then paint the exposed strips
+                self.surface.scroll(-dx, -dy)
+                if dx > 0:
+                    self._paint(pygame.Rect(width - dx, 0, dx, height))
+                elif dx < 0:
+                    self._paint(pygame.Rect(0, 0, -dx, height))
+                if dy > 0:
+                    self._paint(pygame.Rect(0, height - dy, width, dy))
+                elif dy < 0:
+                    self._paint(pygame.Rect(0, 0, width, -dy))
+
+        target.blit(self.surface, (0, 0))
+
+    def _paint(self, area):
+        """Paints an area of the cache, given in cache coordinates"""
+
+        origin_x, origin_y = self.origin
+        world = area.move(origin_x, origin_y)
+        if self.tile is None or self._ground_covers(world):
+            self.surface.fill(self.background, area)
+        else:
+            self._paint_tiles(area, origin_x, origin_y)
+        if self.ground is not None:
+            self.surface.blit(self.ground, area.topleft, world)
+
+    def _ground_covers(self, world):
+        """Whether the ground image hides everything under a world rect"""
+
+        if self.ground is None or self.ground.get_flags() & pygame.SRCALPHA:
+            return False
+        return self.ground.get_rect().contains(world)
+
+    def _paint_tiles(self, area, origin_x, origin_y):
+        tile_width, tile_height = self.tile.get_size()
+        left = area.left + origin_x
+        top = area.top + origin_y
+        first_col = left // tile_width
+        last_col = (left + area.width - 1) // tile_width
+        first_row = top // tile_height
+        last_row = (top + area.height - 1) // tile_height
+
+        self.surface.set_clip(area)
+        self.surface.blits(
+            [
+                (
+                    self.tile,
+                    (col * tile_width - origin_x, row * tile_height - origin_y),
+                )
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)
+            ],
+            doreturn=False,
+        )
+        self.surface.set_clip(None)
@@ -0,0 +1,268 @@
+import numpy
+import pygame
+from settings import FOG_COLOR, FOG_REVEAL_RADIUS, TILESIZE
+
+# fog of a tile, unexplored tiles are hidden
+HIDDEN = 1
+REVEALED = 0
+# overlay color of revealed tiles, drawn transparent
+COLORKEY = (255, 0, 255)
+
+
+class FogOfWar:
+    """Exploration fog over the tile grid, stored as a NumPy array
+
+    The fog is one byte per tile, indexed [col, row] like surfarray. Tiles
+    within the reveal radius of the player are cleared with one masked array
+    assignment per tile the player steps on, and the tiles cleared since the
+    last frame are tracked as a dirty rect.
+
+    Drawing composites a single overlay the size of the viewport plus a
+    tile. Like the floor cache, the overlay is scrolled when the camera
+    crosses a tile boundary and only the exposed strips and the dirty tiles
+    are written, through surfarray.pixels2d. Hidden tiles are opaque, so the
+    overlay is colorkeyed rather than per pixel alpha, about twice as fast
+    to blit. Only the part of the overlay around hidden tiles is blitted,
+    nothing once the view holds no fog.
+    ...
+
+    Attributes
+    ----------
+    hidden : numpy.ndarray
+        fog of every tile, HIDDEN or REVEALED
+    revealed : int
+        number of tiles revealed so far
+
+    Methods
+    -------
+    resize(self, size, tile_size)
+        Changes the viewport size and the pixels per tile.
+    set_map_size(self, map_size)
+        Resizes the grid, keeping the explored tiles that are still on it.
+    reveal(self, col, row)
+        Clears the fog around a tile.
+    draw(self, target, offset)
+        Blits the fog of the tiles in view.
+    """
+
+    def __init__(
+        self,
+        map_size,
+        view_size,
+        radius=FOG_REVEAL_RADIUS,
+        color=FOG_COLOR,
+        tile_size=TILESIZE,
+    ):
+        """Initialize a fully hidden map
+
+        Parameters
+        ----------
+            map_size : tuple
+                map width and height in tiles
+            view_size : tuple
+                viewport width and height in pixels
+            radius : int
+                tiles revealed around the player
+            color : color
+                color of the fog
+            tile_size : int
+                pixels per tile on the viewport
+        """
+
+        self.color = color
+        self.radius = radius
+        offsets = numpy.arange(-radius, radius + 1)
+        self.disc = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius**2
+        self.hidden = numpy.full(
+            (int(map_size[0]), int(map_size[1])), HIDDEN, numpy.uint8
+        )
+        self.revealed = 0
+        # tiles revealed since the last draw, in tiles
+        self.dirty = None
+        self.last_tile = None
+        self.resize(view_size, tile_size)
+
+    def resize(self, size, tile_size=TILESIZE):
+        """Changes the viewport size, the overlay is rewritten on next draw
+
+        Parameters
+        ----------
+        size : tuple
+            viewport width and height in pixels
+        tile_size : int
+            pixels per tile on the viewport, below TILESIZE when the world is
+            drawn at a lower resolution
+        """
+
+        self.tile_size = tile_size
+        columns = -(-size[0] // tile_size) + 1
+        rows = -(-size[1] // tile_size) + 1
+        self.overlay = pygame.Surface((columns * tile_size, rows * tile_size)).convert()
+        self.overlay.set_colorkey(COLORKEY)
+        # mapped overlay pixel of REVEALED and HIDDEN
+        self.pixels = numpy.array(
+            [self.overlay.map_rgb(COLORKEY), self.overlay.map_rgb(self.color)],
+            numpy.uint32,
+        )
+        # tiles shown by the overlay, None when it is stale
+        self.window = None
+        # overlay pixels blitted, None when no tile in view is hidden
+        self.fog_area = None
+
+    def set_map_size(self, map_size):
+        """Resizes the grid, keeping the explored tiles that are still on it"""
+
+        hidden = numpy.full((int(map_size[0]), int(map_size[1])), HIDDEN, numpy.uint8)
+        width = min(hidden.shape[0], self.hidden.shape[0])
+        height = min(hidden.shape[1], self.hidden.shape[1])
+        hidden[:width, :height] = self.hidden[:width, :height]
+        self.hidden = hidden
+        self.revealed = int(numpy.count_nonzero(hidden == REVEALED))
+        self.dirty = None
+        self.last_tile = None
+        self.window = None
+
+    def reveal(self, col, row):
+        """Clears the fog within the reveal radius of a tile
+
+        Does nothing while the tile is the same as on the last call.
+
+        Returns
+        -------
+        int
+            the number of tiles revealed
+        """
+
+        if (col, row) == self.last_tile:
+            return 0
+        self.last_tile = (col, row)
+
+        radius = self.radius
+        width, height = self.hidden.shape
+        left, right = max(col - radius, 0), min(col + radius + 1, width)
+        top, bottom = max(row - radius, 0), min(row + radius + 1, height)
+        if left >= right or top >= bottom:
+            return 0
+        area = pygame.Rect(left, top, right - left, bottom - top)
+        window = self.hidden[_slices(area)]
+        disc = self.disc[_slices(area.move(radius - col, radius - row))]
+        newly = disc & (window != REVEALED)
+        count = int(numpy.count_nonzero(newly))
+        if count:
+            window[newly] = REVEALED
+            self.revealed += count
+            self.dirty = area if self.dirty is None else self.dirty.union(area)
+        return count
+
+    def draw(self, target, offset):
+        """Blits the fog of the tiles in view onto target
+
+        Parameters
+        ----------
+        target : pygame.Surface
+            the surface the level is drawn on
+        offset : pygame.math.Vector2
+            top left corner of the viewport in target pixels, the world
+            position when tiles are drawn at TILESIZE
+        """
+
+        tile_size = self.tile_size
+        x = int(offset[0])
+        y = int(offset[1])
+        col = x // tile_size
+        row = y // tile_size
+        columns = self.overlay.get_width() // tile_size
+        rows = self.overlay.get_height() // tile_size
+
+        window = self.window
+        if window is None:
+            self.window = pygame.Rect(col, row, columns, rows)
+            self._paint(self.window)
+        elif window.topleft != (col, row):
+            dx = col - window.x
+            dy = row - window.y
+            self.window = pygame.Rect(col, row, columns, rows)
+            if abs(dx) >= columns or abs(dy) >= rows:
+                self._paint(self.window)
+            else:
+                # shift what is still in view, then write the exposed strips
+                self.overlay.scroll(-dx * tile_size, -dy * tile_size)
+                if dx > 0:
+                    self._paint(pygame.Rect(col + columns - dx, row, dx, rows))
+                elif dx < 0:
+                    self._paint(pygame.Rect(col, row, -dx, rows))
+                if dy > 0:
+                    self._paint(pygame.Rect(col, row + rows - dy, columns, dy))
+                elif dy < 0:
+                    self._paint(pygame.Rect(col, row, columns, -dy))
+        if self.dirty is not None:
+            area = self.dirty.clip(self.window)
+            self.dirty = None
+            if area.width and area.height:
+                self._paint(area)
+                window = None
+        if window is not self.window:
+            # the tiles in view changed
+            self.fog_area = self._fog_area()
+
+        area = self.fog_area
+        if area is not None:
+            target.blit(
+                self.overlay,
+                (col * tile_size - x + area.x, row * tile_size - y + area.y),
+                area,
+            )
+
+    def _fog_area(self):
+        """Returns the overlay pixels around the hidden tiles, None for no fog"""
+
+        tile_size = self.tile_size
+        width, height = self.hidden.shape
+        on_map = self.window.clip(0, 0, width, height)
+        hidden = self.hidden[_slices(on_map)]
+        cols = numpy.flatnonzero(hidden.any(1))
+        if not len(cols):
+            return None
+        rows = numpy.flatnonzero(hidden.any(0))
+        return pygame.Rect(
+            (on_map.left - self.window.left + int(cols[0])) * tile_size,
+            (on_map.top - self.window.top + int(rows[0])) * tile_size,
+            int(cols[-1] - cols[0] + 1) * tile_size,
+            int(rows[-1] - rows[0] + 1) * tile_size,
+        )
+
+    def _paint(self, area):
+        """Writes the fog of an area of the window, given in tiles
+
+        Tiles off the map are drawn without fog.
+        """
+
+        tiles = numpy.zeros((area.width, area.height), numpy.uint8)
+        width, height = self.hidden.shape
+        on_map = area.clip(0, 0, width, height)
+        if on_map.width and on_map.height:
+            tiles[_slices(on_map.move(-area.left, -area.top))] = self.hidden[
+                _slices(on_map)
+            ]
+
+        # the area in overlay pixels
+        tile_size = self.tile_size
+        pixel_area = pygame.Rect(
+            (area.left - self.window.left) * tile_size,
+            (area.top - self.window.top) * tile_size,
+            area.width * tile_size,
+            area.height * tile_size,
+        )
+        # written row by row, in the memory order of the surface
+        pixels = pygame.surfarray.pixels2d(self.overlay).T
+        pixels[_slices(pixel_area)[::-1]] = (
+            self.pixels[tiles.T].repeat(tile_size, 0).repeat(tile_size, 1)
+        )
+        # releases the lock on the overlay
+        del pixels
+
+
+def _slices(rect):
+    """Returns the column and row slices of a rect, for [col, row] arrays"""
+
+    return slice(rect.left, rect.right), slice(rect.top, rect.bottom)
@@ -1,42 +1,200 @@
+# imported first so the startup tracer can time every other import
+from startup import tracer
+import argparse
 import pygame
 import sys
-from settings import FPS, WINDOW_HEIGHT, WINDOW_WIDTH
+import time
+from settings import (
+    FPS,
+    QUALITY_LEVELS,
+    RENDER_SCALE,
+    RENDER_SMOOTH,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+)
 from level1 import Level
+from allocprofile import alloc_profiler
+from render_target import RenderTarget
+from assets import blit_diagnostics
+from events import EventBus
+from governor import QualityGovernor
+from hotreload import HotReloader
+from scenes import LevelLoader, MenuScene, SceneManager
+from telemetry import Telemetry
 
 
 class Game:
-    def __init__(self):
-        # general setup
-        pygame.init()
-        # display setup
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Lunk Game")
-        pygame.display.set_icon(self.screen)
+    def __init__(self, telemetry_path=None, map_path=None, watch=False, quality=None):
+        # general setup, only the display is needed for the first frame.
+        # fonts, the mixer and the level are initialized on first use.
+        with tracer.span("init", "display"):
+            pygame.display.init()
+            # display setup
+            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption("Lunk Game")
+            pygame.display.set_icon(self.screen)
+        # the world is drawn here and upscaled onto the screen once per frame
+        self.render_target = RenderTarget(self.screen, RENDER_SCALE, RENDER_SMOOTH)
         self.clock = pygame.time.Clock()
-        self.level = Level()
-        # self.level = MainMenu()
+        # the only reader of the event queue, everything else subscribes
+        self.events = EventBus()
+        self.events.subscribe(pygame.QUIT, self.quit)
+        # per frame measurements, only collected when a file is given
+        self.telemetry = Telemetry(telemetry_path) if telemetry_path else None
+        # steps quality down when frames take too long, unless a level is given
+        self.governor = None
+        self.quality = quality or 0
+        if quality is None:
+            self.governor = QualityGovernor(on_change=self.apply_quality)
+
+        # the level is built in the background while the menu is showing
+        self.map_path = map_path
+        self._level = None
+        # applies edited maps and images to the running level
+        self.watch = watch
+        self.hot_reload = None
+        self.loader = LevelLoader(self.build_level)
+        self.loader.start()
+        self.scenes = SceneManager()
+        self.scenes.switch(MenuScene(self))
+
+    def build_level(self, progress=None):
+        """Builds the level, called on the loader thread"""
+
+        with tracer.span("init", "level"):
+            return Level(
+                self.render_target.surface,
+                self.map_path,
+                progress,
+                self.render_target.scale,
+            )
+
+    @property
+    def level(self):
+        """The level, waits for the loader if it is still being built"""
+
+        if self._level is None:
+            self._level = self.loader.result()
+            self.apply_quality(self.quality)
+            if self.watch:
+                self.hot_reload = HotReloader(self._level).start()
+        return self._level
+
+    def set_render_scale(self, scale, smooth=None):
+        """Changes the render resolution while running, see RenderTarget"""
+
+        self.render_target.set_scale(scale, smooth)
+        if self._level is not None:
+            self._level.set_surface(
+                self.render_target.surface, self.render_target.scale
+            )
+
+    def apply_quality(self, quality):
+        """Applies the settings of a quality level, see QUALITY_LEVELS"""
+
+        self.quality = quality
+        settings = QUALITY_LEVELS[quality]
+        # the level render scale multiplies the configured one
+        scale = RENDER_SCALE * settings["render_scale"]
+        if scale != self.render_target.scale:
+            self.set_render_scale(scale)
+        if self._level is not None:
+            self._level.set_quality(
+                settings["npc_interval"],
+                settings["animation_interval"],
+                settings["rotation_step"],
+            )
+
+    def quit(self, event=None):
+        if self.telemetry:
+            self.telemetry.close()
+        if blit_diagnostics.enabled:
+            blit_diagnostics.report()
+        if alloc_profiler.enabled:
+            alloc_profiler.report()
+        pygame.quit()
+        sys.exit()
 
     def run(self):
         while True:
-            # check game events
-            for event in pygame.event.get():
-                # quit game
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-            self.screen.fill("black")
-            # run level
-            self.level.run()
-            # event handler for menu selection
-            # if self.menu_selection == 1:
+            frame_start = time.perf_counter()
+            # check game events, dispatched to their subscribers
+            with alloc_profiler.section("events"):
+                self.events.pump()
+            if self.hot_reload:
+                self.hot_reload.poll()
+
+            # run the menu, transition or level
+            dirty = self.scenes.run()
 
             # update display based on events
-            pygame.display.update()
+            with alloc_profiler.section("display"):
+                if dirty is None:
+                    pygame.display.update()
+                elif dirty:
+                    pygame.display.update(dirty)
+            tracer.first_frame()
+            work_ms = (time.perf_counter() - frame_start) * 1000
             self.clock.tick(FPS)
+            if self.governor and self._level is not None:
+                self.governor.record(work_ms)
+            if self._level is not None:
+                alloc_profiler.end_frame()
+            if self.telemetry and self._level is not None:
+                frame_ms = (time.perf_counter() - frame_start) * 1000
+                self.telemetry.set_map(self.level.map_name)
+                self.telemetry.record_level(self.level, frame_ms, work_ms, self.quality)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Lunk Game")
+    parser.add_argument(
+        "--telemetry",
+        metavar="PATH",
+        help="write per frame measurements to a JSONL file, see telemetry.py",
+    )
+    parser.add_argument(
+        "--map",
+        metavar="PATH",
+        help="play a map CSV instead of the default map, see mapgen.py",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="reload the map and graphics when their files change",
+    )
+    parser.add_argument(
+        "--blit-diagnostics",
+        action="store_true",
+        help="list sprite blits that take a slow path when the game exits",
+    )
+    parser.add_argument(
+        "--profile-allocs",
+        action="store_true",
+        help="attribute the allocations of every frame to game sections and "
+        "sprite classes, the report is printed when the game exits",
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        choices=range(len(QUALITY_LEVELS)),
+        help="keep a fixed quality level, 0 is the best, instead of adapting it "
+        "to the frame time",
+    )
+    args = parser.parse_args()
+    if args.blit_diagnostics:
+        blit_diagnostics.enabled = True
+    if args.profile_allocs:
+        alloc_profiler.start()
+    game = Game(
+        telemetry_path=args.telemetry,
+        map_path=args.map,
+        watch=args.watch,
+        quality=args.quality,
+    )
+    game.run()
 
 
 # Start of program
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    main()
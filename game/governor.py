@@ -0,0 +1,139 @@
+from settings import (
+    FPS,
+    QUALITY_DOWN_THRESHOLD,
+    QUALITY_LEVELS,
+    QUALITY_UP_THRESHOLD,
+    QUALITY_UP_WINDOWS,
+    QUALITY_WINDOW,
+)
+from telemetry import percentile
+
+
+class QualityGovernor:
+    """Steps quality settings down and up to hold the frame budget
+
+    The work time of every frame, the time spent before waiting for the next
+    frame, is collected over a window of frames. At the end of a window the
+    90th percentile is compared to the frame budget: above
+    QUALITY_DOWN_THRESHOLD of it the next lower quality level is applied
+    right away, below QUALITY_UP_THRESHOLD of it for QUALITY_UP_WINDOWS
+    windows in a row the next higher one is. The gap between the thresholds
+    and the extra windows before stepping up keep the governor from
+    oscillating between two levels, and starting a new window after a change
+    lets the change show in the measurements before the next decision.
+    ...
+
+    Attributes
+    ----------
+    level : int
+        index of the current quality level, 0 is the best
+    settings : dict
+        the settings of the current level
+    changes : list of tuple
+        (frame, old level, new level, p90 work ms) of every change
+
+    Methods
+    -------
+    record(self, work_ms)
+        Adds the work time of a frame, returns whether the level changed.
+    set_level(self, level)
+        Applies a quality level.
+    metrics(self)
+        Returns the governor state for telemetry and debugging.
+    """
+
+    def __init__(
+        self,
+        levels=QUALITY_LEVELS,
+        budget_ms=1000 / FPS,
+        window=QUALITY_WINDOW,
+        on_change=None,
+    ):
+        """Initialize the governor at the best quality level
+
+        Parameters
+        ----------
+            levels : sequence of dict
+                quality settings, best first
+            budget_ms : float
+                the frame budget
+            window : int
+                frames measured before each decision
+            on_change : callable or None
+                called with the index of the new level on every change
+        """
+
+        self.levels = levels
+        self.budget_ms = budget_ms
+        self.window = window
+        self.on_change = on_change
+        self.level = 0
+        self.frames = 0
+        self.changes = []
+        self.last_p90 = 0.0
+        self._work_ms = []
+        self._fast_windows = 0
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def record(self, work_ms):
+        """Adds the work time of a frame, returns whether the level changed"""
+
+        self.frames += 1
+        self._work_ms.append(work_ms)
+        if len(self._work_ms) < self.window:
+            return False
+
+        self._work_ms.sort()
+        p90 = self.last_p90 = percentile(self._work_ms, 0.9)
+        self._work_ms.clear()
+        if p90 > self.budget_ms * QUALITY_DOWN_THRESHOLD:
+            self._fast_windows = 0
+            return self.set_level(self.level + 1)
+        if p90 < self.budget_ms * QUALITY_UP_THRESHOLD:
+            self._fast_windows += 1
+            if self._fast_windows >= QUALITY_UP_WINDOWS:
+                self._fast_windows = 0
+                return self.set_level(self.level - 1)
+        else:
+            self._fast_windows = 0
+        return False
+
+    def set_level(self, level):
+        """Applies a quality level, clamped to the known levels
+
+        Returns
+        -------
+        bool
+            whether the level changed
+        """
+
+        level = min(max(level, 0), len(self.levels) - 1)
+        if level == self.level:
+            return False
+        self.changes.append((self.frames, self.level, level, self.last_p90))
+        self.level = level
+        self._work_ms.clear()
+        if self.on_change is not None:
+            self.on_change(level)
+        return True
+
+    def metrics(self):
+        """Returns the governor state for telemetry and debugging
+
+        Returns
+        -------
+        dict
+            the current level and its settings, the 90th percentile work time
+            of the last window, the frame budget and the number of changes
+        """
+
+        return {
+            "level": self.level,
+            "p90_ms": self.last_p90,
+            "budget_ms": self.budget_ms,
+            "changes": len(self.changes),
+            **self.settings,
+        }
@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+from xml.etree import ElementTree
+import pygame
+from settings import HOT_RELOAD_INTERVAL
+from spriteSheet import SpriteSheet
+from support import import_layout, reload_image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+GRAPHICS_PATH = "graphics"
+
+
+class FileWatcher:
+    """Polls files and folders for changes on a background thread
+
+    Only modification times and sizes are compared, so no platform specific
+    file notification API is needed. Changed paths are collected until the
+    main thread asks for them with changes().
+    """
+
+    def __init__(self, paths, interval=HOT_RELOAD_INTERVAL):
+        """Initialize the watcher
+
+        Parameters
+        ----------
+            paths : list of str
+                files, and folders watched recursively
+            interval : float
+                seconds between scans
+        """
+
+        self.paths = list(paths)
+        self.interval = interval
+        self._changed = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._snapshot = self.scan()
+        self._thread = threading.Thread(
+            target=self._poll, name="file watcher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def scan(self):
+        """Returns path -> (modification time, size) of every watched file"""
+
+        found = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                for folder, _, files in os.walk(path):
+                    for name in files:
+                        self._stat(os.path.join(folder, name), found)
+            else:
+                self._stat(path, found)
+        return found
+
+    def changes(self):
+        """Returns the paths changed since the previous call, oldest first"""
+
+        changed = []
+        while True:
+            try:
+                path = self._changed.get_nowait()
+            except queue.Empty:
+                return changed
+            if path not in changed:
+                changed.append(path)
+
+    def _stat(self, path, found):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        found[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            snapshot = self.scan()
+            for path, stamp in snapshot.items():
+                if self._snapshot.get(path) != stamp:
+                    self._changed.put(path)
+            self._snapshot = snapshot
+
+
+class HotReloader:
+    """Applies edited maps and images to a running level
+
+    The map file of the level and the graphics folder are watched. An edited
+    map only rebuilds the tiles whose wall or plant changed; an edited image
+    is reloaded into the shared image cache in place, so walls, plants and
+    enemies pick it up without being touched and sprites that slice frames
+    from a sprite sheet slice them again. Entity state is never reset.
+    ...
+
+    Methods
+    -------
+    poll(self)
+        Applies the changes found since the previous call.
+    """
+
+    def __init__(self, level, paths=None, interval=HOT_RELOAD_INTERVAL):
+        self.level = level
+        if paths is None:
+            paths = [GRAPHICS_PATH]
+            if level.map_path:
+                paths.append(level.map_path)
+        self.watcher = FileWatcher(paths, interval)
+
+    def start(self):
+        self.watcher.start()
+        return self
+
+    def stop(self):
+        self.watcher.stop()
+
+    def poll(self):
+        """Applies the changes found since the previous call, once per frame"""
+
+        for path in self.watcher.changes():
+            map_path = self.level.map_path
+            if map_path and os.path.normpath(map_path) == path:
+                self.reload_map(path)
+            elif path.lower().endswith(IMAGE_EXTENSIONS):
+                self.reload_image(path)
+
+    def reload_map(self, path):
+        try:
+            world_map = import_layout(path)
+        except (OSError, ValueError, ElementTree.ParseError) as error:
+            # the editor may still be writing the file, the next save retries
+            print(f"Could not reload {path}: {error}")
+            return
+        if not world_map:
+            return
+        changed = self.level.reload_map(world_map)
+        print(f"Reloaded {path}: {changed} tiles rebuilt")
+
+    def reload_image(self, path):
+        try:
+            replaced = reload_image(path)
+        except (pygame.error, OSError) as error:
+            # the editor may still be writing the file, the next save retries
+            print(f"Could not reload {path}: {error}")
+            return
+        if not replaced:
+            return
+        swapped = {old: new for old, new in replaced}
+        group = self.level.visible_sprites
+        for sprite in group:
+            sheets = [
+                value
+                for value in vars(sprite).values()
+                if isinstance(value, SpriteSheet)
+            ]
+            for sheet in sheets:
+                if sheet.sheet in swapped:
+                    sheet.sheet = swapped[sheet.sheet]
+                    sprite.reload_assets()
+            if sprite.image in swapped:
+                sprite.image = swapped[sprite.image]
+        group.floor_surface = swapped.get(group.floor_surface, group.floor_surface)
+        group.floor_tile = swapped.get(group.floor_tile, group.floor_tile)
+        # rescales the floor and drops sprite images scaled before the swap
+        group.reload_images()
+        print(f"Reloaded {path}")
@@ -1,33 +1,75 @@
+from operator import attrgetter
+import os
+import weakref
 import pygame
-from settings import TILESIZE, LOOP_MUSIC
+from settings import (
+    ATTACK_POOL_SIZE,
+    FOG_ENABLED,
+    TILESIZE,
+    LEVEL_MUSIC_PATH,
+    LOOP_MUSIC,
+    LINE_OF_SIGHT_RADIUS,
+)
 from wall import Wall
 from plant import Plant
 from player import Player
 from enemy1 import Enemy1
 from damsel import Damsel
+from broadphase import BroadPhase
+from obstacles import ObstacleGroup
+from audio import audio_manager
+from startup import tracer
+from support import import_image, import_layout
+from assets import blit_diagnostics
+from floor import FloorRenderer
+from pool import SpritePool
+from attack import Attack
+from lineofsight import OPAQUE_TILES, LineOfSight
+from population import SPAWN_TILES, Population
+from entity import UpdateSchedule
+from fog import FogOfWar
+from allocprofile import alloc_profiler
+
+
+# map tiles that are built as static sprites
+STATIC_TILES = ("x", "t")
 
 
 class Level:
-    def __init__(self):
-        # display surface
-        self.display_surface = pygame.display.get_surface()
+    def __init__(self, surface=None, map_path=None, progress=None, scale=1):
+        # called with the fraction of the level built so far, the level can be
+        # built on a loader thread while a menu is showing
+        self.progress = progress or _ignore_progress
+        # surface the level is drawn on, the display unless told otherwise
+        self.display_surface = surface or pygame.display.get_surface()
         # sprite groups
-        self.visible_sprites = YSortCameraGroup()
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.visible_sprites = YSortCameraGroup(self.display_surface, scale)
+        self.obstacle_sprites = ObstacleGroup()
         self.enemy_sprites = pygame.sprite.Group()
         self.friendly_spriites = pygame.sprite.Group()
         self.attack_sprites = pygame.sprite.Group()
+        self.player_sprites = pygame.sprite.GroupSingle()
+
+        # entity vs entity interactions, gameplay registers group pair callbacks
+        self.interactions = BroadPhase()
 
-        # background music
-        self.mixer = pygame.mixer
-        self.mixer.init()
-        self.mixer.music.load(
-            "levels/level_data/inspiring-cinematic-ambient-116199.ogg", "ogg"
+        # short-lived attack sprites are recycled instead of created and killed
+        self.attack_pool = SpritePool(
+            Attack, [self.visible_sprites, self.attack_sprites], ATTACK_POOL_SIZE
         )
-        self.mixer.music.play(LOOP_MUSIC)
+
+        # npcs of the map, only the ones near the camera are simulated
+        self.population = Population(self)
+        # how often npcs move and sprites animate, lowered by the quality
+        # governor when frames take too long
+        self.npc_schedule = UpdateSchedule()
+        self.animation_schedule = UpdateSchedule()
+
+        # background music, started by start() when the level is entered
+        self.audio = audio_manager
 
         # default world map
-        # KEY: x = wall, p = player
+        # KEY: x = wall, t = plant, e = enemy, d = damsel, p = player
         self.world_map = [
             [
                 "x",
@@ -470,11 +512,42 @@ class Level:
                 "x",
             ],
         ]
+        self.map_path = map_path
+        self.map_name = "default"
+        if map_path:
+            # map CSV using the same legend, e.g. written by mapgen.py, or a
+            # Tiled map
+            self.world_map = import_layout(map_path)
+            self.map_name = os.path.splitext(os.path.basename(map_path))[0]
         # map size in number of 64 pixels = (20x, 20y size)
-        self.map_size = pygame.math.Vector2(20, 20)
+        self.map_size = pygame.math.Vector2(
+            max(len(row) for row in self.world_map), len(self.world_map)
+        )
+
+        # "can A see B" queries against the walls and plants of the map
+        self.line_of_sight = LineOfSight(self.world_map)
+        if LINE_OF_SIGHT_RADIUS:
+            self.line_of_sight.precompute(LINE_OF_SIGHT_RADIUS)
+        # explored tiles, revealed around the player as it moves
+        self.fog = None
+        if FOG_ENABLED:
+            self.fog = FogOfWar(
+                self.map_size,
+                self.display_surface.get_size(),
+                tile_size=self.visible_sprites.tile_size,
+            )
+        self.progress(0.1)
 
         # sprite setup
-        self.create_map()
+        with tracer.span("init", "create_map"):
+            self.create_map()
+        self.progress(1.0)
+
+    def start(self):
+        """Starts the level music, called when the level is entered"""
+
+        # streamed once the audio manager has the mixer open
+        self.audio.play_music(LEVEL_MUSIC_PATH, LOOP_MUSIC)
 
     def create_map(self):
         """Creates a map based on a level matrix
@@ -482,78 +555,342 @@ class Level:
         This method turns the level matrix into a map of objects to be used
         by other classes.
         """
+        player_pos = None
+        # (col, row) -> the wall or plant sprite of a tile
+        self.static_tiles = {}
+        # called with (col, row, tile) whenever a static tile changes
+        self.tile_listeners = []
+        rows = len(self.world_map)
         for row_index, row in enumerate(self.world_map):  # in enumerate(WORLD_MAP)
+            self.progress(0.1 + 0.9 * row_index / rows)
             for col_index, col in enumerate(row):  # in enumerate(row)
                 x = col_index * TILESIZE
                 y = row_index * TILESIZE
-                if col == "x":
-                    Wall((x, y), [self.visible_sprites, self.obstacle_sprites])
-
-                if col == "t":
-                    Plant((x, y), [self.visible_sprites, self.obstacle_sprites])
-
-                if col == "e":
-                    Enemy1(
-                        (x, y),
-                        [self.visible_sprites, self.enemy_sprites],
-                        self.obstacle_sprites,
-                    )
-
-                if col == "d":
-                    Damsel(
-                        (x, y),
-                        [self.visible_sprites, self.friendly_spriites],
-                        self.obstacle_sprites,
-                    )
+                if col in STATIC_TILES:
+                    self.place_static(col_index, row_index, col)
+
+                if col in SPAWN_TILES:
+                    # spawned by the population manager as the camera nears
+                    self.population.add(SPAWN_TILES[col], (x, y))
+
+                if col == "p":
+                    player_pos = (x, y)
         sizeOfLandBlock = 64
+        # the default map keeps its original start, map files place the player
+        if self.map_name == "default":
+            player_pos = (sizeOfLandBlock * 8, sizeOfLandBlock * 14)
+        elif player_pos is None:
+            player_pos = self.first_open_tile()
 
         # pass in map size so player can do wrap around if needed
         self.player = Player(
-            (sizeOfLandBlock * 8, sizeOfLandBlock * 14),
-            [self.visible_sprites],
+            player_pos,
+            [self.visible_sprites, self.player_sprites],
             self.obstacle_sprites,
             self.map_size,
+            self.animation_schedule,
+        )
+        self.population.refresh(self.player.rect.center)
+        self.reveal()
+
+    def first_open_tile(self):
+        """Returns the world position of the first floor tile of the map"""
+
+        for row_index, row in enumerate(self.world_map):
+            for col_index, col in enumerate(row):
+                if col not in STATIC_TILES:
+                    return (col_index * TILESIZE, row_index * TILESIZE)
+        return (0, 0)
+
+    def place_static(self, col, row, tile):
+        """Replaces the wall or plant sprite of a tile, None for floor"""
+
+        old = self.static_tiles.pop((col, row), None)
+        if old is not None:
+            old.kill()
+        groups = [self.visible_sprites, self.obstacle_sprites]
+        pos = (col * TILESIZE, row * TILESIZE)
+        if tile == "x":
+            self.static_tiles[(col, row)] = Wall(pos, groups)
+        elif tile == "t":
+            self.static_tiles[(col, row)] = Plant(pos, groups)
+        for listener in self.tile_listeners:
+            listener(col, row, tile)
+
+    def set_tile(self, col, row, tile):
+        """Changes a static tile of the map at runtime
+
+        Only the sprite of that tile and the line of sight grid are updated,
+        entities keep their state.
+        """
+
+        self.place_static(col, row, tile)
+        self.world_map[row][col] = tile
+        self.line_of_sight.set_tile(col, row, tile in OPAQUE_TILES)
+
+    def reload_map(self, world_map):
+        """Applies an edited version of the map in place
+
+        Only tiles whose wall or plant changed are rebuilt. Entity markers are
+        ignored, so enemies, damsels and the player keep their state.
+
+        Returns
+        -------
+        int
+            the number of tiles rebuilt
+        """
+
+        old_map = self.world_map
+        width = max(len(row) for row in world_map)
+        old_width = int(self.map_size.x)
+        resized = (width, len(world_map)) != (old_width, len(old_map))
+        changed = 0
+        sight = []
+        for row in range(max(len(world_map), len(old_map))):
+            for col in range(max(width, old_width)):
+                old = _static_tile(old_map, col, row)
+                new = _static_tile(world_map, col, row)
+                if old == new:
+                    continue
+                changed += 1
+                self.place_static(col, row, new)
+                if not resized:
+                    sight.append((col, row, new in OPAQUE_TILES))
+        if sight:
+            self.line_of_sight.set_tiles(sight)
+
+        self.world_map = world_map
+        if resized:
+            self.map_size.update(width, len(world_map))
+            for sprite in self.visible_sprites:
+                if hasattr(sprite, "mapSize"):
+                    sprite.mapSize.update(self.map_size)
+            self.line_of_sight = LineOfSight(world_map)
+            if LINE_OF_SIGHT_RADIUS:
+                self.line_of_sight.precompute(LINE_OF_SIGHT_RADIUS)
+            if self.fog is not None:
+                self.fog.set_map_size(self.map_size)
+        return changed
+
+    def spawn_enemy(self, pos):
+        """Creates an enemy at a world position"""
+
+        return Enemy1(
+            pos,
+            [self.visible_sprites, self.enemy_sprites],
+            self.obstacle_sprites,
+            self.npc_schedule,
+        )
+
+    def spawn_damsel(self, pos):
+        """Creates a damsel at a world position"""
+
+        return Damsel(
+            pos,
+            [self.visible_sprites, self.friendly_spriites],
+            self.obstacle_sprites,
+            self.npc_schedule,
+            self.animation_schedule,
         )
 
+    def create_attack(self):
+        """Spawns an attack in front of the player from the attack pool
+
+        Nothing calls this yet, the player has no attack input. The pool is
+        in place for the attack mechanic and for projectiles and hit effects.
+        """
+
+        return self.attack_pool.spawn(self.player, self.player.attackCooldown)
+
     def run(self):
         # update and draw the game
-        self.visible_sprites.custom_draw(self.player)
-        self.visible_sprites.update()
-        self.enemy_sprites.update()
+        with alloc_profiler.section("draw"):
+            self.visible_sprites.custom_draw(self.player)
+        if self.fog is not None:
+            with alloc_profiler.section("fog"):
+                self.fog.draw(self.display_surface, self.visible_sprites.view_offset)
+        self.update()
         # debug(self.player.direction)
 
+    def set_surface(self, surface, scale=1):
+        """Draws the level on another surface, such as a new render target
+
+        The world is drawn at 1 / scale of its resolution, see
+        YSortCameraGroup.set_surface.
+        """
+
+        self.display_surface = surface
+        self.visible_sprites.set_surface(surface, scale)
+        if self.fog is not None:
+            self.fog.resize(surface.get_size(), self.visible_sprites.tile_size)
+
+    def set_quality(self, npc_interval=1, animation_interval=1, rotation_step=0):
+        """Changes how often npcs move and sprites animate
+
+        Parameters
+        ----------
+        npc_interval, animation_interval : int
+            ticks between updates, spread over the ticks so the work of each
+            tick stays even
+        rotation_step : int
+            degrees the player rotation is rounded to, 0 for exact rotations
+        """
+
+        self.npc_schedule.interval = npc_interval
+        self.animation_schedule.interval = animation_interval
+        self.player.rotationStep = rotation_step
+
+    def update(self):
+        """Advances the level by one tick without drawing"""
+
+        self.npc_schedule.advance()
+        self.animation_schedule.advance()
+        self.line_of_sight.new_tick()
+        with alloc_profiler.section("population"):
+            self.population.update(self.player.rect.center)
+        # per sprite class when profiling allocations
+        alloc_profiler.update_group(self.visible_sprites)
+        alloc_profiler.update_group(self.enemy_sprites)
+        with alloc_profiler.section("interactions"):
+            self.interactions.update()
+        with alloc_profiler.section("fog"):
+            self.reveal()
+
+    def reveal(self):
+        """Clears the fog of war around the tile of the player"""
+
+        if self.fog is None:
+            return 0
+        x, y = self.player.rect.center
+        return self.fog.reveal(x // TILESIZE, y // TILESIZE)
+
+
+def _ignore_progress(fraction):
+    pass
+
+
+def _static_tile(world_map, col, row):
+    if row < len(world_map) and col < len(world_map[row]):
+        tile = world_map[row][col]
+        if tile in STATIC_TILES:
+            return tile
+    return None
+
 
 # Class to handle camera movement centered around player
 # Called YSort because of sprite overlap
 class YSortCameraGroup(pygame.sprite.Group):
-    def __init__(self):
+    def __init__(self, surface=None, scale=1):
         # general setup
         super().__init__()
-        self.display_surface = pygame.display.get_surface()
-        self.half_width = (
-            self.display_surface.get_size()[0] // 2
-        )  # floor div, returns int
-        self.half_height = (
-            self.display_surface.get_size()[1] // 2
-        )  # floor div, returns int
         self.offset = pygame.math.Vector2()
+        # top left corner of the view in surface pixels
+        self.view_offset = pygame.math.Vector2()
+        # sprites drawn by the last custom_draw
+        self.blit_count = 0
+
+        # creating the floor, the tile covers maps larger than the ground image
+        self.floor_surface = import_image("graphics/floor_surface/ground.png")
+        self.floor_tile = import_image("graphics/floor_tile/tile.png", alpha=False)
+        surface = surface or pygame.display.get_surface()
+        # viewport sized cache of the floor, scrolled with the camera
+        self.floor = FloorRenderer(surface.get_size())
+        self.set_surface(surface, scale)
 
-        # creating the floor
-        self.floor_surface = pygame.image.load(
-            "graphics/floor_surface/ground.png"
-        ).convert()
-        self.floor_rect = self.floor_surface.get_rect(topleft=(0, 0))
+    def set_surface(self, surface, scale=1):
+        """Draws on another surface, the camera is re-centred on its size
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            the surface the world is drawn on
+        scale : int or float
+            world pixels per surface pixel. The same part of the world is
+            shown at a lower resolution, with art and positions scaled down,
+            so a surface 1 / scale of the display can be upscaled onto it
+        """
+
+        self.display_surface = surface
+        # surface pixels per tile, whole so tiles stay seamless
+        self.tile_size = max(round(TILESIZE / scale), 1)
+        width, height = surface.get_size()
+        # in world pixels
+        self.half_width = width * TILESIZE // self.tile_size // 2
+        self.half_height = height * TILESIZE // self.tile_size // 2
+        self.floor.resize(surface.get_size())
+        self.reload_images()
+
+    def reload_images(self):
+        """Scales the floor again and forgets the scaled sprite images
+
+        Called when the render scale changed or images were reloaded.
+        """
+
+        # sprite image -> the image drawn at the render scale, dropped with
+        # the sprite image
+        self._scaled = weakref.WeakKeyDictionary()
+        self.floor.ground = self.scale_image(self.floor_surface)
+        self.floor.tile = self.scale_image(self.floor_tile)
+        self.floor.invalidate()
+
+    def scale_image(self, image):
+        """Returns an image at the render scale, the image itself at TILESIZE"""
+
+        if self.tile_size == TILESIZE:
+            return image
+        width, height = image.get_size()
+        # rounded up, so neighbouring tiles never leave a gap
+        size = (
+            -(-width * self.tile_size // TILESIZE),
+            -(-height * self.tile_size // TILESIZE),
+        )
+        return pygame.transform.scale(image, size)
+
+    def _scaled_image(self, image):
+        scaled = self._scaled.get(image)
+        if scaled is None:
+            scaled = self._scaled[image] = self.scale_image(image)
+        return scaled
 
     # Drawing the map with the offset of the player, keeps screen centered on player
     def custom_draw(self, player):
         # calculate offset
-        self.offset.x = player.rect.centerx - self.half_width
-        self.offset.y = player.rect.centery - self.half_height
-        # draw floor and give camera offset
-        floor_offset = self.floor_rect.topleft - self.offset
-        self.display_surface.blit(self.floor_surface, floor_offset)
-
-        # draw the sprites, sort by center y-coord for overlap
-        for sprite in sorted(self.sprites(), key=lambda sprite: sprite.rect.centery):
-            offset = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset)
+        offset_x = player.rect.centerx - self.half_width
+        offset_y = player.rect.centery - self.half_height
+        self.offset.update(offset_x, offset_y)
+        tile_size = self.tile_size
+        view_x = offset_x * tile_size // TILESIZE
+        view_y = offset_y * tile_size // TILESIZE
+        self.view_offset.update(view_x, view_y)
+        # draw floor, only the strips exposed by camera movement are repainted
+        self.floor.draw(self.display_surface, self.view_offset)
+
+        # draw the sprites, sort by center y-coord for overlap, in a single
+        # blits call instead of one blit and one Vector2 per sprite
+        sprites = sorted(self.sprites(), key=_center_y)
+        if blit_diagnostics.enabled:
+            blit_diagnostics.check(sprites, self.display_surface)
+        if tile_size == TILESIZE:
+            blits = [
+                (sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y))
+                for sprite in sprites
+            ]
+        else:
+            # positions are scaled from the world, not from the view, so
+            # sprites stay aligned with the scaled floor
+            scaled = self._scaled_image
+            blits = [
+                (
+                    scaled(sprite.image),
+                    (
+                        sprite.rect.x * tile_size // TILESIZE - view_x,
+                        sprite.rect.y * tile_size // TILESIZE - view_y,
+                    ),
+                )
+                for sprite in sprites
+            ]
+        self.display_surface.blits(blits, doreturn=False)
+        self.blit_count = len(sprites)
+
+
+_center_y = attrgetter("rect.centery")
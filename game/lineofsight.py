@@ -0,0 +1,298 @@
+import numpy
+from settings import TILESIZE
+
+# tiles that block sight, the same ones that become obstacles
+OPAQUE_TILES = ("x", "t")
+# precomputed results, UNKNOWN lines are traced when asked for
+UNKNOWN, BLOCKED, CLEAR = range(3)
+
+
+class LineOfSight:
+    """Line of sight queries on the tile grid of a world map
+
+    Sight lines run between the centres of the tiles two points are in and are
+    traced with an integer grid traversal, visiting every tile the line
+    crosses. A line that passes exactly through a corner is blocked only when
+    both tiles beside the corner are opaque. The tiles at either end never
+    block, so an entity standing against a wall can still see and be seen.
+
+    Results are symmetric and memoized per tick, so the many entities asking
+    about the same tiles in one tick trace each line once. Call new_tick()
+    whenever entities may have moved. Lines between static tiles can also be
+    precomputed once with precompute(). Each tile keeps one byte per tile of
+    the half window after it, up to the radius, in a single bytearray. When
+    a tile changes only the lines that can cross it are traced again.
+    ...
+
+    Attributes
+    ----------
+    queries : int
+        number of queries since the last reset
+    traced : int
+        number of queries that had to trace a line
+
+    Methods
+    -------
+    visible(self, pos_a, pos_b)
+        Returns whether two world positions can see each other.
+    visible_tiles(self, tile_a, tile_b)
+        Returns whether two tiles can see each other.
+    new_tick(self)
+        Forgets the results memoized for the previous tick.
+    precompute(self, radius)
+        Traces every line between open tiles up to a radius.
+    set_tile(self, col, row, opaque)
+        Changes whether a tile blocks sight.
+    set_tiles(self, tiles)
+        Changes whether tiles block sight.
+    """
+
+    def __init__(self, world_map, opaque=OPAQUE_TILES, tile_size=TILESIZE):
+        """Initialize the occupancy grid from a world map
+
+        Parameters
+        ----------
+            world_map : list of list of str
+                the level matrix, rows of tile keys
+            opaque : tuple of str
+                tile keys that block sight
+            tile_size : int
+                size of a tile in pixels
+        """
+
+        self.tile_size = tile_size
+        self.height = len(world_map)
+        self.width = max((len(row) for row in world_map), default=0)
+        # one byte per tile, row major, 1 when the tile blocks sight
+        self.grid = bytearray(self.width * self.height)
+        for row_index, row in enumerate(world_map):
+            for col_index, tile in enumerate(row):
+                if tile in opaque:
+                    self.grid[row_index * self.width + col_index] = 1
+
+        # (tile index, tile index) -> bool, the smaller index first
+        self._memo = {}
+        # precomputed lines, see precompute()
+        self.radius = 0
+        self._static = bytearray()
+        self.queries = 0
+        self.traced = 0
+
+    def visible(self, pos_a, pos_b):
+        """Returns whether two world positions can see each other
+
+        Positions outside of the map never see anything.
+        """
+
+        size = self.tile_size
+        return self.visible_tiles(
+            (int(pos_a[0] // size), int(pos_a[1] // size)),
+            (int(pos_b[0] // size), int(pos_b[1] // size)),
+        )
+
+    def visible_tiles(self, tile_a, tile_b):
+        """Returns whether two tiles, as (col, row), can see each other"""
+
+        self.queries += 1
+        index_a = self._index(tile_a)
+        index_b = self._index(tile_b)
+        if index_a is None or index_b is None:
+            return False
+        if index_a > index_b:
+            # trace from the same end either way so results are symmetric
+            index_a, index_b = index_b, index_a
+        radius = self.radius
+        if radius:
+            row_a, col_a = divmod(index_a, self.width)
+            row_b, col_b = divmod(index_b, self.width)
+            dx = col_b - col_a
+            if row_b - row_a <= radius and -radius <= dx <= radius:
+                span = 2 * radius + 1
+                result = self._static[
+                    index_a * (radius + 1) * span + (row_b - row_a) * span + dx + radius
+                ]
+                if result:
+                    return result == CLEAR
+
+        key = (index_a, index_b)
+        result = self._memo.get(key)
+        if result is None:
+            self.traced += 1
+            result = self._memo[key] = self._trace(index_a, index_b)
+        return result
+
+    def new_tick(self):
+        """Forgets the results memoized for the previous tick"""
+
+        self._memo.clear()
+
+    def precompute(self, radius):
+        """Traces every line between open tiles up to a radius
+
+        Parameters
+        ----------
+        radius : int
+            largest distance in tiles along either axis, lines between tiles
+            further apart are traced per tick when asked for
+        """
+
+        self.radius = radius
+        self._lines = [
+            (dx, dy, *_line_tiles(dx, dy))
+            for dy in range(radius + 1)
+            for dx in range(-radius, radius + 1)
+            if dy or dx > 0
+        ]
+        # per tile the rows 0 to radius below it, columns -radius to radius,
+        # only lines to later tiles are kept since results are symmetric
+        span = 2 * radius + 1
+        self._static = bytearray(len(self.grid) * (radius + 1) * span)
+        self._precompute_area(0, 0, self.width, self.height)
+
+    def set_tile(self, col, row, opaque):
+        """Changes whether a tile blocks sight, see set_tiles"""
+
+        self.set_tiles([(col, row, opaque)])
+
+    def set_tiles(self, tiles):
+        """Changes whether tiles block sight
+
+        Memoized results are dropped. Precomputed lines are traced again for
+        the tiles whose window holds a changed tile, no other line can cross
+        one, once for the area around all of them.
+
+        Parameters
+        ----------
+        tiles : iterable of tuple
+            (col, row, opaque) of every changed tile
+        """
+
+        cols = []
+        rows = []
+        for col, row, opaque in tiles:
+            self.grid[row * self.width + col] = 1 if opaque else 0
+            cols.append(col)
+            rows.append(row)
+        self._memo.clear()
+        radius = self.radius
+        if radius and cols:
+            # lines only run to later tiles, so they start at most radius rows up
+            left = max(min(cols) - radius, 0)
+            top = max(min(rows) - radius, 0)
+            right = min(max(cols) + radius + 1, self.width)
+            self._precompute_area(left, top, right, max(rows) + 1)
+
+    def _precompute_area(self, left, top, right, bottom):
+        """Traces the precomputed lines starting in an area of tiles
+
+        Every line offset is resolved for the whole area at once, a line is
+        blocked when any tile it crosses is opaque, or both tiles beside a
+        corner it passes through.
+        """
+
+        radius = self.radius
+        span = 2 * radius + 1
+        opaque = numpy.frombuffer(self.grid, numpy.uint8).reshape(
+            self.height, self.width
+        )
+        # off the map counts as opaque, lines ending there are never asked for
+        padded = numpy.pad(opaque.astype(bool), radius, constant_values=True)
+        static = numpy.frombuffer(self._static, numpy.uint8).reshape(
+            self.height, self.width, radius + 1, span
+        )
+        rows = bottom - top
+        cols = right - left
+
+        def shifted(dx, dy):
+            top_row = top + radius + dy
+            left_col = left + radius + dx
+            return padded[
+                slice(top_row, top_row + rows), slice(left_col, left_col + cols)
+            ]
+
+        ends_open = ~shifted(0, 0)
+        for dx, dy, tiles, corners in self._lines:
+            blocked = numpy.zeros((rows, cols), bool)
+            for tile_x, tile_y in tiles:
+                blocked |= shifted(tile_x, tile_y)
+            for (x_a, y_a), (x_b, y_b) in corners:
+                blocked |= shifted(x_a, y_a) & shifted(x_b, y_b)
+            open_pair = ends_open & ~shifted(dx, dy)
+            static[top:bottom, left:right, dy, dx + radius] = numpy.where(
+                open_pair, numpy.where(blocked, BLOCKED, CLEAR), UNKNOWN
+            )
+
+    def _index(self, tile):
+        col, row = tile
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return row * self.width + col
+        return None
+
+    def _trace(self, index_a, index_b):
+        """Walks the tiles between two tile centres, False at the first wall"""
+
+        grid = self.grid
+        width = self.width
+        col, row = index_a % width, index_a // width
+        end_col, end_row = index_b % width, index_b // width
+        step_x = 1 if end_col > col else -1
+        step_y = width if end_row > row else -width
+        count_x = abs(end_col - col)
+        count_y = abs(end_row - row)
+        index = index_a
+        x = y = 0
+        while x < count_x or y < count_y:
+            # compares the distances to the next vertical and horizontal tile
+            # edge, (x + 0.5) / count_x against (y + 0.5) / count_y
+            decision = (1 + 2 * x) * count_y - (1 + 2 * y) * count_x
+            if decision == 0:
+                # through a corner, blocked only by a diagonal seam
+                if grid[index + step_x] and grid[index + step_y]:
+                    return False
+                index += step_x + step_y
+                x += 1
+                y += 1
+            elif decision < 0:
+                index += step_x
+                x += 1
+            else:
+                index += step_y
+                y += 1
+            if index == index_b:
+                return True
+            if grid[index]:
+                return False
+        return True
+
+
+def _line_tiles(dx, dy):
+    """Returns the tiles a line crosses between its ends, relative to its start
+
+    The same walk as LineOfSight._trace without a grid, as a list of (x, y)
+    tiles and a list of corners passed through, each the two tiles beside it.
+    """
+
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    count_x = abs(dx)
+    count_y = abs(dy)
+    tiles = []
+    corners = []
+    col = row = x = y = 0
+    while x < count_x or y < count_y:
+        decision = (1 + 2 * x) * count_y - (1 + 2 * y) * count_x
+        if decision == 0:
+            corners.append(((col + step_x, row), (col, row + step_y)))
+            col += step_x
+            row += step_y
+            x += 1
+            y += 1
+        elif decision < 0:
+            col += step_x
+            x += 1
+        else:
+            row += step_y
+            y += 1
+        if (col, row) != (dx, dy):
+            tiles.append((col, row))
+    return tiles, corners
@@ -0,0 +1,128 @@
+import argparse
+import csv
+import random
+
+# map legend shared with Level.create_map
+WALL = "x"
+PLANT = "t"
+ENEMY = "e"
+DAMSEL = "d"
+PLAYER = "p"
+FLOOR = ","
+
+
+def generate(
+    width,
+    height,
+    walls=0.08,
+    plants=0.04,
+    enemies=0.02,
+    damsels=0.005,
+    seed=None,
+):
+    """Generates a random world map using the level legend
+
+    The map is surrounded by walls and the player starts near the centre with
+    the tiles around them left open. Densities are the chance of each interior
+    tile being that kind of tile, NPCs are only placed on open floor.
+
+    Parameters
+    ----------
+    width, height : int
+        map size in tiles, including the border
+    walls, plants : float
+        obstacle densities
+    enemies, damsels : float
+        npc densities
+    seed : int or None
+        seed for a reproducible map
+
+    Returns
+    -------
+    list of list of str
+        rows of tile keys, the same shape as Level.world_map
+    """
+
+    if width < 5 or height < 5:
+        raise ValueError("Maps must be at least 5x5 tiles")
+    rng = random.Random(seed)
+    world_map = [[WALL] * width for _ in range(height)]
+    player_col = width // 2
+    player_row = height // 2
+
+    for row in range(1, height - 1):
+        line = world_map[row]
+        for col in range(1, width - 1):
+            if abs(col - player_col) <= 1 and abs(row - player_row) <= 1:
+                line[col] = FLOOR
+                continue
+            roll = rng.random()
+            for tile, density in (
+                (WALL, walls),
+                (PLANT, plants),
+                (ENEMY, enemies),
+                (DAMSEL, damsels),
+            ):
+                if roll < density:
+                    line[col] = tile
+                    break
+                roll -= density
+            else:
+                line[col] = FLOOR
+
+    world_map[player_row][player_col] = PLAYER
+    return world_map
+
+
+def write_csv(world_map, path):
+    """Writes a world map in the same CSV layout as the map folder"""
+
+    with open(path, "w", newline="", encoding="utf-8") as map_file:
+        writer = csv.writer(map_file, lineterminator="\n")
+        writer.writerows(world_map)
+
+
+def _size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a random Lunk map for stress testing"
+    )
+    parser.add_argument("path", help="CSV file to write")
+    parser.add_argument(
+        "--size",
+        type=_size,
+        default=(200, 200),
+        metavar="WIDTHxHEIGHT",
+        help="map size in tiles (default 200x200)",
+    )
+    parser.add_argument("--walls", type=float, default=0.08)
+    parser.add_argument("--plants", type=float, default=0.04)
+    parser.add_argument("--enemies", type=float, default=0.02)
+    parser.add_argument("--damsels", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    width, height = args.size
+    world_map = generate(
+        width,
+        height,
+        walls=args.walls,
+        plants=args.plants,
+        enemies=args.enemies,
+        damsels=args.damsels,
+        seed=args.seed,
+    )
+    write_csv(world_map, args.path)
+    counts = {tile: sum(row.count(tile) for row in world_map) for tile in "xted"}
+    print(
+        f"Wrote {width}x{height} map to {args.path}: {counts['x']} walls, "
+        f"{counts['t']} plants, {counts['e']} enemies, {counts['d']} damsels"
+    )
+
+
+if __name__ == "__main__":
+    main()
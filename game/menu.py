@@ -1,98 +1,139 @@
 import pygame
-from game.settings import WINDOW_WIDTH
-from settings import MAIN_MENU_BACKGROUND_PATH
+from settings import MAIN_MENU_BACKGROUND_PATH, WINDOW_WIDTH
+from support import import_image
+
+# menu button labels, top to bottom
+MENU_OPTIONS = ["New Game", "Options", "Credits", "Quit"]
+BUTTON_COLOR = (100, 100, 100)
+BUTTON_HOVER_COLOR = (170, 170, 170)
 
 
 class MainMenu:
-    # Contains game state and vars for the main menu
-    def __init__(self):
+    """Contains game state and vars for the main menu
+
+    The background and both states of every button are composed once. After
+    the first frame only the buttons whose hover state changed are redrawn,
+    so the display surface is expected to keep its contents between frames.
+    Mouse clicks are passed in through handle_event(), by subscribing it to
+    an EventBus, the menu never reads the event queue itself.
+    """
+
+    def __init__(self, events=None):
         self.start_screen_path = "images/start_screen.png"
-        # load menu image
-        self.menu_image = pygame.image.load(MAIN_MENU_BACKGROUND_PATH)
         # font
+        if not pygame.font.get_init():
+            pygame.font.init()
         self.font = pygame.font.SysFont("Corbel", 40)
-        # font color, black
+        # font color, white
         self.font_color = (255, 255, 255)
 
         self.display_surface = pygame.display.get_surface()
 
-        # render menu text on screen
-        self.menu_text = [
-            self.font.render("New Game", True, 40),
-            self.font.render("Options", True, 40),
-            self.font.render("Credits", True, 40),
-            self.font.render("Quit", True, 40),
-        ]
+        # compose the converted background once, served from the baked atlas
+        # when there is one since decoding the PNG delays the first frame
+        menu_image = import_image(MAIN_MENU_BACKGROUND_PATH)
+        self.background = pygame.Surface(self.display_surface.get_size()).convert()
+        self.background.fill("black")
+        self.background.blit(menu_image, (0, 0))
 
         self.text_increment = 50
         self.menu_text_size = [180, 40]
 
-        self.text = self.font.render("quit", True, self.font_color)
+        # button rects and their pre-rendered normal and hover surfaces
+        self.button_rects = []
+        self.button_surfaces = []
+        for index, label in enumerate(MENU_OPTIONS):
+            rect = pygame.Rect(
+                WINDOW_WIDTH // 2,
+                self.text_increment * (index + 1),
+                self.menu_text_size[0],
+                self.menu_text_size[1],
+            )
+            text = self.font.render(label, True, self.font_color)
+            self.button_rects.append(rect)
+            self.button_surfaces.append(
+                (
+                    self.render_button(rect, text, BUTTON_COLOR),
+                    self.render_button(rect, text, BUTTON_HOVER_COLOR),
+                )
+            )
+
+        # hover state each button was last drawn with, None forces a redraw
+        self.hovered = [None] * len(MENU_OPTIONS)
+        self.redraw = True
+        self.selection = None
+
+        if events is not None:
+            events.subscribe(pygame.MOUSEBUTTONDOWN, self.handle_event, button=1)
+
+    def render_button(self, rect, text, color):
+        """Renders a button face with its label"""
+
+        surface = pygame.Surface(rect.size).convert()
+        surface.fill(color)
+        surface.blit(text, (0, 0))
+        return surface
+
+    def invalidate(self):
+        """Forces a full redraw, used when something else drew over the menu"""
 
-    # destructor that returns the main menu user input
-    def __del__(self):
-        # return self.men
-        pass
+        self.redraw = True
 
     def run(self):
-        self.display_surface.blit(self.menu_image, (0, 0))
-        self.draw_menu_options()
-        self.menu_selection()
+        """Draws the menu
+
+        Returns
+        -------
+        list of pygame.Rect
+            the regions of the display surface that changed this frame
+        """
+
+        dirty = []
+        if self.redraw:
+            self.display_surface.blit(self.background, (0, 0))
+            self.hovered = [None] * len(MENU_OPTIONS)
+            self.redraw = False
+            dirty.append(self.display_surface.get_rect())
+        dirty.extend(self.draw_menu_options())
+        return dirty
 
     def draw_menu_options(self):
+        """Redraws the buttons whose hover state changed"""
+
         # get mouse position as tuple
-        self.mouse = pygame.mouse.get_pos()
-        # shade in button when mouse hovers over it
-        for text in self.menu_text:
-            if (
-                WINDOW_WIDTH / 2
-                <= self.mouse[0]
-                <= WINDOW_WIDTH / 2 + self.menu_text_size[0]
-                and self.text_increment
-                <= self.mouse[1]
-                <= self.text_increment + self.menu_text_size[1]
-            ):
-                pygame.draw.rect(
-                    self.display_surface,
-                    (170, 170, 170),
-                    [
-                        WINDOW_WIDTH / 2,
-                        self.text_increment,
-                        self.menu_text_size[0],
-                        self.menu_text_size[1],
-                    ],
+        mouse = pygame.mouse.get_pos()
+        dirty = []
+        for index, rect in enumerate(self.button_rects):
+            # shade in button when mouse hovers over it
+            hovered = rect.collidepoint(mouse)
+            if hovered != self.hovered[index]:
+                self.display_surface.blit(
+                    self.button_surfaces[index][hovered], rect.topleft
                 )
-                self.display_surface.blit(text, (WINDOW_WIDTH / 2, self.text_increment))
-            else:
-                pygame.draw.rect(
-                    self.display_surface,
-                    (100, 100, 100),
-                    [
-                        WINDOW_WIDTH / 2,
-                        self.text_increment,
-                        self.menu_text_size[0],
-                        self.menu_text_size[1],
-                    ],
-                )
-                self.display_surface.blit(text, (WINDOW_WIDTH / 2, self.text_increment))
-            self.text_increment += 50
-        self.text_increment = 50
+                self.hovered[index] = hovered
+                dirty.append(rect)
+        return dirty
 
-    def menu_selection(self):
-        # event to handle clicking on menu options
-        self.text_increment = 50
-        for event in pygame.event.get():
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # menu_option = self.menu_text.count()
-                # hovering over menu option
-                for text in self.menu_text:
-                    if (
-                        WINDOW_WIDTH / 2
-                        <= self.mouse[0]
-                        <= WINDOW_WIDTH / 2 + self.menu_text_size[0]
-                        and self.text_increment
-                        <= self.mouse[1]
-                        <= self.text_increment + self.menu_text_size[1]
-                    ):
-                        pygame.quit()
-                    self.text_increment += 50
+    def handle_event(self, event):
+        """Handles clicking on menu options
+
+        Parameters
+        ----------
+        event : pygame.event.Event
+            an event dispatched by the event bus
+
+        Returns
+        -------
+        str or None
+            the label of the clicked option
+        """
+
+        if event.type != pygame.MOUSEBUTTONDOWN or event.button != 1:
+            return None
+        for index, rect in enumerate(self.button_rects):
+            if rect.collidepoint(event.pos):
+                self.selection = MENU_OPTIONS[index]
+                if self.selection == "Quit":
+                    pygame.event.post(pygame.event.Event(pygame.QUIT))
+                return self.selection
+        return None
@@ -0,0 +1,221 @@
+import pygame
+from fog import HIDDEN, REVEALED
+from settings import (
+    MINIMAP_INTERVAL,
+    MINIMAP_MARGIN,
+    MINIMAP_SCALE,
+    MINIMAP_SIZE,
+    TILESIZE,
+)
+
+# palette index of every map tile, anything that is not a wall or a plant is
+# drawn as floor
+FLOOR, WALL, PLANT, OUTSIDE = range(4)
+PALETTE = [(34, 46, 34), (128, 128, 128), (52, 140, 64), (0, 0, 0)]
+_tile_table = bytearray(256)
+_tile_table[ord("x")] = WALL
+_tile_table[ord("t")] = PLANT
+TILE_INDEX = bytes(_tile_table)
+
+PLAYER_COLOR = (255, 255, 255)
+ENEMY_COLOR = (220, 50, 50)
+DAMSEL_COLOR = (240, 200, 60)
+BORDER_COLOR = (200, 200, 200)
+MARKER_SIZE = 3
+
+
+def rasterize(world_map, width, height):
+    """Returns an 8-bit surface of a map at one pixel per tile
+
+    Every row becomes one byte string translated to palette indices in a
+    single call, instead of setting a pixel per tile.
+    """
+
+    lines = []
+    for row in world_map:
+        line = "".join(row)
+        if len(line) != len(row):
+            # multi character cells are never walls or plants
+            line = "".join(tile if len(tile) == 1 else " " for tile in row)
+        lines.append(line.ljust(width)[:width])
+    lines.extend([" " * width] * (height - len(lines)))
+    data = "".join(lines).encode("latin-1", "replace").translate(TILE_INDEX)
+    surface = pygame.image.frombytes(data, (width, height), "P")
+    surface.set_palette(PALETTE + [(0, 0, 0)] * (256 - len(PALETTE)))
+    return surface
+
+
+class Minimap:
+    """Map overview drawn in a corner of the display
+
+    Walls and plants are rasterized once at one pixel per tile and scaled
+    once, only changed tiles are painted again. The panel showing the part
+    of the map around the player, with a marker for the player and every
+    active npc, is composed every few frames and blitted as it is in
+    between, so a frame costs a single small blit whatever the size of the
+    map. With a fog of war, the hidden tiles in the panel are covered by one
+    scaled 8-bit mask and npcs on them get no marker.
+    ...
+
+    Methods
+    -------
+    rebuild(self, world_map)
+        Rasterizes the walls and plants of a map.
+    set_tile(self, col, row, tile)
+        Paints one changed tile.
+    compose(self, level)
+        Redraws the panel around the player with the entity markers.
+    draw_fog(self, hidden, color, left, top)
+        Covers the hidden tiles in the panel.
+    draw(self, surface, level)
+        Draws the panel, composing it again every few frames.
+    """
+
+    def __init__(
+        self,
+        world_map,
+        size=MINIMAP_SIZE,
+        scale=MINIMAP_SCALE,
+        interval=MINIMAP_INTERVAL,
+    ):
+        """Initialize the minimap of a map
+
+        Parameters
+        ----------
+            world_map : list of list of str
+                the level matrix
+            size : tuple
+                panel size in pixels
+            scale : int
+                panel pixels per tile
+            interval : int
+                frames between redraws of the panel
+        """
+
+        self.scale = scale
+        self.interval = interval
+        self.panel = pygame.Surface(size).convert()
+        self.frames = 0
+        self.rebuild(world_map)
+
+    def rebuild(self, world_map):
+        """Rasterizes the walls and plants of a map"""
+
+        self.map_size = (max(len(row) for row in world_map), len(world_map))
+        self.tiles = rasterize(world_map, *self.map_size)
+        width, height = self.map_size
+        self.static = pygame.transform.scale(
+            self.tiles, (width * self.scale, height * self.scale)
+        )
+        self.frames = 0
+
+    def set_tile(self, col, row, tile):
+        """Paints one changed tile, see Level.tile_listeners
+
+        Parameters
+        ----------
+        tile : str or None
+            the new tile, None for floor
+        """
+
+        index = WALL if tile == "x" else PLANT if tile == "t" else FLOOR
+        self.tiles.set_at((col, row), PALETTE[index])
+        scale = self.scale
+        self.static.fill(PALETTE[index], (col * scale, row * scale, scale, scale))
+        self.frames = 0
+
+    def compose(self, level):
+        """Redraws the panel around the player with the entity markers"""
+
+        if (int(level.map_size.x), int(level.map_size.y)) != self.map_size:
+            # the map was reloaded with another size
+            self.rebuild(level.world_map)
+
+        panel = self.panel
+        width, height = panel.get_size()
+        # panel pixels per world pixel
+        ratio = self.scale / TILESIZE
+        center_x, center_y = level.player.rect.center
+        left = int(center_x * ratio) - width // 2
+        top = int(center_y * ratio) - height // 2
+        panel.fill(PALETTE[OUTSIDE])
+        # clipped to the panel, so only the visible part is copied
+        panel.blit(self.static, (-left, -top))
+        hidden = None
+        if level.fog is not None:
+            hidden = level.fog.hidden
+            self.draw_fog(hidden, level.fog.color, left, top)
+
+        offset = MARKER_SIZE // 2
+        for group, color in (
+            (level.enemy_sprites, ENEMY_COLOR),
+            (level.friendly_spriites, DAMSEL_COLOR),
+            (level.player_sprites, PLAYER_COLOR),
+        ):
+            for sprite in group:
+                x, y = sprite.rect.center
+                if hidden is not None and _is_hidden(hidden, x, y):
+                    continue
+                panel.fill(
+                    color,
+                    (
+                        int(x * ratio) - left - offset,
+                        int(y * ratio) - top - offset,
+                        MARKER_SIZE,
+                        MARKER_SIZE,
+                    ),
+                )
+        pygame.draw.rect(panel, BORDER_COLOR, panel.get_rect(), 1)
+
+    def draw_fog(self, hidden, color, left, top):
+        """Covers the hidden tiles in the panel, see FogOfWar.hidden
+
+        Only the tiles in the panel are copied, as an 8-bit surface whose
+        palette index is the fog of the tile, so the cost does not grow with
+        the map.
+        """
+
+        scale = self.scale
+        width, height = self.panel.get_size()
+        area = pygame.Rect(
+            left // scale,
+            top // scale,
+            -(-width // scale) + 1,
+            -(-height // scale) + 1,
+        ).clip(0, 0, *hidden.shape)
+        if not area.width or not area.height:
+            return
+        cols = slice(area.left, area.right)
+        rows = slice(area.top, area.bottom)
+        tiles = hidden[cols, rows]
+        if not tiles.any():
+            return
+        mask = pygame.image.frombytes(tiles.T.tobytes(), area.size, "P")
+        palette = [(0, 0, 0)] * 256
+        palette[HIDDEN] = color
+        mask.set_palette(palette)
+        mask = pygame.transform.scale(mask, (area.width * scale, area.height * scale))
+        mask.set_colorkey(REVEALED)
+        self.panel.blit(mask, (area.left * scale - left, area.top * scale - top))
+
+    def draw(self, surface, level):
+        """Draws the panel in the top right corner of a surface
+
+        The panel is composed again every interval frames, and on the first
+        frame after a tile changed.
+        """
+
+        if self.frames % self.interval == 0:
+            self.compose(level)
+        self.frames += 1
+        x = surface.get_width() - self.panel.get_width() - MINIMAP_MARGIN
+        surface.blit(self.panel, (x, MINIMAP_MARGIN))
+
+
+def _is_hidden(hidden, x, y):
+    """Whether the tile under a world position is under the fog"""
+
+    col = x // TILESIZE
+    row = y // TILESIZE
+    width, height = hidden.shape
+    return 0 <= col < width and 0 <= row < height and hidden[col, row] == HIDDEN
@@ -0,0 +1,224 @@
+import math
+import pygame
+from settings import TILESIZE
+
+
+class ObstacleGroup(pygame.sprite.Group):
+    """Sprite group of static obstacles indexed on the tile grid
+
+    Every obstacle hitbox is stored in each grid cell it overlaps. sweep()
+    moves a hitbox along a whole step in one query: it only looks at the
+    obstacles in the cells covered by the swept box and stops at the earliest
+    time of impact, so fast entities cannot tunnel through thin walls.
+
+    Sprites usually join their groups before they have a hitbox, so new
+    sprites are indexed lazily on the next query. Obstacles are expected to
+    stay where they are; remove and re-add a sprite to move it.
+    ...
+
+    Attributes
+    ----------
+    checks : int
+        number of obstacle hitboxes tested by sweep() since the last reset
+
+    Methods
+    -------
+    sweep(self, hitbox, dx, dy)
+        Moves a hitbox by dx, dy, stopping at the first obstacle.
+    obstacles_in(self, rect)
+        Returns the obstacles whose cells overlap a rect.
+    """
+
+    def __init__(self, *sprites, cell_size=TILESIZE):
+        self.cell_size = cell_size
+        # (col, row) -> list of sprites whose hitbox overlaps the cell
+        self.cells = {}
+        # sprite -> cells it was indexed in
+        self._sprite_cells = {}
+        self._pending = []
+        self.checks = 0
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._pending.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if sprite in self._sprite_cells:
+            for key in self._sprite_cells.pop(sprite):
+                self.cells[key].remove(sprite)
+        elif sprite in self._pending:
+            self._pending.remove(sprite)
+
+    def _index_pending(self):
+        size = self.cell_size
+        for sprite in self._pending:
+            box = sprite.hitbox
+            keys = [
+                (col, row)
+                for col in range(box.left // size, (box.right - 1) // size + 1)
+                for row in range(box.top // size, (box.bottom - 1) // size + 1)
+            ]
+            for key in keys:
+                self.cells.setdefault(key, []).append(sprite)
+            self._sprite_cells[sprite] = keys
+        self._pending = []
+
+    def obstacles_in(self, rect):
+        """Returns the obstacles indexed in the cells a rect overlaps
+
+        Parameters
+        ----------
+        rect : tuple
+            left, top, right and bottom edges, right and bottom exclusive
+        """
+
+        if self._pending:
+            self._index_pending()
+        left, top, right, bottom = rect
+        size = self.cell_size
+        found = set()
+        for col in range(int(left // size), int(math.ceil(right / size))):
+            for row in range(int(top // size), int(math.ceil(bottom / size))):
+                cell = self.cells.get((col, row))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def sweep(self, hitbox, dx, dy, subpixel=None):
+        """Moves a hitbox by dx, dy, stopping at the first obstacle
+
+        The step is resolved in at most two passes. The first pass moves the
+        box to the earliest time of impact; the second slides the remaining
+        movement along the surface that was hit. The hitbox is moved to the
+        nearest whole pixel, with a subpixel vector the rounding is carried
+        over to the next step instead of being lost.
+
+        Parameters
+        ----------
+        hitbox : pygame.Rect
+            the moving hitbox, updated in place
+        dx : float
+            movement along x for the whole step
+        dy : float
+            movement along y for the whole step
+        subpixel : pygame.math.Vector2
+            offset of the exact position from the hitbox, added to the start
+            of the step and updated in place with the rounding of its end
+
+        Returns
+        -------
+        tuple of bool
+            whether the movement was stopped horizontally and vertically
+        """
+
+        # rects can have negative sizes, work with the normalized box
+        left = min(hitbox.left, hitbox.right)
+        top = min(hitbox.top, hitbox.bottom)
+        width = abs(hitbox.width)
+        height = abs(hitbox.height)
+        x = float(left)
+        y = float(top)
+        if subpixel is not None:
+            x += subpixel.x
+            y += subpixel.y
+        hit_x = hit_y = False
+
+        for _ in range(2):
+            if not dx and not dy:
+                break
+            candidates = self.obstacles_in(
+                (
+                    min(x, x + dx),
+                    min(y, y + dy),
+                    max(x, x + dx) + width,
+                    max(y, y + dy) + height,
+                )
+            )
+            self.checks += len(candidates)
+
+            first_time = 1.0
+            first_box = None
+            for sprite in candidates:
+                impact = time_of_impact(x, y, width, height, dx, dy, sprite.hitbox)
+                if impact is not None and impact[0] < first_time:
+                    first_time, on_x = impact
+                    first_box = sprite.hitbox
+
+            if first_box is None:
+                x += dx
+                y += dy
+                break
+
+            # snap the blocked axis flush with the obstacle, move the other
+            if on_x:
+                x = first_box.left - width if dx > 0 else first_box.right
+                y += dy * first_time
+                dy *= 1 - first_time
+                dx = 0
+                hit_x = True
+            else:
+                y = first_box.top - height if dy > 0 else first_box.bottom
+                x += dx * first_time
+                dx *= 1 - first_time
+                dy = 0
+                hit_y = True
+
+        new_left = round(x)
+        new_top = round(y)
+        hitbox.x += new_left - left
+        hitbox.y += new_top - top
+        if subpixel is not None:
+            subpixel.update(x - new_left, y - new_top)
+        return hit_x, hit_y
+
+
+def time_of_impact(x, y, width, height, dx, dy, box):
+    """Swept AABB test of a moving box against a static rect
+
+    Parameters
+    ----------
+    x, y, width, height : float
+        the moving box at the start of the step
+    dx, dy : float
+        movement for the whole step
+    box : pygame.Rect
+        the static rect
+
+    Returns
+    -------
+    tuple or None
+        (time, on_x) with time in [0, 1) and on_x true when the box is hit
+        on its left or right side, None when the box is not hit during the
+        step or already overlaps it
+    """
+
+    if dx > 0:
+        entry_x = (box.left - (x + width)) / dx
+        exit_x = (box.right - x) / dx
+    elif dx < 0:
+        entry_x = (box.right - x) / dx
+        exit_x = (box.left - (x + width)) / dx
+    elif x + width <= box.left or x >= box.right:
+        return None
+    else:
+        entry_x = -math.inf
+        exit_x = math.inf
+
+    if dy > 0:
+        entry_y = (box.top - (y + height)) / dy
+        exit_y = (box.bottom - y) / dy
+    elif dy < 0:
+        entry_y = (box.bottom - y) / dy
+        exit_y = (box.top - (y + height)) / dy
+    elif y + height <= box.top or y >= box.bottom:
+        return None
+    else:
+        entry_y = -math.inf
+        exit_y = math.inf
+
+    entry = max(entry_x, entry_y)
+    if entry < 0 or entry >= 1 or entry >= min(exit_x, exit_y):
+        return None
+    return entry, entry_x >= entry_y
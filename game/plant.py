@@ -1,4 +1,5 @@
 import pygame
+from support import import_image
 
 
 class Plant(pygame.sprite.Sprite):
@@ -6,6 +7,6 @@ class Plant(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
         # self.sprite_type = sprite_type
-        self.image = pygame.image.load("graphics/plant2/plant2.png")
+        self.image = import_image("graphics/plant2/plant2.png")
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(0, -10)
@@ -1,6 +1,16 @@
 import pygame
 from spriteSheet import SpriteSheet
-from entity import Entity
+from entity import EVERY_TICK, Entity
+from animstate import (
+    DOWN,
+    END_ATTACK,
+    LEFT,
+    RIGHT,
+    START_ATTACK,
+    UP,
+    WALKING,
+    AnimatedState,
+)
 
 # Defines how fast the player object can rotate while running
 PLAYER_ROTATION_SPEED = 5
@@ -8,8 +18,12 @@ PLAYER_ROTATION_SPEED = 5
 SPRITE_WIDTH = 16
 SPRITE_HEIGHT = 20
 
+# (direction component, sign) the rotation angle is taken from, indexed by
+# state. The idle and attack states are not rotated
+ROTATION_AXES = ((0, -1), (0, 1), (1, 1), (1, -1)) + ((0, 0),) * 8
 
-class Player(Entity):
+
+class Player(AnimatedState, Entity):
     """Player class which contains the object players will directly control
 
     The player class will handle movement logic and sprite changing logic for the player
@@ -17,7 +31,9 @@ class Player(Entity):
     player object.
     """
 
-    def __init__(self, pos, groups, obstacle_sprites, map_size):
+    def __init__(
+        self, pos, groups, obstacle_sprites, map_size, animation_schedule=EVERY_TICK
+    ):
         super().__init__(groups)
 
         # grab self image
@@ -26,7 +42,7 @@ class Player(Entity):
         playerSelfImageRect = pygame.Rect(0, 0, SPRITE_WIDTH, SPRITE_HEIGHT)
         self.colorKeyBlack = (0, 0, 0)
         self.image = self.playerAnimations.image_at(
-            playerSelfImageRect, self.colorKeyBlack
+            playerSelfImageRect, self.colorKeyBlack, rle=False
         )
         self.rect = self.image.get_rect(topleft=pos)
         # modify model rect to be a slightly less tall hitbox.
@@ -42,40 +58,49 @@ class Player(Entity):
 
         self.obstacleSprites = obstacle_sprites
 
+        # animated every few ticks when the quality governor asks for it
+        self.animationSchedule = animation_schedule
+        self.phase = animation_schedule.next_phase()
+        # rotation angles are rounded to this many degrees and the rotated
+        # frames cached, 0 rotates every frame to the exact angle
+        self.rotationStep = 0
+        self.rotations = {}
+
         # starting position is running north
         self.direction.y = -1
-        self.status = "up"
+        self.state = UP
+        self.import_player_asset()
+
+    def reload_assets(self):
+        """Slices the animations again from the reloaded sprite sheet"""
+
+        self.rotations.clear()
         self.import_player_asset()
 
     def import_player_asset(self):
+        # frames are rotated every frame, so they are not run length encoded
         walkingUpRect = (0, SPRITE_HEIGHT * 3, SPRITE_WIDTH, SPRITE_HEIGHT)
         walkingDownRect = (0, 0, SPRITE_WIDTH, SPRITE_HEIGHT)
         walkingLeftRect = (0, SPRITE_HEIGHT, SPRITE_WIDTH, SPRITE_HEIGHT)
         walkingRightRect = (0, SPRITE_HEIGHT * 2, SPRITE_WIDTH, SPRITE_HEIGHT)
 
-        # animation states in dictionary
-        self.animations = {
-            "up": self.playerAnimations.load_strip(
-                walkingUpRect, 3, self.colorKeyBlack
-            ),
-            "down": self.playerAnimations.load_strip(
-                walkingDownRect, 3, self.colorKeyBlack
-            ),
-            "left": self.playerAnimations.load_strip(
-                walkingLeftRect, 3, self.colorKeyBlack
-            ),
-            "right": self.playerAnimations.load_strip(
-                walkingRightRect, 3, self.colorKeyBlack
-            ),
-            "up_idle": [],
-            "down_idle": [],
-            "left_idle": [],
-            "right_idle": [],
-            "up_attack": [],
-            "down_attack": [],
-            "left_attack": [],
-            "right_attack": [],
-        }
+        # animation frames indexed by state, idle and attack have no art yet
+        self.animations = WALKING.frame_table(
+            {
+                "up": self.playerAnimations.load_strip(
+                    walkingUpRect, 3, self.colorKeyBlack, rle=False
+                ),
+                "down": self.playerAnimations.load_strip(
+                    walkingDownRect, 3, self.colorKeyBlack, rle=False
+                ),
+                "left": self.playerAnimations.load_strip(
+                    walkingLeftRect, 3, self.colorKeyBlack, rle=False
+                ),
+                "right": self.playerAnimations.load_strip(
+                    walkingRightRect, 3, self.colorKeyBlack, rle=False
+                ),
+            }
+        )
 
     def set_status_by_curr_rotation(self):
         """Sets the correct status based on the current direction
@@ -90,25 +115,25 @@ class Player(Entity):
             and self.direction.y < 0.25
             and self.direction.y > -0.25
         ):
-            self.status = "right"
+            self.state = RIGHT
         if (
             self.direction.x < 0
             and self.direction.y < 0.25
             and self.direction.y > -0.25
         ):
-            self.status = "left"
+            self.state = LEFT
         if (
             self.direction.y > 0
             and self.direction.x < 0.25
             and self.direction.x > -0.25
         ):
-            self.status = "down"
+            self.state = DOWN
         if (
             self.direction.y < 0
             and self.direction.x < 0.25
             and self.direction.x > -0.25
         ):
-            self.status = "up"
+            self.state = UP
 
     def input(self):
         """Input function to handle keyboard input to the player class
@@ -132,55 +157,38 @@ class Player(Entity):
             # no moving while attacking
             self.direction.x = 0
             self.direction.y = 0
-            if "attack" not in self.status:
-                if "idle" in self.status:
-                    self.status = self.status.replace("_idle", "_attack")
-                    self.status = self.status + "_attack"
-
+            self.state = START_ATTACK[self.state]
         else:
-            if "attack" in self.status:
-                self.status = self.status.replace("_attack", "")
-
-    def get_angle_from_direction(self, axis):
-        """Gets the angle for sprite rotation based on the direction
-
-        Angle returned will need to be inverted for 'down' and 'left'.
-        """
-        angle = 0
-
-        if axis == "x":
-            angle = self.direction.y * 45
-        if axis == "y":
-            angle = self.direction.x * 45
-
-        return -angle
+            self.state = END_ATTACK[self.state]
 
     def set_image_rotation(self, image):
         """Sets a new image to the correct rotation
 
         Return the rotated image correlating to the correct rotation.
         Rotation is based on the status, so image rotations are defined by the
-        current status.
+        current status: up to 45 degrees either way, following the direction
+        component across the heading. With a rotation step the angle is
+        rounded to it and the rotated image is reused from the cache.
         """
-        angle = 0
-
-        if self.status == "right":
-            angle = self.get_angle_from_direction("x")
-        if self.status == "left":
-            angle = -self.get_angle_from_direction("x")
-        if self.status == "up":
-            angle = self.get_angle_from_direction("y")
-        if self.status == "down":
-            angle = -self.get_angle_from_direction("y")
-
-        return pygame.transform.rotate(image, angle)
+        axis, sign = ROTATION_AXES[self.state]
+        angle = sign * self.direction[axis] * 45
+
+        if not self.rotationStep:
+            return pygame.transform.rotate(image, angle)
+        angle = round(angle / self.rotationStep) * self.rotationStep
+        rotated = self.rotations.get((image, angle))
+        if rotated is None:
+            rotated = self.rotations[(image, angle)] = pygame.transform.rotate(
+                image, angle
+            )
+        return rotated
 
     # animation loop for the player
-    def animate(self):
-        animation = self.animations[self.status]
+    def animate(self, ticks=1):
+        animation = self.animations[self.state]
 
         # loop over the frame index
-        self.frameIndex += self.animationSpeed
+        self.frameIndex += self.animationSpeed * ticks
 
         if self.frameIndex >= len(animation):
             self.frameIndex = 0
@@ -196,33 +204,22 @@ class Player(Entity):
                 self.attacking = False
 
     def collision_check(self, direction):
-        """Collision check for entity
+        """Collision response for the player
 
-        Handles collision checks for entities and other entities/the environment.
-        Prevents entity from moving through obstacles.
+        Lunk bounces off obstacles: the heading is reversed once on the axis
+        the movement was stopped on, however many obstacles were touched.
 
         Parameters
         ----------
         direction: str
-            the axis to check for collisions on. It can be 'horizontal' or 'vertical'.
+            the axis the movement was stopped on. It can be 'horizontal' or 'vertical'.
         """
 
-        # horizontal collision detection
+        # reverse direction
         if direction == "horizontal":
-            # look at all sprites
-            for sprite in self.obstacleSprites:
-                # check if rects collide
-                if sprite.hitbox.colliderect(self.hitbox):
-                    # reverse direction
-                    self.direction.x *= -1
-        # vertical collision detection
+            self.direction.x *= -1
         if direction == "vertical":
-            # look at all sprites
-            for sprite in self.obstacleSprites:
-                # check if rects collide
-                if sprite.hitbox.colliderect(self.hitbox):
-                    # reverse direction
-                    self.direction.y *= -1
+            self.direction.y *= -1
 
     def update(self):
         """Update player entity with corresponding user input
@@ -232,5 +229,7 @@ class Player(Entity):
         self.input()
         self.cooldowns()
         self.get_status()
-        self.animate()
+        frames = self.animationSchedule.due(self.phase)
+        if frames:
+            self.animate(frames)
         self.move(self.speed)
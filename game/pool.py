@@ -0,0 +1,182 @@
+import pygame
+from abc import (
+    ABC,
+    abstractmethod,
+)
+
+
+class PooledSprite(pygame.sprite.Sprite, ABC):
+    """Base class for short-lived sprites recycled by a SpritePool
+
+    Subclasses create their image and rect once in __init__ and reset the
+    rest of their state in spawn(), reusing the same surface every time the
+    sprite comes back out of the pool.
+    ...
+
+    Attributes
+    ----------
+    pool : SpritePool
+        the pool the sprite belongs to
+    expires : int or None
+        pygame ticks at which the sprite despawns itself, None to live until
+        despawn() is called
+
+    Methods
+    -------
+    spawn(self, *args, **kwargs)
+        Resets the sprite state when it is taken from the pool.
+    despawn(self)
+        Returns the sprite to its pool.
+    update(self)
+        Despawns the sprite once its lifetime is over.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pool = None
+        self.expires = None
+
+    @abstractmethod
+    def spawn(self, *args, **kwargs):
+        """Resets the sprite state when it is taken from the pool
+
+        Should be implemented in any child classes, and reuse the existing
+        image surface rather than creating a new one.
+        """
+
+        raise Exception("Not Implemented")
+
+    def despawn(self):
+        """Returns the sprite to its pool"""
+
+        self.pool.release(self)
+
+    def update(self):
+        """Despawns the sprite once its lifetime is over"""
+
+        if self.expires is not None and pygame.time.get_ticks() >= self.expires:
+            self.despawn()
+
+
+class SpritePool:
+    """Recycles short-lived sprites such as attacks, projectiles and hit effects
+
+    Creating a sprite and killing it every few frames churns allocations and
+    group bookkeeping. The pool keeps released sprites, with their surfaces,
+    and hands them out again on the next spawn. When every sprite is in use
+    the oldest active one is recycled, so the pool never grows past capacity.
+    ...
+
+    Methods
+    -------
+    spawn(self, *args, **kwargs)
+        Takes a sprite from the pool and adds it to the groups.
+    release(self, sprite)
+        Removes a sprite from the groups and returns it to the pool.
+    clear(self)
+        Releases every active sprite.
+    stats(self)
+        Returns the pool occupancy counters.
+    """
+
+    def __init__(self, sprite_class, groups, capacity, preallocate=0):
+        """Initialize the pool
+
+        Parameters
+        ----------
+            sprite_class : PooledSprite subclass
+                class of the pooled sprites, created without arguments
+            groups : list of sprite groups
+                groups active sprites are added to
+            capacity : int
+                maximum number of sprites the pool creates
+            preallocate : int
+                number of sprites created up front
+        """
+
+        self.sprite_class = sprite_class
+        self.groups = groups
+        self.capacity = capacity
+        # insertion ordered, so the first key is the oldest active sprite
+        self.active = {}
+        self.free = []
+
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self.high_water = 0
+
+        for _ in range(min(preallocate, capacity)):
+            self.free.append(self._create())
+
+    def _create(self):
+        sprite = self.sprite_class()
+        sprite.pool = self
+        self.created += 1
+        return sprite
+
+    def spawn(self, *args, **kwargs):
+        """Takes a sprite from the pool and adds it to the groups
+
+        The arguments are passed to the sprite spawn() method.
+
+        Returns
+        -------
+        PooledSprite
+            the spawned sprite
+        """
+
+        if self.free:
+            sprite = self.free.pop()
+            self.reused += 1
+        elif len(self.active) < self.capacity:
+            sprite = self._create()
+        else:
+            # pool exhausted, steal the oldest active sprite
+            sprite = next(iter(self.active))
+            del self.active[sprite]
+            sprite.remove(*self.groups)
+            self.recycled += 1
+
+        sprite.spawn(*args, **kwargs)
+        sprite.add(*self.groups)
+        self.active[sprite] = None
+        if len(self.active) > self.high_water:
+            self.high_water = len(self.active)
+        return sprite
+
+    def release(self, sprite):
+        """Removes a sprite from the groups and returns it to the pool"""
+
+        if sprite in self.active:
+            del self.active[sprite]
+            sprite.remove(*self.groups)
+            sprite.expires = None
+            self.free.append(sprite)
+
+    def clear(self):
+        """Releases every active sprite"""
+
+        for sprite in list(self.active):
+            self.release(sprite)
+
+    def stats(self):
+        """Returns the pool occupancy counters
+
+        Returns
+        -------
+        dict
+            active, free and created sprite counts, the capacity, how many
+            spawns reused a free sprite or recycled an active one, and the
+            highest number of sprites active at once
+        """
+
+        return {
+            "active": len(self.active),
+            "free": len(self.free),
+            "capacity": self.capacity,
+            "created": self.created,
+            "reused": self.reused,
+            "recycled": self.recycled,
+            "high_water": self.high_water,
+        }
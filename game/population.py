@@ -0,0 +1,263 @@
+from settings import (
+    POPULATION_ACTIVATE_RADIUS,
+    POPULATION_BUDGET,
+    POPULATION_CHUNK_SIZE,
+    POPULATION_DEACTIVATE_RADIUS,
+    POPULATION_INTERVAL,
+    TILESIZE,
+)
+from snapshot import KIND_DAMSEL, KIND_ENEMY, apply_npc_record, npc_groups, npc_record
+
+# map tiles that declare an npc, tile -> npc kind
+SPAWN_TILES = {"e": KIND_ENEMY, "d": KIND_DAMSEL}
+
+
+class SpawnRecord:
+    """An npc that is not simulated, kept as a kind, a position and its state
+
+    Attributes
+    ----------
+    kind : int
+        KIND_ENEMY or KIND_DAMSEL
+    x, y : int
+        world position of the top left corner of the npc
+    state : tuple or None
+        the npc state in the snapshot NPC record layout, None for an npc that
+        was never active and starts as freshly spawned
+    """
+
+    __slots__ = ("kind", "x", "y", "state")
+
+    def __init__(self, kind, x, y, state=None):
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.state = state
+
+
+class Population:
+    """Simulates only the npcs near the camera, within an active budget
+
+    Every npc declared by the map starts as a spawn record, bucketed by the
+    chunk of the map it is in. Records within the activation radius of the
+    camera are turned into sprites, nearest first, until the budget is
+    reached. Active npcs that wander past the larger deactivation radius are
+    turned back into records that keep their position and state, so an npc
+    on the edge does not flicker in and out. When the budget is full, active
+    npcs between the two radii make room for closer records.
+
+    The update cost of the level then depends on the budget rather than on
+    the number of npcs on the map, and only the chunks around the camera are
+    looked at.
+    ...
+
+    Methods
+    -------
+    add(self, kind, pos, state=None)
+        Adds a dormant npc.
+    update(self, center)
+        Refreshes the population every few ticks.
+    refresh(self, center)
+        Activates and deactivates npcs around the camera.
+    activate(self, record)
+        Spawns the sprite of a dormant npc.
+    deactivate(self, kind, sprite)
+        Turns an active npc back into a dormant record.
+    records(self)
+        Returns every dormant record.
+    restore(self, records)
+        Replaces the dormant records.
+    stats(self)
+        Returns the population counters.
+    """
+
+    def __init__(
+        self,
+        level,
+        budget=POPULATION_BUDGET,
+        activate_radius=POPULATION_ACTIVATE_RADIUS,
+        deactivate_radius=POPULATION_DEACTIVATE_RADIUS,
+        chunk_size=POPULATION_CHUNK_SIZE,
+        interval=POPULATION_INTERVAL,
+    ):
+        """Initialize an empty population
+
+        Parameters
+        ----------
+            level : Level
+                the level npcs are spawned into
+            budget : int or None
+                most npcs active at once, None for no limit
+            activate_radius, deactivate_radius : float
+                distances from the camera in pixels, the deactivation radius
+                is the larger one
+            chunk_size : int
+                size of the record buckets in tiles
+            interval : int
+                ticks between refreshes
+        """
+
+        self.level = level
+        self.budget = budget
+        self.activate_radius = activate_radius
+        self.deactivate_radius = deactivate_radius
+        self.chunk_pixels = chunk_size * TILESIZE
+        self.interval = interval
+        # (chunk x, chunk y) -> records in insertion order
+        self.chunks = {}
+        self.dormant = 0
+        self.activated = 0
+        self.deactivated = 0
+        self._ticks = 0
+
+    def _chunk(self, x, y):
+        return (int(x // self.chunk_pixels), int(y // self.chunk_pixels))
+
+    def add(self, kind, pos, state=None):
+        """Adds a dormant npc, activated once the camera comes near it"""
+
+        record = SpawnRecord(kind, int(pos[0]), int(pos[1]), state)
+        self.chunks.setdefault(self._chunk(record.x, record.y), {})[record] = None
+        self.dormant += 1
+        return record
+
+    def update(self, center):
+        """Refreshes the population every few ticks, called once per tick"""
+
+        self._ticks += 1
+        if self._ticks >= self.interval:
+            self._ticks = 0
+            self.refresh(center)
+
+    def refresh(self, center):
+        """Activates and deactivates npcs around the camera
+
+        Distances are measured from the camera centre to the top left corner
+        of the npcs.
+        """
+
+        center_x, center_y = center
+        far = self.deactivate_radius**2
+        active = []
+        for kind, group, _ in npc_groups(self.level):
+            for sprite in group.sprites():
+                x, y = sprite.rect.topleft
+                distance = (x - center_x) ** 2 + (y - center_y) ** 2
+                if distance > far:
+                    self.deactivate(kind, sprite)
+                else:
+                    active.append((distance, kind, sprite))
+        active.sort(key=_distance)
+
+        # npcs spawned or restored past the budget, farthest ones go first
+        if self.budget is not None:
+            while len(active) > self.budget:
+                _, kind, sprite = active.pop()
+                self.deactivate(kind, sprite)
+
+        near = self.activate_radius**2
+        # farthest last, so closer records replace them first
+        replaceable = [entry for entry in active if entry[0] > near]
+        count = len(active)
+        for _, record in self._candidates(center_x, center_y, near):
+            if self.budget is None or count < self.budget:
+                count += 1
+            elif replaceable:
+                _, kind, sprite = replaceable.pop()
+                self.deactivate(kind, sprite)
+            else:
+                break
+            self.activate(record)
+
+    def _candidates(self, center_x, center_y, near):
+        """Returns (distance, record) of the records to activate, nearest first"""
+
+        radius = self.activate_radius
+        left, top = self._chunk(center_x - radius, center_y - radius)
+        right, bottom = self._chunk(center_x + radius, center_y + radius)
+        if (right - left + 1) * (bottom - top + 1) <= len(self.chunks):
+            chunks = [
+                self.chunks.get((chunk_x, chunk_y), ())
+                for chunk_y in range(top, bottom + 1)
+                for chunk_x in range(left, right + 1)
+            ]
+        else:
+            # fewer chunks hold records than the radius covers
+            chunks = [
+                records
+                for (chunk_x, chunk_y), records in self.chunks.items()
+                if left <= chunk_x <= right and top <= chunk_y <= bottom
+            ]
+        candidates = []
+        for records in chunks:
+            for record in records:
+                distance = (record.x - center_x) ** 2 + (record.y - center_y) ** 2
+                if distance <= near:
+                    candidates.append((distance, record))
+        candidates.sort(key=_distance)
+        return candidates
+
+    def activate(self, record):
+        """Spawns the sprite of a dormant npc and forgets the record"""
+
+        chunk = self._chunk(record.x, record.y)
+        records = self.chunks[chunk]
+        del records[record]
+        if not records:
+            del self.chunks[chunk]
+        self.dormant -= 1
+        self.activated += 1
+
+        spawn = {kind: spawn for kind, _, spawn in npc_groups(self.level)}[record.kind]
+        sprite = spawn((record.x, record.y))
+        if record.state is not None:
+            apply_npc_record(sprite, record.state)
+        return sprite
+
+    def deactivate(self, kind, sprite):
+        """Turns an active npc back into a dormant record that keeps its state"""
+
+        sprite.kill()
+        self.deactivated += 1
+        return self.add(kind, sprite.rect.topleft, npc_record(kind, sprite))
+
+    def records(self):
+        """Returns every dormant record"""
+
+        return [record for records in self.chunks.values() for record in records]
+
+    def restore(self, records):
+        """Replaces the dormant records
+
+        Parameters
+        ----------
+        records : iterable of tuple
+            (kind, x, y, state) of every dormant npc
+        """
+
+        self.chunks = {}
+        self.dormant = 0
+        for kind, x, y, state in records:
+            self.add(kind, (x, y), state)
+
+    def stats(self):
+        """Returns the population counters
+
+        Returns
+        -------
+        dict
+            active and dormant npc counts, the budget, and how many times npcs
+            were activated and deactivated
+        """
+
+        return {
+            "active": sum(len(group) for _, group, _ in npc_groups(self.level)),
+            "dormant": self.dormant,
+            "budget": self.budget,
+            "activated": self.activated,
+            "deactivated": self.deactivated,
+        }
+
+
+def _distance(entry):
+    return entry[0]
@@ -0,0 +1,90 @@
+import pygame
+
+
+class RenderTarget:
+    """Internal render surface upscaled onto the display once per frame
+
+    With a scale above 1 the world is drawn into a surface that many times
+    smaller than the display and upscaled in a single pass by present(). The
+    level draws at TILESIZE / scale pixels per tile on it (see
+    YSortCameraGroup.set_surface), so the view of the world is unchanged and
+    only the resolution drops, trading detail for fill rate. Integer mode
+    uses nearest neighbour scaling by a whole factor, letterboxing any
+    remainder. Smooth mode accepts any factor and filters. With a scale of 1
+    the display surface is drawn on directly.
+    ...
+
+    Attributes
+    ----------
+    surface : pygame.Surface
+        the surface the world should be drawn on this frame
+    scale : int or float
+        display pixels per internal pixel
+    smooth : bool
+        filter when upscaling instead of nearest neighbour
+
+    Methods
+    -------
+    set_scale(self, scale, smooth)
+        Changes the render resolution.
+    present(self)
+        Upscales the internal surface onto the display.
+    """
+
+    def __init__(self, screen, scale=1, smooth=False):
+        """Initialize the render target
+
+        Parameters
+        ----------
+            screen : pygame.Surface
+                the display surface
+            scale : int or float
+                display pixels per internal pixel
+            smooth : bool
+                filter when upscaling, allows non integer scales
+        """
+
+        self.screen = screen
+        self.set_scale(scale, smooth)
+
+    def set_scale(self, scale, smooth=None):
+        """Changes the resolution, the internal surface is 1 / scale of the display
+
+        Integer mode rounds the scale down to a whole factor. The previous
+        internal surface is discarded, so anything holding on to it should
+        fetch surface again.
+        """
+
+        if smooth is not None:
+            self.smooth = smooth
+        if not self.smooth:
+            scale = int(scale)
+        self.scale = max(scale, 1)
+
+        width, height = self.screen.get_size()
+        if self.scale == 1:
+            self.surface = self.screen
+            self._destination = None
+            return
+
+        size = (int(width / self.scale), int(height / self.scale))
+        self.surface = pygame.Surface(size).convert(self.screen)
+        if self.smooth:
+            scaled = self.screen.get_rect()
+        else:
+            # whole factor scaling, centred with a black border if needed
+            scaled = pygame.Rect(0, 0, size[0] * self.scale, size[1] * self.scale)
+            scaled.center = self.screen.get_rect().center
+            self.screen.fill("black")
+        self._destination = self.screen.subsurface(scaled)
+
+    def present(self):
+        """Upscales the internal surface onto the display"""
+
+        if self._destination is None:
+            return
+        size = self._destination.get_size()
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, size, self._destination)
+        else:
+            pygame.transform.scale(self.surface, size, self._destination)
@@ -0,0 +1,231 @@
+import struct
+from attack import Attack
+from damsel import Damsel
+from enemy1 import Enemy1
+from plant import Plant
+from player import Player
+from snapshot import NO_STATUS
+from wall import Wall
+
+# entity kinds sent over the wire
+KIND_WALL = 0
+KIND_PLANT = 1
+KIND_PLAYER = 2
+KIND_ENEMY = 3
+KIND_DAMSEL = 4
+KIND_ATTACK = 5
+KINDS = (
+    (Wall, KIND_WALL),
+    (Plant, KIND_PLANT),
+    (Player, KIND_PLAYER),
+    (Enemy1, KIND_ENEMY),
+    (Damsel, KIND_DAMSEL),
+    (Attack, KIND_ATTACK),
+)
+
+# every message is a u32 length followed by the body. A snapshot body is
+#   header   tick, player entity id, created, updated and removed counts,
+#            u32 so a full snapshot of a large map fits in one message
+#   created  id, kind, x, y, status, frame for every new entity
+#   updated  id and a mask of changed fields followed by those fields
+#   removed  ids of entities that are gone
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<IIIII")
+CREATED = struct.Struct("<IBiiBB")
+UPDATED = struct.Struct("<IB")
+REMOVED = struct.Struct("<I")
+DELTA = struct.Struct("<h")
+WIDE = struct.Struct("<i")
+BYTE = struct.Struct("<B")
+
+# update mask bits
+CHANGED_X = 1
+CHANGED_Y = 2
+CHANGED_STATUS = 4
+CHANGED_FRAME = 8
+# positions are sent as absolute i32 instead of i16 deltas
+WIDE_POSITION = 16
+DELTA_LIMIT = 32767
+
+
+def kind_of(sprite):
+    """Returns the wire kind of a sprite, None if it is not replicated"""
+
+    sprite_type = type(sprite)
+    for cls, kind in KINDS:
+        if issubclass(sprite_type, cls):
+            return kind
+    return None
+
+
+class EntityIds:
+    """Hands out stable integer ids for replicated sprites"""
+
+    def __init__(self):
+        self.ids = {}
+        self.next_id = 1
+
+    def __getitem__(self, sprite):
+        entity_id = self.ids.get(sprite)
+        if entity_id is None:
+            entity_id = self.ids[sprite] = self.next_id
+            self.next_id += 1
+        return entity_id
+
+    def forget_missing(self, alive):
+        """Drops the ids of sprites that are no longer alive"""
+
+        for sprite in [sprite for sprite in self.ids if sprite not in alive]:
+            del self.ids[sprite]
+
+
+def capture(sprites, ids):
+    """Captures the replicated state of every sprite
+
+    Returns
+    -------
+    dict
+        entity id -> (kind, x, y, status, frame)
+    """
+
+    state = {}
+    for sprite in sprites:
+        kind = kind_of(sprite)
+        if kind is None:
+            continue
+        status = getattr(sprite, "state", None)
+        state[ids[sprite]] = (
+            kind,
+            sprite.rect.x,
+            sprite.rect.y,
+            NO_STATUS if status is None else status,
+            int(sprite.frameIndex) & 0xFF if hasattr(sprite, "frameIndex") else 0,
+        )
+    return state
+
+
+def encode(tick, player_id, baseline, current):
+    """Encodes the difference between two captured states
+
+    Parameters
+    ----------
+    tick : int
+        the server tick of the current state
+    player_id : int
+        entity id the client camera follows
+    baseline : dict
+        the state the client already has, empty for a full snapshot
+    current : dict
+        the state to send
+
+    Returns
+    -------
+    bytearray
+        a length prefixed message
+    """
+
+    created = []
+    updated = []
+    for entity_id, entity in current.items():
+        previous = baseline.get(entity_id)
+        if previous is None:
+            created.append(CREATED.pack(entity_id, *entity))
+        elif previous != entity:
+            updated.append(_encode_update(entity_id, previous, entity))
+    removed = [
+        REMOVED.pack(entity_id) for entity_id in baseline if entity_id not in current
+    ]
+
+    body = bytearray(
+        HEADER.pack(tick, player_id, len(created), len(updated), len(removed))
+    )
+    for part in (created, updated, removed):
+        for chunk in part:
+            body += chunk
+    return LENGTH.pack(len(body)) + body
+
+
+def _encode_update(entity_id, previous, entity):
+    _, old_x, old_y, old_status, old_frame = previous
+    _, x, y, status, frame = entity
+    mask = 0
+    fields = bytearray()
+    if x != old_x or y != old_y:
+        wide = abs(x - old_x) > DELTA_LIMIT or abs(y - old_y) > DELTA_LIMIT
+        if wide:
+            mask |= WIDE_POSITION
+        if x != old_x:
+            mask |= CHANGED_X
+            fields += WIDE.pack(x) if wide else DELTA.pack(x - old_x)
+        if y != old_y:
+            mask |= CHANGED_Y
+            fields += WIDE.pack(y) if wide else DELTA.pack(y - old_y)
+    if status != old_status:
+        mask |= CHANGED_STATUS
+        fields += BYTE.pack(status)
+    if frame != old_frame:
+        mask |= CHANGED_FRAME
+        fields += BYTE.pack(frame)
+    return UPDATED.pack(entity_id, mask) + fields
+
+
+def decode(state, body):
+    """Applies a snapshot body to a client side state
+
+    Parameters
+    ----------
+    state : dict
+        entity id -> (kind, x, y, status, frame), updated in place
+    body : bytes-like
+        a message body without its length prefix
+
+    Returns
+    -------
+    tuple
+        tick, player entity id, and the lists of created, updated and
+        removed entity ids
+    """
+
+    tick, player_id, created_count, updated_count, removed_count = HEADER.unpack_from(
+        body, 0
+    )
+    offset = HEADER.size
+
+    created = []
+    for _ in range(created_count):
+        entity_id, *entity = CREATED.unpack_from(body, offset)
+        offset += CREATED.size
+        state[entity_id] = tuple(entity)
+        created.append(entity_id)
+
+    updated = []
+    for _ in range(updated_count):
+        entity_id, mask = UPDATED.unpack_from(body, offset)
+        offset += UPDATED.size
+        kind, x, y, status, frame = state[entity_id]
+        position = WIDE if mask & WIDE_POSITION else DELTA
+        if mask & CHANGED_X:
+            value = position.unpack_from(body, offset)[0]
+            x = value if mask & WIDE_POSITION else x + value
+            offset += position.size
+        if mask & CHANGED_Y:
+            value = position.unpack_from(body, offset)[0]
+            y = value if mask & WIDE_POSITION else y + value
+            offset += position.size
+        if mask & CHANGED_STATUS:
+            status = body[offset]
+            offset += 1
+        if mask & CHANGED_FRAME:
+            frame = body[offset]
+            offset += 1
+        state[entity_id] = (kind, x, y, status, frame)
+        updated.append(entity_id)
+
+    removed = []
+    for _ in range(removed_count):
+        entity_id = REMOVED.unpack_from(body, offset)[0]
+        offset += REMOVED.size
+        state.pop(entity_id, None)
+        removed.append(entity_id)
+
+    return tick, player_id, created, updated, removed
@@ -0,0 +1,255 @@
+import threading
+from abc import (
+    ABC,
+    abstractmethod,
+)
+import pygame
+from allocprofile import alloc_profiler
+from menu import MainMenu
+from minimap import Minimap
+from settings import TRANSITION_TIME
+
+LOADING_BAR_SIZE = (400, 12)
+LOADING_BAR_COLOR = (170, 170, 170)
+
+
+class Scene(ABC):
+    """A screen of the game, such as the main menu or a level
+
+    Methods
+    -------
+    enter(self)
+        Called when the scene becomes the current scene.
+    exit(self)
+        Called when another scene replaces it.
+    run(self)
+        Updates and draws one frame.
+    """
+
+    def enter(self):
+        pass
+
+    def exit(self):
+        pass
+
+    @abstractmethod
+    def run(self):
+        """Updates and draws one frame
+
+        Returns
+        -------
+        list of pygame.Rect or None
+            the regions of the display that changed, None for all of it
+        """
+
+        raise Exception("Not Implemented")
+
+
+class SceneManager:
+    """Holds the current scene and switches between scenes"""
+
+    def __init__(self):
+        self.current = None
+
+    def switch(self, scene):
+        """Makes a scene the current scene"""
+
+        if self.current is not None:
+            self.current.exit()
+        self.current = scene
+        scene.enter()
+
+    def run(self):
+        """Runs one frame of the current scene, see Scene.run"""
+
+        return self.current.run()
+
+
+class LevelLoader:
+    """Builds a level on a background thread
+
+    The level is started as soon as the loader is, typically while the main
+    menu is showing, so entering it later does not wait for sprites, assets
+    and the map to be created. Errors raised while building are re-raised by
+    result().
+    ...
+
+    Attributes
+    ----------
+    progress : float
+        fraction of the level built so far, from 0 to 1
+
+    Methods
+    -------
+    start(self)
+        Starts building the level.
+    result(self)
+        Waits for the level and returns it.
+    """
+
+    def __init__(self, build, on_progress=None):
+        """Initialize the loader
+
+        Parameters
+        ----------
+            build : callable
+                called on the loader thread with a progress callback, returns
+                the level
+            on_progress : callable or None
+                also called on the loader thread with every progress fraction
+        """
+
+        self.build = build
+        self.on_progress = on_progress
+        self.progress = 0.0
+        self._level = None
+        self._error = None
+        self._thread = None
+
+    @property
+    def done(self):
+        return self._thread is not None and not self._thread.is_alive()
+
+    def start(self):
+        """Starts building the level, does nothing if already started"""
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._build, name="level loader", daemon=True
+            )
+            self._thread.start()
+
+    def result(self):
+        """Waits for the level and returns it"""
+
+        self.start()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._level
+
+    def _build(self):
+        try:
+            self._level = self.build(self._report)
+        except Exception as error:
+            self._error = error
+
+    def _report(self, fraction):
+        self.progress = fraction
+        if self.on_progress is not None:
+            self.on_progress(fraction)
+
+
+class MenuScene(Scene):
+    """The main menu, starts the level on New Game"""
+
+    def __init__(self, game):
+        self.game = game
+        self.menu = None
+
+    def enter(self):
+        if self.menu is None:
+            self.menu = MainMenu()
+        self.menu.invalidate()
+        self.game.events.subscribe(pygame.MOUSEBUTTONDOWN, self.on_click, button=1)
+
+    def exit(self):
+        self.game.events.unsubscribe(pygame.MOUSEBUTTONDOWN, self.on_click)
+
+    def on_click(self, event):
+        if self.menu.handle_event(event) == "New Game":
+            self.game.scenes.switch(
+                TransitionScene(
+                    self.game.scenes, self.game.loader, lambda: LevelScene(self.game)
+                )
+            )
+
+    def run(self):
+        return self.menu.run()
+
+
+class TransitionScene(Scene):
+    """Fades the last frame to black, then waits for a level to be loaded
+
+    A loading bar is shown only if the level is still being built when the
+    fade has finished.
+    """
+
+    def __init__(self, scenes, loader, next_scene, duration=TRANSITION_TIME):
+        """Initialize the transition
+
+        Parameters
+        ----------
+            scenes : SceneManager
+                switched to the next scene at the end of the transition
+            loader : LevelLoader
+                the transition lasts until it is done
+            next_scene : callable
+                returns the scene to switch to
+            duration : int
+                length of the fade in milliseconds
+        """
+
+        self.scenes = scenes
+        self.loader = loader
+        self.next_scene = next_scene
+        self.duration = duration
+        self.display_surface = pygame.display.get_surface()
+
+    def enter(self):
+        self.loader.start()
+        self.start_time = pygame.time.get_ticks()
+        self.last_frame = self.display_surface.copy()
+        self.shade = pygame.Surface(self.display_surface.get_size()).convert()
+        self.shade.fill("black")
+
+    def run(self):
+        elapsed = pygame.time.get_ticks() - self.start_time
+        fraction = min(elapsed / self.duration, 1.0) if self.duration else 1.0
+        if fraction >= 1.0 and self.loader.done:
+            self.scenes.switch(self.next_scene())
+            return self.scenes.run()
+
+        self.display_surface.blit(self.last_frame, (0, 0))
+        self.shade.set_alpha(int(255 * fraction))
+        self.display_surface.blit(self.shade, (0, 0))
+        if fraction >= 1.0:
+            self.draw_loading_bar(self.loader.progress)
+        return None
+
+    def draw_loading_bar(self, progress):
+        bar = pygame.Rect((0, 0), LOADING_BAR_SIZE)
+        bar.center = self.display_surface.get_rect().center
+        pygame.draw.rect(self.display_surface, LOADING_BAR_COLOR, bar, 1)
+        filled = bar.inflate(-4, -4)
+        filled.width = int(filled.width * progress)
+        self.display_surface.fill(LOADING_BAR_COLOR, filled)
+
+
+class LevelScene(Scene):
+    """Plays the level, drawn through the render target of the game"""
+
+    def __init__(self, game):
+        self.game = game
+        self.minimap = None
+
+    def enter(self):
+        level = self.game.level
+        if level.display_surface is not self.game.render_target.surface:
+            # the render scale changed while the level was loading
+            level.set_surface(
+                self.game.render_target.surface, self.game.render_target.scale
+            )
+        self.minimap = Minimap(level.world_map)
+        level.tile_listeners.append(self.minimap.set_tile)
+        level.start()
+
+    def run(self):
+        self.game.render_target.surface.fill("black")
+        self.game.level.run()
+        with alloc_profiler.section("present"):
+            self.game.render_target.present()
+        # drawn on the display, so it stays sharp whatever the render scale
+        with alloc_profiler.section("minimap"):
+            self.minimap.draw(self.game.screen, self.game.level)
+        return None
@@ -0,0 +1,251 @@
+import argparse
+import os
+import selectors
+import socket
+import time
+import pygame
+from level1 import Level
+from replication import EntityIds, capture, encode
+from settings import (
+    SERVER_ADDRESS,
+    SERVER_MAX_BACKLOG,
+    SERVER_TICK_RATE,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+)
+
+
+def open_socket(address, listen):
+    """Creates a TCP or Unix stream socket for an address
+
+    Parameters
+    ----------
+    address : str
+        "host:port" for TCP or "unix:/path" for a Unix socket
+    listen : bool
+        bind and listen when true, connect otherwise
+    """
+
+    if address.startswith("unix:"):
+        path = address.split(":", 1)[1]
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if listen and os.path.exists(path):
+            os.unlink(path)
+        target = path
+    else:
+        host, port = address.rsplit(":", 1)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if listen:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        target = (host, int(port))
+    if listen:
+        sock.bind(target)
+        sock.listen()
+    else:
+        sock.connect(target)
+    return sock
+
+
+class ClientConnection:
+    """Server side state of one connected client"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        # state the client has been sent, deltas are encoded against it
+        self.baseline = {}
+        self.outgoing = bytearray()
+        self.bytes_sent = 0
+
+
+class LevelServer:
+    """Authoritative headless level that broadcasts delta snapshots
+
+    The level is updated at a fixed tick rate without drawing. Every tick the
+    replicated state of each visible sprite is captured once and encoded per
+    client against what that client was last sent, so static tiles are only
+    sent on connect and moving entities cost a few bytes each. Sends never
+    block the tick: clients that fall too far behind are dropped.
+    ...
+
+    Methods
+    -------
+    tick(self)
+        Accepts clients, updates the level and broadcasts a snapshot.
+    serve_forever(self)
+        Runs ticks at the fixed tick rate.
+    stats(self)
+        Returns the snapshot size and encode time counters.
+    """
+
+    def __init__(self, level, address, tick_rate=SERVER_TICK_RATE):
+        """Initialize the server and start listening
+
+        Parameters
+        ----------
+            level : Level
+                the level to simulate
+            address : str
+                "host:port" or "unix:/path" to listen on
+            tick_rate : int
+                simulation and broadcast ticks per second
+        """
+
+        self.level = level
+        self.tick_rate = tick_rate
+        self.tick_count = 0
+        self.ids = EntityIds()
+        self.clients = []
+
+        self.listener = open_socket(address, listen=True)
+        self.listener.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+
+        # counters since the last stats() call
+        self._encode_seconds = 0.0
+        self._encoded_bytes = 0
+        self._messages = 0
+        self._window_start = time.perf_counter()
+        self._window_ticks = 0
+
+    def accept_clients(self):
+        """Accepts every pending connection without blocking"""
+
+        for _ in self.selector.select(timeout=0):
+            try:
+                sock, _ = self.listener.accept()
+            except BlockingIOError:
+                continue
+            sock.setblocking(False)
+            self.clients.append(ClientConnection(sock))
+
+    def tick(self):
+        """Accepts clients, updates the level and broadcasts a snapshot"""
+
+        self.accept_clients()
+        self.level.update()
+        self.tick_count += 1
+        self._window_ticks += 1
+        if not self.clients:
+            return
+
+        sprites = self.level.visible_sprites.sprites()
+        current = capture(sprites, self.ids)
+        self.ids.forget_missing(set(sprites))
+        player_id = self.ids[self.level.player]
+        for client in list(self.clients):
+            start = time.perf_counter()
+            message = encode(self.tick_count, player_id, client.baseline, current)
+            self._encode_seconds += time.perf_counter() - start
+            self._encoded_bytes += len(message)
+            self._messages += 1
+            client.baseline = current
+            client.outgoing += message
+            self.flush(client)
+
+    def flush(self, client):
+        """Sends as much of the pending data as the socket accepts"""
+
+        try:
+            sent = client.sock.send(client.outgoing)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self.drop(client)
+            return
+        del client.outgoing[:sent]
+        client.bytes_sent += sent
+        if len(client.outgoing) > SERVER_MAX_BACKLOG:
+            print("Dropping client that fell too far behind")
+            self.drop(client)
+
+    def drop(self, client):
+        client.sock.close()
+        self.clients.remove(client)
+
+    def stats(self):
+        """Returns the counters gathered since the previous call
+
+        Returns
+        -------
+        dict
+            ticks per second, entity and client counts, mean encode time per
+            client snapshot and bytes per client per second
+        """
+
+        elapsed = max(time.perf_counter() - self._window_start, 1e-9)
+        messages = max(self._messages, 1)
+        result = {
+            "ticks_per_second": self._window_ticks / elapsed,
+            "entities": len(self.ids.ids),
+            "clients": len(self.clients),
+            "encode_ms": self._encode_seconds * 1000 / messages,
+            "bytes_per_snapshot": self._encoded_bytes / messages,
+            "bytes_per_client_per_second": self._encoded_bytes
+            / max(len(self.clients), 1)
+            / elapsed,
+        }
+        self._encode_seconds = 0.0
+        self._encoded_bytes = 0
+        self._messages = 0
+        self._window_start = time.perf_counter()
+        self._window_ticks = 0
+        return result
+
+    def serve_forever(self, report_every=None):
+        """Runs ticks at the fixed tick rate
+
+        Parameters
+        ----------
+        report_every : float or None
+            seconds between printed stats lines, None to stay quiet
+        """
+
+        clock = pygame.time.Clock()
+        last_report = time.perf_counter()
+        while True:
+            self.tick()
+            if report_every and time.perf_counter() - last_report >= report_every:
+                last_report = time.perf_counter()
+                stats = self.stats()
+                print(
+                    f"tick {self.tick_count}  {stats['ticks_per_second']:.0f} tps  "
+                    f"{stats['entities']} entities  {stats['clients']} clients  "
+                    f"encode {stats['encode_ms']:.3f} ms  "
+                    f"{stats['bytes_per_snapshot']:.0f} B/snapshot  "
+                    f"{stats['bytes_per_client_per_second'] / 1024:.1f} KiB/s/client"
+                )
+            clock.tick(self.tick_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Lunk headless as a server")
+    parser.add_argument(
+        "--listen",
+        default=SERVER_ADDRESS,
+        help='"host:port" or "unix:/path" (default %(default)s)',
+    )
+    parser.add_argument("--tick-rate", type=int, default=SERVER_TICK_RATE)
+    parser.add_argument("--map", metavar="PATH", help="map CSV to serve")
+    parser.add_argument(
+        "--stats",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="print snapshot size and encode time every SECONDS",
+    )
+    args = parser.parse_args()
+
+    # the server never opens a window or plays sound, SDL reads these on init
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    server = LevelServer(Level(map_path=args.map), args.listen, args.tick_rate)
+    print(f"Serving on {args.listen} at {args.tick_rate} ticks per second")
+    server.serve_forever(report_every=args.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,91 @@ WINDOW_CENTER = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
 
 FPS = 60
 TILESIZE = 64
+# line of sight between static tiles up to this many tiles apart is traced
+# once when the level loads, 0 traces every line on demand
+LINE_OF_SIGHT_RADIUS = 0
+
+# frames held by the telemetry ring buffer, half of it is written at a time
+TELEMETRY_CAPACITY = 1024
+
+# display pixels per rendered pixel, see render_target.py. The world is drawn
+# at 1 / RENDER_SCALE of the display resolution and upscaled, the view of the
+# world stays the same. 1 draws on the display directly
+RENDER_SCALE = 1
+# filter the upscale, allows non integer RENDER_SCALE values
+RENDER_SMOOTH = False
+
+# quality levels stepped through by the governor to hold the frame budget,
+# best first, see governor.py. Intervals are in ticks, the rotation step in
+# degrees with 0 for exact rotations. The render scale multiplies RENDER_SCALE,
+# lowering the resolution with the view of the world unchanged
+QUALITY_LEVELS = (
+    dict(npc_interval=1, animation_interval=1, rotation_step=0, render_scale=1),
+    dict(npc_interval=2, animation_interval=1, rotation_step=5, render_scale=1),
+    dict(npc_interval=2, animation_interval=2, rotation_step=15, render_scale=1),
+    dict(npc_interval=3, animation_interval=2, rotation_step=15, render_scale=2),
+    dict(npc_interval=4, animation_interval=3, rotation_step=45, render_scale=2),
+)
+# frames measured before each decision of the governor
+QUALITY_WINDOW = 60
+# fractions of the frame budget, the 90th percentile work time of a window
+# above the first steps quality down, below the second steps it up once it
+# held for QUALITY_UP_WINDOWS windows in a row
+QUALITY_DOWN_THRESHOLD = 0.9
+QUALITY_UP_THRESHOLD = 0.5
+QUALITY_UP_WINDOWS = 3
+
+# map overview in the top right corner, see minimap.py. Pixels per tile, and
+# frames between redraws of the entity markers
+MINIMAP_SIZE = (160, 160)
+MINIMAP_SCALE = 2
+MINIMAP_MARGIN = 10
+MINIMAP_INTERVAL = 6
+
+# fog of war over unexplored tiles, also on the minimap, see fog.py. Tiles
+# revealed around the player
+FOG_ENABLED = True
+FOG_REVEAL_RADIUS = 6
+FOG_COLOR = (0, 0, 0)
 
 # image paths
 
 GAME_ICON_PATH = "graphics/game_icon.jpg"
 MAIN_MENU_BACKGROUND_PATH = "graphics/sad_start_screen.png"
+# written by python game/atlas.py, images are loaded per file without it
+ATLAS_MANIFEST_PATH = "graphics/atlas/atlas.json"
+# seconds between scans of the watched files in --watch mode
+HOT_RELOAD_INTERVAL = 0.5
+# fade to black between scenes, in milliseconds
+TRANSITION_TIME = 400
 
 # Constant used to loop game music
 LOOP_MUSIC = -1
+
+# audio
+LEVEL_MUSIC_PATH = "levels/level_data/inspiring-cinematic-ambient-116199.ogg"
+# samples per mixer callback, smaller is lower latency
+MIXER_BUFFER = 512
+# channels reserved for sound effects
+SFX_CHANNELS = 8
+# decoded sound effects kept in memory
+SFX_CACHE_SIZE = 32
+
+# npcs are only simulated near the camera, see population.py. Radii are in
+# pixels from the camera centre, npcs between them keep their current state
+POPULATION_BUDGET = 64
+POPULATION_ACTIVATE_RADIUS = 1024
+POPULATION_DEACTIVATE_RADIUS = 1408
+# size of the spawn record buckets, in tiles
+POPULATION_CHUNK_SIZE = 8
+# ticks between population refreshes
+POPULATION_INTERVAL = 10
+
+# most attack sprites alive at once before the oldest is recycled
+ATTACK_POOL_SIZE = 16
+
+# headless server, see server.py and client.py
+SERVER_ADDRESS = "127.0.0.1:7777"
+SERVER_TICK_RATE = FPS
+# bytes queued for a client before it is dropped as too slow
+SERVER_MAX_BACKLOG = 4 * 1024 * 1024
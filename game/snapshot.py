@@ -0,0 +1,256 @@
+import mmap
+import os
+import random
+import struct
+
+# file layout, all little endian:
+#   header   magic, version, flags, npc count, dormant npc count
+#   player   hitbox, direction, status, frame index, attack state
+#   npcs     one fixed size record per npc, enemies first then damsels
+#   dormant  one record per npc held by the population manager
+#   rng      Mersenne Twister state of the random module
+MAGIC = b"LUNK"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHHII")
+PLAYER = struct.Struct("<iiiiddBdBq")
+NPC = struct.Struct("<BiiddidB")
+# spawn position and whether an npc record follows, then the npc record
+DORMANT = struct.Struct("<iiB" + NPC.format[1:])
+RNG = struct.Struct("<625IBd")
+
+# statuses are stored as their integer state, see animstate.py, and this for
+# entities without a status
+NO_STATUS = 255
+
+KIND_ENEMY = 0
+KIND_DAMSEL = 1
+
+
+def npc_groups(level):
+    """Returns (kind, group, spawn function) for every kind of npc"""
+
+    return (
+        (KIND_ENEMY, level.enemy_sprites, level.spawn_enemy),
+        (KIND_DAMSEL, level.friendly_spriites, level.spawn_damsel),
+    )
+
+
+def npc_record(kind, sprite):
+    """Returns the state of an npc as a tuple in the NPC record layout"""
+
+    state = getattr(sprite, "state", None)
+    return (
+        kind,
+        sprite.hitbox.x,
+        sprite.hitbox.y,
+        sprite.direction.x,
+        sprite.direction.y,
+        sprite.timer,
+        sprite.frameIndex,
+        NO_STATUS if state is None else state,
+    )
+
+
+def apply_npc_record(sprite, record):
+    """Restores the state of an npc from a tuple in the NPC record layout"""
+
+    _, x, y, direction_x, direction_y, timer, frame_index, status = record
+    sprite.hitbox.topleft = (x, y)
+    sprite.rect.center = sprite.hitbox.center
+    sprite.direction.update(direction_x, direction_y)
+    sprite.timer = timer
+    sprite.frameIndex = frame_index
+    if status != NO_STATUS:
+        sprite.state = status
+
+
+def save_level(level):
+    """Serializes the level state into a snapshot
+
+    Parameters
+    ----------
+    level : Level
+        the level to serialize
+
+    Returns
+    -------
+    bytearray
+        the snapshot
+    """
+
+    npcs = [
+        (kind, sprite)
+        for kind, group, _ in npc_groups(level)
+        for sprite in group.sprites()
+    ]
+    dormant = level.population.records()
+    data = bytearray(
+        HEADER.size
+        + PLAYER.size
+        + NPC.size * len(npcs)
+        + DORMANT.size * len(dormant)
+        + RNG.size
+    )
+    HEADER.pack_into(data, 0, MAGIC, VERSION, 0, len(npcs), len(dormant))
+    offset = HEADER.size
+
+    player = level.player
+    hitbox = player.hitbox
+    PLAYER.pack_into(
+        data,
+        offset,
+        hitbox.x,
+        hitbox.y,
+        hitbox.width,
+        hitbox.height,
+        player.direction.x,
+        player.direction.y,
+        player.state,
+        player.frameIndex,
+        player.attacking,
+        player.attackTime,
+    )
+    offset += PLAYER.size
+
+    for kind, sprite in npcs:
+        NPC.pack_into(data, offset, *npc_record(kind, sprite))
+        offset += NPC.size
+
+    for record in dormant:
+        # npcs never activated only have a kind and a spawn position
+        state = record.state or (record.kind, 0, 0, 0.0, 0.0, 0, 0.0, NO_STATUS)
+        DORMANT.pack_into(
+            data, offset, record.x, record.y, record.state is not None, *state
+        )
+        offset += DORMANT.size
+
+    _, twister, gauss = random.getstate()
+    RNG.pack_into(
+        data, offset, *twister, gauss is not None, gauss if gauss is not None else 0
+    )
+    return data
+
+
+def restore_level(level, data):
+    """Restores the level state from a snapshot
+
+    NPCs are matched to the existing sprites of their kind in order. Missing
+    ones are spawned and surplus ones are removed, so a snapshot can be
+    restored into a freshly built level of the same map. The dormant npcs of
+    the population manager are replaced by the ones of the snapshot.
+
+    Parameters
+    ----------
+    level : Level
+        the level to restore into
+    data : bytes-like
+        a snapshot from save_level, a memory map works without copying
+
+    Raises
+    ------
+    ValueError
+        if data is not a snapshot of a supported version
+    """
+
+    if len(data) < HEADER.size:
+        raise ValueError("Snapshot is truncated")
+    magic, version, _, npc_count, dormant_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a level snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    size = (
+        HEADER.size
+        + PLAYER.size
+        + NPC.size * npc_count
+        + DORMANT.size * dormant_count
+        + RNG.size
+    )
+    if len(data) < size:
+        raise ValueError("Snapshot is truncated")
+    offset = HEADER.size
+
+    (
+        x,
+        y,
+        width,
+        height,
+        direction_x,
+        direction_y,
+        status,
+        frame_index,
+        attacking,
+        attack_time,
+    ) = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    player = level.player
+    player.hitbox.update(x, y, width, height)
+    player.direction.update(direction_x, direction_y)
+    player.state = status
+    player.frameIndex = frame_index
+    player.attacking = bool(attacking)
+    player.attackTime = attack_time
+    player.rect.center = player.hitbox.center
+
+    records = {}
+    end = offset + NPC.size * npc_count
+    # release the view right away, a memory map cannot close while exported
+    with memoryview(data)[offset:end] as view:
+        for record in NPC.iter_unpack(view):
+            records.setdefault(record[0], []).append(record)
+    offset = end
+    for kind, group, spawn in npc_groups(level):
+        _restore_npcs(group, records.get(kind, []), spawn)
+
+    end = offset + DORMANT.size * dormant_count
+    with memoryview(data)[offset:end] as view:
+        dormant = [
+            (state[0], x, y, tuple(state) if has_state else None)
+            for x, y, has_state, *state in DORMANT.iter_unpack(view)
+        ]
+    offset = end
+    level.population.restore(dormant)
+
+    # after spawning, entity constructors reseed the random module
+    values = RNG.unpack_from(data, offset)
+    gauss = values[626] if values[625] else None
+    random.setstate((3, values[:625], gauss))
+
+
+def _restore_npcs(group, records, spawn):
+    sprites = group.sprites()
+    for index, record in enumerate(records):
+        if index < len(sprites):
+            sprite = sprites[index]
+        else:
+            sprite = spawn(record[1:3])
+        apply_npc_record(sprite, record)
+    restored = len(records)
+    for sprite in sprites[restored:]:
+        sprite.kill()
+
+
+def save_snapshot(level, path):
+    """Writes a snapshot of the level to a file
+
+    The file is replaced atomically, so a crash while saving never leaves a
+    half written checkpoint behind.
+    """
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as snapshot_file:
+        snapshot_file.write(save_level(level))
+    os.replace(temporary, path)
+
+
+def load_snapshot(level, path):
+    """Restores the level from a snapshot file through a memory map
+
+    The file is mapped instead of read, so only the pages that are touched
+    are brought into memory.
+    """
+
+    with open(path, "rb") as snapshot_file:
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            restore_level(level, data)
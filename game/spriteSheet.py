@@ -1,4 +1,6 @@
 import pygame
+from assets import optimize
+from support import import_image
 
 
 class SpriteSheet:
@@ -9,33 +11,33 @@ class SpriteSheet:
     """
 
     def __init__(self, filename):
-        """Load the sheet."""
+        """Load the sheet, shared between every sheet of the same file."""
         try:
-            self.sheet = pygame.image.load(filename).convert()
+            self.sheet = import_image(filename, alpha=False)
         except pygame.error as e:
             print(f"Unable to load spritesheet image: {filename}")
             raise SystemExit(e)
 
-    def image_at(self, rectangle, colorkey=None):
-        """Load a specific image from a specific rectangle."""
+    def image_at(self, rectangle, colorkey=None, rle=True):
+        """Load a specific image from a specific rectangle.
+
+        Pass rle=False for frames that are rotated or otherwise read every
+        frame, run length encoded surfaces are decoded on every read.
+        """
         # Loads image from x, y, x+offset, y+offset.
         rect = pygame.Rect(rectangle)
-        image = pygame.Surface(rect.size).convert()
+        image = pygame.Surface(rect.size)
         image.blit(self.sheet, (0, 0), rect)
-        if colorkey is not None:
-            if colorkey is -1:
-                colorkey = image.get_at((0, 0))
-            image.set_colorkey(colorkey, pygame.RLEACCEL)
-        return image
+        return optimize(image, alpha=False, colorkey=colorkey, rle=rle)
 
-    def images_at(self, rects, colorkey=None):
+    def images_at(self, rects, colorkey=None, rle=True):
         """Load multiple images and return them as a list."""
-        return [self.image_at(rect, colorkey) for rect in rects]
+        return [self.image_at(rect, colorkey, rle) for rect in rects]
 
-    def load_strip(self, rect, image_count, colorkey=None):
+    def load_strip(self, rect, image_count, colorkey=None, rle=True):
         """Load a strip of images, and return them as a list."""
         tuples = [
             (rect[0] + rect[2] * x, rect[1], rect[2], rect[3])
             for x in range(image_count)
         ]
-        return self.images_at(tuples, colorkey)
+        return self.images_at(tuples, colorkey, rle)
@@ -0,0 +1,175 @@
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+# set LUNK_TRACE_STARTUP=1 to print a startup report after the first frame
+TRACE_ENV_VAR = "LUNK_TRACE_STARTUP"
+
+
+class StartupTracer:
+    """Records how long imports, subsystem initialization and asset loads take
+
+    When enabled, an import hook times every module import and span() times
+    the initialization blocks and asset loads it wraps. The report is printed
+    once, when the first frame is presented. When disabled every method is a
+    cheap no-op so the calls can stay in the code.
+    ...
+
+    Methods
+    -------
+    span(self, kind, name)
+        Context manager timing a block of work.
+    mark(self, name)
+        Records a point in time.
+    first_frame(self)
+        Marks the first presented frame and prints the report once.
+    report(self, file)
+        Prints the recorded times grouped by kind.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        # (kind, name, total ms, self ms)
+        self.records = []
+        # (name, ms since origin)
+        self.marks = []
+        self.reported = False
+        # child time of every open span, per thread since levels can be
+        # built in the background, used to compute self time
+        self._local = threading.local()
+
+    def install_import_hook(self):
+        """Starts timing module imports"""
+
+        if not any(isinstance(finder, _ImportTimer) for finder in sys.meta_path):
+            sys.meta_path.insert(0, _ImportTimer(self))
+
+    def span(self, kind, name):
+        """Times the wrapped block of work
+
+        Parameters
+        ----------
+        kind : str
+            the report section, for example "import", "init" or "asset"
+        name : str
+            what is being timed
+        """
+
+        if not self.enabled:
+            return nullcontext()
+        return _Span(self, kind, name)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _begin(self):
+        self._stack().append(0.0)
+        return time.perf_counter()
+
+    def _end(self, kind, name, start):
+        total = (time.perf_counter() - start) * 1000
+        stack = self._stack()
+        children = stack.pop()
+        if stack:
+            stack[-1] += total
+        self.records.append((kind, name, total, total - children))
+
+    def mark(self, name):
+        """Records a point in time relative to the tracer start"""
+
+        if self.enabled:
+            self.marks.append((name, (time.perf_counter() - self.origin) * 1000))
+
+    def first_frame(self):
+        """Marks the first presented frame and prints the report once"""
+
+        if self.enabled and not self.reported:
+            self.reported = True
+            self.mark("first frame")
+            self.report()
+
+    def report(self, file=None, limit=15):
+        """Prints the recorded times grouped by kind, slowest first"""
+
+        file = file or sys.stdout
+        print("startup trace (ms)", file=file)
+        kinds = []
+        for kind, *_ in self.records:
+            if kind not in kinds:
+                kinds.append(kind)
+        for kind in kinds:
+            rows = sorted(
+                (record for record in self.records if record[0] == kind),
+                key=lambda record: record[3],
+                reverse=True,
+            )
+            total = sum(record[3] for record in rows)
+            print(f"  {kind}: {total:.1f} ms in {len(rows)} entries", file=file)
+            for _, name, inclusive, exclusive in rows[:limit]:
+                print(
+                    f"    {exclusive:8.2f} self {inclusive:8.2f} total  {name}",
+                    file=file,
+                )
+        for name, at in self.marks:
+            print(f"  {name} at {at:.1f} ms", file=file)
+
+
+class _Span:
+    def __init__(self, tracer, kind, name):
+        self.tracer = tracer
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.tracer._begin()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._end(self.kind, self.name, self.start)
+        return False
+
+
+class _ImportTimer:
+    """Meta path finder that wraps the loaders found by the other finders"""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self.tracer, fullname)
+                return spec
+        return None
+
+
+class _TimedLoader:
+    def __init__(self, loader, tracer, fullname):
+        self._loader = loader
+        self._tracer = tracer
+        self._fullname = fullname
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._tracer.span("import", self._fullname):
+            self._loader.exec_module(module)
+
+
+tracer = StartupTracer(enabled=bool(os.environ.get(TRACE_ENV_VAR)))
+if tracer.enabled:
+    tracer.install_import_hook()
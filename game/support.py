@@ -1,6 +1,16 @@
 from csv import reader
-from os import walk
+from os import path as os_path, walk
+import threading
+from xml.etree import ElementTree
 import pygame
+from assets import load_image
+from atlas import default_atlas
+from startup import tracer
+
+# (path, alpha) -> converted surface, shared by every sprite using the image
+_image_cache = {}
+# the menu and the level loader thread can import images at once
+_image_cache_lock = threading.Lock()
 
 
 def import_csv_layout(path):
@@ -12,6 +22,47 @@ def import_csv_layout(path):
         return terrain_map
 
 
+def import_tmx_layout(path):
+    """Reads the first tile layer of a Tiled map as a level matrix
+
+    Tiles from a tileset whose file or name contains "wall" become walls and
+    "plant" become plants, every other tile and empty cells are floor. Only
+    CSV encoded layers are supported.
+    """
+
+    root = ElementTree.parse(path).getroot()
+    tilesets = []
+    for tileset in root.iter("tileset"):
+        name = (tileset.get("source") or tileset.get("name") or "").lower()
+        key = "x" if "wall" in name else "t" if "plant" in name else ","
+        tilesets.append((int(tileset.get("firstgid")), key))
+    tilesets.sort(reverse=True)
+
+    data = root.find("layer/data")
+    if data is None or data.get("encoding") != "csv":
+        raise ValueError(f"{path} has no CSV encoded tile layer")
+    terrain_map = []
+    for line in data.text.strip().splitlines():
+        row = []
+        for cell in line.strip().strip(",").split(","):
+            # the top bits of a gid are flip flags
+            gid = int(cell) & 0x1FFFFFFF
+            tile = ","
+            if gid:
+                tile = next((key for first, key in tilesets if gid >= first), ",")
+            row.append(tile)
+        terrain_map.append(row)
+    return terrain_map
+
+
+def import_layout(path):
+    """Reads a level matrix from a CSV or a Tiled .tmx map"""
+
+    if path.lower().endswith(".tmx"):
+        return import_tmx_layout(path)
+    return import_csv_layout(path)
+
+
 def import_folder(path):
     surface_list = []
     # import all images from a folder
@@ -22,4 +73,85 @@ def import_folder(path):
             surface_list.append(image_surface)
 
 
+def import_image(path, alpha=None):
+    """Loads an image on first use and returns the shared converted surface
+
+    Images baked into the asset atlas are served from it, see atlas.py, and
+    every other image is loaded from its own file. The same surface object is
+    returned to every caller, so callers must not draw on it.
+
+    Parameters
+    ----------
+    path : str
+        path of the image file
+    alpha : bool or None
+        convert with per-pixel alpha, or to the display format without it.
+        None keeps per-pixel alpha only if the image has translucent pixels
+    """
+
+    with _image_cache_lock:
+        image = _image_cache.get((path, alpha))
+        if image is None:
+            with tracer.span("asset", path):
+                image = _atlas_image(path, alpha) or load_image(path, alpha)
+            _image_cache[(path, alpha)] = image
+        return image
+
+
+def _atlas_image(path, alpha):
+    """Returns an image from the baked atlas in the requested format"""
+
+    atlas = default_atlas()
+    image = atlas.image(path) if atlas is not None else None
+    if image is None:
+        return None
+    translucent = bool(image.get_flags() & pygame.SRCALPHA)
+    if alpha is None or alpha == translucent:
+        return image
+    return image.convert_alpha() if alpha else image.convert()
+
+
+def reload_image(path):
+    """Reloads a changed image file into the image cache
+
+    A cached surface is updated in place when the new image has the same size
+    and format, so every sprite sharing it is updated without being touched.
+    Otherwise the cache entry is replaced and the caller has to swap the old
+    surface for the new one wherever it is referenced.
+
+    Returns
+    -------
+    list of tuple
+        (old surface, current surface) for every cache entry of the path, the
+        same surface twice when it was updated in place
+    """
+
+    with _image_cache_lock:
+        return _reload_cached(os_path.normpath(path))
+
+
+def _reload_cached(target):
+    replaced = []
+    for (cached_path, alpha), surface in list(_image_cache.items()):
+        if os_path.normpath(cached_path) != target:
+            continue
+        image = load_image(cached_path, alpha)
+        translucent = image.get_flags() & pygame.SRCALPHA
+        if (
+            image.get_size() == surface.get_size()
+            and surface.get_flags() & pygame.SRCALPHA == translucent
+        ):
+            if translucent:
+                # copy the pixels and their alpha instead of blending them
+                surface.fill((0, 0, 0, 0))
+                surface.blit(image, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            else:
+                surface.blit(image, (0, 0))
+            replaced.append((surface, surface))
+        else:
+            _image_cache[(cached_path, alpha)] = image
+            replaced.append((surface, image))
+    return replaced
+
+
 # import_folder('../graphics/wall')
@@ -0,0 +1,278 @@
+import argparse
+import json
+import math
+import queue
+import threading
+from array import array
+from settings import TELEMETRY_CAPACITY
+
+# per frame fields, in record order
+FIELDS = ("frame_ms", "work_ms", "entities", "collision_checks", "blits", "quality")
+
+
+class Telemetry:
+    """Per frame measurements written to a JSONL file off the main thread
+
+    Frames are recorded into fixed size arrays used as a ring buffer, so
+    recording allocates nothing and costs a few array stores. Every half
+    ring the new records are copied out in one slice per field and handed to
+    a writer thread that formats and writes them, one JSON object per line.
+    If the writer falls so far behind that the hand off queue is full the
+    chunk is dropped and counted rather than stalling the frame.
+    ...
+
+    Attributes
+    ----------
+    frames : int
+        frames recorded so far
+    dropped : int
+        frames lost because the writer fell behind
+
+    Methods
+    -------
+    record(self, frame_ms, work_ms, entities, collision_checks, blits, quality)
+        Stores the measurements of one frame.
+    record_level(self, level, frame_ms, work_ms, quality)
+        Records a frame with the counters of a level.
+    set_map(self, name)
+        Tags the following frames with a map name.
+    close(self)
+        Writes out the remaining frames and stops the writer.
+    """
+
+    def __init__(self, path, capacity=TELEMETRY_CAPACITY, map_name="default"):
+        """Initialize the buffers and start the writer thread
+
+        Parameters
+        ----------
+            path : str
+                JSONL file to write, replaced if it exists
+            capacity : int
+                frames held in the ring buffer
+            map_name : str
+                map the first frames are tagged with
+        """
+
+        self.capacity = capacity
+        self.columns = {
+            "frame_ms": array("d", [0.0]) * capacity,
+            "work_ms": array("d", [0.0]) * capacity,
+            "entities": array("L", [0]) * capacity,
+            "collision_checks": array("L", [0]) * capacity,
+            "blits": array("L", [0]) * capacity,
+            "quality": array("B", [0]) * capacity,
+        }
+        self.map_name = map_name
+        self.frames = 0
+        self.dropped = 0
+        # frame number of the first record not yet handed to the writer
+        self._flushed = 0
+
+        self._chunks = queue.Queue(maxsize=4)
+        self._file = open(path, "w", encoding="utf-8")
+        self._writer = threading.Thread(
+            target=self._write_chunks, name="telemetry", daemon=True
+        )
+        self._writer.start()
+
+    def record(self, frame_ms, work_ms, entities, collision_checks, blits, quality=0):
+        """Stores the measurements of one frame
+
+        Parameters
+        ----------
+        frame_ms : float
+            time since the previous frame, including the frame rate wait
+        work_ms : float
+            time spent updating and drawing the frame
+        entities : int
+            number of sprites in the level
+        collision_checks : int
+            obstacle and entity pairs tested during the frame
+        blits : int
+            sprites drawn during the frame
+        quality : int
+            quality level of the governor, 0 is the best
+        """
+
+        index = self.frames % self.capacity
+        columns = self.columns
+        columns["frame_ms"][index] = frame_ms
+        columns["work_ms"][index] = work_ms
+        columns["entities"][index] = entities
+        columns["collision_checks"][index] = collision_checks
+        columns["blits"][index] = blits
+        columns["quality"][index] = quality
+        self.frames += 1
+        if self.frames - self._flushed >= self.capacity // 2:
+            self._hand_off()
+
+    def record_level(self, level, frame_ms, work_ms, quality=0):
+        """Records a frame with the counters of a level
+
+        The obstacle sweep counter of the level is reset, so it counts the
+        checks of one frame.
+        """
+
+        checks = level.obstacle_sprites.checks + level.interactions.checks
+        level.obstacle_sprites.checks = 0
+        self.record(
+            frame_ms,
+            work_ms,
+            len(level.visible_sprites),
+            checks,
+            level.visible_sprites.blit_count,
+            quality,
+        )
+
+    def set_map(self, name):
+        """Tags the following frames with a map name"""
+
+        if name != self.map_name:
+            self._hand_off()
+            self.map_name = name
+
+    def close(self):
+        """Writes out the remaining frames and stops the writer"""
+
+        self._hand_off()
+        self._chunks.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def _hand_off(self):
+        start = self._flushed
+        end = self.frames
+        if start == end:
+            return
+        first = start % self.capacity
+        last = first + end - start
+        chunk = {"map": self.map_name, "first_frame": start}
+        for name, column in self.columns.items():
+            if last <= self.capacity:
+                chunk[name] = column[first:last]
+            else:
+                wrapped = last - self.capacity
+                chunk[name] = column[first:] + column[:wrapped]
+        self._flushed = end
+        try:
+            self._chunks.put_nowait(chunk)
+        except queue.Full:
+            self.dropped += end - start
+
+    def _write_chunks(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            lines = []
+            for offset, values in enumerate(zip(*(chunk[name] for name in FIELDS))):
+                record = {"frame": chunk["first_frame"] + offset, "map": chunk["map"]}
+                record.update(zip(FIELDS, values))
+                lines.append(json.dumps(record))
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+
+
+def load(path):
+    """Reads the frame records of a telemetry file"""
+
+    with open(path, encoding="utf-8") as telemetry_file:
+        return [json.loads(line) for line in telemetry_file if line.strip()]
+
+
+def percentile(ordered, fraction):
+    """Nearest rank percentile of an already sorted list"""
+
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(records):
+    """Returns frame count, frame time percentiles and counter means"""
+
+    frame_ms = sorted(record["frame_ms"] for record in records)
+    work_ms = sorted(record["work_ms"] for record in records)
+    count = max(len(records), 1)
+    summary = {"frames": len(records)}
+    for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        summary[f"frame_{label}"] = percentile(frame_ms, fraction)
+        summary[f"work_{label}"] = percentile(work_ms, fraction)
+    summary["frame_max"] = frame_ms[-1] if frame_ms else 0.0
+    for name in ("entities", "collision_checks", "blits"):
+        summary[name] = sum(record[name] for record in records) / count
+    # recorded since the quality governor was added
+    summary["quality"] = sum(record.get("quality", 0) for record in records) / count
+    return summary
+
+
+def spikes(records, threshold_ms, limit):
+    """Returns the slowest frames above a threshold, slowest first"""
+
+    slow = [record for record in records if record["frame_ms"] > threshold_ms]
+    slow.sort(key=lambda record: record["frame_ms"], reverse=True)
+    return slow[:limit]
+
+
+def report(records, spike_ms=None, limit=10):
+    """Prints the overall and per map summary and the worst spikes
+
+    Parameters
+    ----------
+    records : list of dict
+        frame records from load()
+    spike_ms : float or None
+        frames slower than this are spikes, twice the median when None
+    limit : int
+        most spikes listed
+    """
+
+    maps = {}
+    for record in records:
+        maps.setdefault(record["map"], []).append(record)
+
+    print(
+        f"{'map':<16}{'frames':>8}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}"
+        f"{'work p99':>10}{'entities':>10}{'checks':>10}{'blits':>8}"
+        f"{'quality':>9}"
+    )
+    for name, selection in [("all", records)] + sorted(maps.items()):
+        summary = summarize(selection)
+        print(
+            f"{name:<16}{summary['frames']:>8}{summary['frame_p50']:>8.2f}"
+            f"{summary['frame_p90']:>8.2f}{summary['frame_p99']:>8.2f}"
+            f"{summary['frame_max']:>8.2f}{summary['work_p99']:>10.2f}"
+            f"{summary['entities']:>10.0f}{summary['collision_checks']:>10.0f}"
+            f"{summary['blits']:>8.0f}{summary['quality']:>9.2f}"
+        )
+
+    if spike_ms is None:
+        spike_ms = 2 * summarize(records)["frame_p50"]
+    slow = spikes(records, spike_ms, limit)
+    print(f"\nframes over {spike_ms:.2f} ms: {len(slow)} shown")
+    for record in slow:
+        print(
+            f"  frame {record['frame']:>8}  {record['map']:<16}"
+            f"{record['frame_ms']:8.2f} ms  work {record['work_ms']:7.2f} ms  "
+            f"{record['entities']} entities  {record['collision_checks']} checks  "
+            f"{record['blits']} blits  quality {record.get('quality', 0)}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a Lunk telemetry file")
+    parser.add_argument("path", help="JSONL file written with game.py --telemetry")
+    parser.add_argument(
+        "--spike-ms",
+        type=float,
+        default=None,
+        help="frames slower than this are spikes (default twice the median)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="spikes listed")
+    args = parser.parse_args()
+    report(load(args.path), args.spike_ms, args.top)
+
+
+if __name__ == "__main__":
+    main()
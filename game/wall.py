@@ -1,4 +1,5 @@
 import pygame
+from support import import_image
 
 
 class Wall(pygame.sprite.Sprite):
@@ -6,6 +7,6 @@ class Wall(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
         # self.sprite_type = sprite_type
-        self.image = pygame.image.load("graphics/wall/wall.png").convert_alpha()
+        self.image = import_image("graphics/wall/wall.png")
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect